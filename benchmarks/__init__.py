@@ -0,0 +1,11 @@
+"""Micro-benchmarks for the repository, cache and validation hot paths.
+
+    python -m benchmarks run                          # stand-ins only
+    python -m benchmarks run --db-url postgresql+asyncpg://... --redis-url redis://...
+    python -m benchmarks run --baseline benchmarks/results/<commit>.json
+    python -m benchmarks compare old.json new.json --threshold 0.1
+
+Postgres benchmarks create and drop their own `benchmarks` schema.
+Results are written to benchmarks/results/<commit>.json; a comparison
+exits with status 1 when any median got slower than the threshold.
+"""
@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import fnmatch
+import os
+import random
+import sys
+
+from benchmarks import bench_cache, bench_repository, bench_validation  # noqa: F401
+from benchmarks.load import (
+    AT_LEAST,
+    DEFAULT_MIX,
+    ASGIClient,
+    HTTPClient,
+    LoadTest,
+    Traffic,
+    append_history,
+    check_slos,
+    parse_mix,
+    parse_slos,
+    seed,
+)
+from benchmarks.runner import (
+    BenchContext,
+    build_report,
+    compare,
+    load,
+    registered,
+    run_all,
+    save,
+)
+from src.core.config import config
+from src.core.database import DBConnection
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _print_result(name: str, result: dict) -> None:
+    if "skipped" in result:
+        print(f"{name:<45} skipped ({result['skipped']})")
+        return
+    print(
+        f"{name:<45} {result['median_ns'] / 1000:>10.2f} us/op "
+        f"(min {result['min_ns'] / 1000:.2f}, "
+        f"stdev {result['stdev_ns'] / 1000:.2f}, "
+        f"{result['ops_per_sec']:,.0f} ops/s)"
+        + (f", {result['bytes_per_op']:,.0f} B/op" if "bytes_per_op" in result else "")
+    )
+
+
+def _print_comparison(rows, threshold: float) -> bool:
+    regressed = False
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, base_ns, current_ns, ratio, is_regression in rows:
+        regressed |= is_regression
+        flag = "  REGRESSION" if is_regression else ""
+        print(
+            f"{name:<45} {base_ns / 1000:>10.2f}us {current_ns / 1000:>10.2f}us "
+            f"{(ratio - 1) * 100:>+7.1f}%{flag}"
+        )
+    print(f"\nthreshold: +{threshold * 100:.0f}%")
+    return regressed
+
+
+def _run(args: argparse.Namespace) -> int:
+    selected = [
+        b for b in registered() if any(fnmatch.fnmatch(b.name, p) for p in args.filter)
+    ]
+    ctx = BenchContext(db_url=args.db_url, redis_url=args.redis_url)
+    results = asyncio.run(
+        run_all(ctx, selected, args.rounds, args.target_ms, _print_result)
+    )
+    report = build_report(results)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(
+            RESULTS_DIR, f"{report['meta']['commit'] or 'local'}.json"
+        )
+    save(output, report)
+    print(f"\nresults saved to {output}")
+
+    if args.baseline:
+        rows = compare(load(args.baseline), report, args.threshold)
+        return 1 if _print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    rows = compare(load(args.baseline), load(args.current), args.threshold)
+    return 1 if _print_comparison(rows, args.threshold) else 0
+
+
+async def _drive_load(args: argparse.Namespace) -> dict:
+    async def run(client) -> dict:
+        print(f"seeding {args.users} users")
+        users = await seed(args.users)
+        test = LoadTest(
+            Traffic(
+                client,
+                users,
+                args.webhook_secret,
+                args.duplicates,
+                random.Random(args.seed),
+            ),
+            args.mix,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+            args.rate,
+        )
+        print(
+            f"running for {args.duration:g}s against {args.url or 'the app in-process'}"
+        )
+        return await test.run()
+
+    if args.url:
+        client = HTTPClient(args.url, args.concurrency)
+        try:
+            return await run(client)
+        finally:
+            await client.close()
+            if DBConnection.instance is not None:
+                await DBConnection.instance.dispose()
+
+    from src.app import create_app
+
+    # the in-process app checks webhook signatures with the same secret
+    args.webhook_secret = args.webhook_secret or "loadtest"
+    config.webhook.WEBHOOK_SECRET = args.webhook_secret
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        return await run(ASGIClient(app))
+
+
+def _print_load(results: dict, slos: list) -> bool:
+    print(
+        f"\n{'operation':<10} {'requests':>9} {'rps':>9} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'max':>8} {'errors':>7} {'429':>6}"
+    )
+    for name, summary in results.items():
+        print(
+            f"{name:<10} {summary['requests']:>9} {summary['rps']:>9.1f} "
+            f"{summary['p50']:>6.1f}ms {summary['p95']:>6.1f}ms "
+            f"{summary['p99']:>6.1f}ms {summary['max']:>6.1f}ms "
+            f"{summary['errors']:>7} {summary['limited']:>6}"
+        )
+    if results["total"]["dropped"]:
+        print(
+            f"\n{results['total']['dropped']} requests dropped: "
+            "--concurrency too low for --rate"
+        )
+
+    breached = False
+    print()
+    for operation, metric, threshold, value, met in slos:
+        breached |= not met
+        print(
+            f"{'ok  ' if met else 'FAIL'} {operation}.{metric}: {value:.4g} "
+            f"({'>=' if metric in AT_LEAST else '<='} {threshold:g})"
+        )
+    return breached
+
+
+def _load(args: argparse.Namespace) -> int:
+    args.mix = parse_mix(args.mix)
+    slos = parse_slos(args.slo)
+    if args.url and args.mix.get("payment") and not args.webhook_secret:
+        print("payment traffic needs --webhook-secret (or WEBHOOK_SECRET)")
+        return 2
+
+    results = asyncio.run(_drive_load(args))
+    report = build_report(results)
+    report["meta"]["load"] = {
+        "target": args.url or "asgi",
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "rate": args.rate,
+        "users": args.users,
+    }
+    report["slos"] = check_slos(results, slos)
+    breached = _print_load(results, report["slos"])
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{report['meta']['commit'] or 'local'}.json"
+    )
+    save(output, report)
+    append_history(args.history, report)
+    print(f"\nresults saved to {output}, history in {args.history}")
+    return 1 if breached else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run benchmarks and save results as JSON")
+    run.add_argument("-k", "--filter", nargs="+", default=["*"], help="name globs")
+    run.add_argument(
+        "-o", "--output", help="results file (default: results/<commit>.json)"
+    )
+    run.add_argument("--baseline", help="results file to compare against")
+    run.add_argument("--threshold", type=float, default=0.10)
+    run.add_argument("--rounds", type=int, default=7)
+    run.add_argument(
+        "--target-ms", type=float, default=200.0, help="duration per round"
+    )
+    run.add_argument("--db-url", default=os.getenv("BENCH_DB_URL"))
+    run.add_argument("--redis-url", default=os.getenv("BENCH_REDIS_URL"))
+    run.set_defaults(handler=_run)
+
+    cmp = commands.add_parser("compare", help="compare two saved results")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.10)
+    cmp.set_defaults(handler=_compare)
+
+    load_test = commands.add_parser(
+        "load", help="drive the app with a traffic mix and check SLOs"
+    )
+    load_test.add_argument("--url", help="server to load (default: the app in-process)")
+    load_test.add_argument(
+        "--mix",
+        default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+        help="weights of register, lookup, payment and config traffic",
+    )
+    load_test.add_argument("-c", "--concurrency", type=int, default=32)
+    load_test.add_argument("-d", "--duration", type=float, default=30.0, help="seconds")
+    load_test.add_argument(
+        "--warmup", type=float, default=5.0, help="unrecorded seconds"
+    )
+    load_test.add_argument(
+        "--rate", type=float, help="requests per second (default: as fast as answered)"
+    )
+    load_test.add_argument("--users", type=int, default=1000, help="seeded users")
+    load_test.add_argument(
+        "--duplicates", type=float, default=0.05, help="share of resent webhooks"
+    )
+    load_test.add_argument(
+        "--webhook-secret",
+        default=os.getenv("WEBHOOK_SECRET"),
+        help="signs payment webhooks (default: WEBHOOK_SECRET, in-process any)",
+    )
+    load_test.add_argument("--seed", type=int, help="random seed")
+    load_test.add_argument(
+        "--slo",
+        nargs="*",
+        default=[],
+        help="overrides, e.g. config.p99=20 total.rps=500",
+    )
+    load_test.add_argument(
+        "-o", "--output", help="results file (default: results/load-<commit>.json)"
+    )
+    load_test.add_argument(
+        "--history",
+        default=os.path.join(RESULTS_DIR, "load-history.csv"),
+        help="CSV every run appends to",
+    )
+    load_test.set_defaults(handler=_load)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
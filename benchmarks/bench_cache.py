@@ -0,0 +1,83 @@
+import itertools
+
+from redis.asyncio import Redis
+
+from benchmarks.runner import benchmark
+from benchmarks.stand_ins import FakeRedis, ForgetfulRedis
+from src.core.cache.helper import CacheHelper
+
+
+class _Service:
+    def __init__(self) -> None:
+        self._uow = object()
+
+    @CacheHelper.cache(ttl=60, prefix="bench")
+    async def get(self, telegram_id: int) -> dict:
+        return {"id": 1, "telegram_id": telegram_id, "is_active": True}
+
+
+@CacheHelper.cache(ttl=60, prefix="bench")
+async def _lookup(telegram_id: int, is_active: bool = True) -> dict:
+    return {"id": 1, "telegram_id": telegram_id, "is_active": is_active}
+
+
+def _use_client(client) -> None:
+    CacheHelper._client = client
+    CacheHelper._pool = None
+    CacheHelper._initialized = True
+    CacheHelper.breaker.reset()
+
+
+async def _redis_client(ctx) -> Redis:
+    client = ctx.resources.get("redis")
+    if client is None:
+        client = ctx.resources["redis"] = Redis.from_url(ctx.redis_url)
+
+        async def cleanup() -> None:
+            await client.delete(
+                *[k async for k in client.scan_iter("bench:*")] or ["-"]
+            )
+            await client.aclose()
+
+        ctx.cleanups.append(cleanup)
+    return client
+
+
+@benchmark("cache.key_primitive_args")
+async def key_primitive_args(ctx):
+    args, kwargs = (123456789,), {"is_active": True}
+    return lambda: _lookup.cache_key(args, kwargs)
+
+
+@benchmark("cache.key_method_args")
+async def key_method_args(ctx):
+    args, kwargs = (_Service(), 123456789), {}
+    return lambda: _Service.get.cache_key(args, kwargs)
+
+
+@benchmark("cache.decorator_hit.stand_in")
+async def decorator_hit_stand_in(ctx):
+    _use_client(FakeRedis())
+    await _lookup(42)
+    return lambda: _lookup(42)
+
+
+@benchmark("cache.decorator_miss.stand_in")
+async def decorator_miss_stand_in(ctx):
+    _use_client(ForgetfulRedis())
+    return lambda: _lookup(42)
+
+
+@benchmark("cache.decorator_hit.redis", requires=("redis_url",))
+async def decorator_hit_redis(ctx):
+    _use_client(await _redis_client(ctx))
+    await _lookup(42)
+    return lambda: _lookup(42)
+
+
+@benchmark("cache.decorator_miss.redis", requires=("redis_url",))
+async def decorator_miss_redis(ctx):
+    _use_client(await _redis_client(ctx))
+    # every call uses a fresh argument, so it misses and then writes
+    telegram_ids = itertools.count(1_000_000)
+    return lambda: _lookup(next(telegram_ids))
@@ -0,0 +1,221 @@
+import itertools
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.runner import benchmark
+from benchmarks.stand_ins import StubSession
+from src.core.database import Base
+from src.models import Users
+from src.repositories import ConfigRepository, UserRepository
+
+
+BENCH_SCHEMA = "benchmarks"
+LARGE_TABLE_ROWS = 10_000
+BULK_SIZE = 100
+BULK_READ_ROWS = 100_000
+BULK_READ_COLUMNS = ["id", "user_id", "public_key", "ip_address"]
+
+_telegram_ids = itertools.count(10_000_000_000)
+
+
+def _users(count: int) -> list[Users]:
+    return [
+        Users(id=i, telegram_id=1_000 + i, is_active=bool(i % 2)) for i in range(count)
+    ]
+
+
+async def _postgres(ctx) -> async_sessionmaker:
+    """Creates the tables in a throwaway schema and seeds the users table."""
+    sessionmaker = ctx.resources.get("postgres")
+    if sessionmaker is not None:
+        return sessionmaker
+
+    admin_engine = create_async_engine(ctx.db_url)
+    async with admin_engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+    await admin_engine.dispose()
+
+    engine = create_async_engine(
+        ctx.db_url,
+        pool_size=5,
+        connect_args={"server_settings": {"search_path": BENCH_SCHEMA}},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "INSERT INTO users (telegram_id, is_active) "
+                "SELECT g, g % 2 = 0 FROM generate_series(1, :rows) AS g"
+            ),
+            {"rows": LARGE_TABLE_ROWS},
+        )
+        await conn.execute(text("ANALYZE users"))
+
+    async def cleanup() -> None:
+        await engine.dispose()
+        drop_engine = create_async_engine(ctx.db_url)
+        async with drop_engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+        await drop_engine.dispose()
+
+    ctx.cleanups.append(cleanup)
+    sessionmaker = ctx.resources["postgres"] = async_sessionmaker(
+        engine, expire_on_commit=False
+    )
+    return sessionmaker
+
+
+# Stand-in session: measures statement building and validation only.
+
+
+@benchmark("repository.get_one.stand_in")
+async def get_one_stand_in(ctx):
+    repo = UserRepository(StubSession(_users(1)))
+    return lambda: repo.get_one({"telegram_id": 1_000})
+
+
+@benchmark("repository.get_all_1k_rows.stand_in", ops=1_000)
+async def get_all_stand_in(ctx):
+    repo = UserRepository(StubSession(_users(1_000)))
+    return lambda: repo.get_all({"is_active": True})
+
+
+@benchmark("repository.insert.stand_in")
+async def insert_stand_in(ctx):
+    repo = UserRepository(StubSession(_users(1)))
+    return lambda: repo.insert({"telegram_id": next(_telegram_ids)})
+
+
+# Postgres: full round trips against the benchmark schema.
+
+
+@benchmark("repository.insert_single.postgres", requires=("db_url",))
+async def insert_single_postgres(ctx):
+    sessionmaker = await _postgres(ctx)
+
+    async def insert() -> None:
+        async with sessionmaker() as session:
+            await UserRepository(session).insert({"telegram_id": next(_telegram_ids)})
+            await session.commit()
+
+    return insert
+
+
+@benchmark("repository.insert_bulk.postgres", ops=BULK_SIZE, requires=("db_url",))
+async def insert_bulk_postgres(ctx):
+    sessionmaker = await _postgres(ctx)
+
+    async def insert_many() -> None:
+        async with sessionmaker() as session:
+            repo = UserRepository(session)
+            for _ in range(BULK_SIZE):
+                await repo.insert({"telegram_id": next(_telegram_ids)})
+            await session.commit()
+
+    return insert_many
+
+
+@benchmark("repository.get_one_by_telegram_id.postgres", requires=("db_url",))
+async def get_one_postgres(ctx):
+    sessionmaker = await _postgres(ctx)
+    telegram_ids = itertools.cycle(range(1, LARGE_TABLE_ROWS + 1, 97))
+
+    async def get_one() -> None:
+        async with sessionmaker() as session:
+            await UserRepository(session).get_one({"telegram_id": next(telegram_ids)})
+
+    return get_one
+
+
+@benchmark(
+    "repository.get_all_large_table.postgres",
+    ops=LARGE_TABLE_ROWS // 2,
+    requires=("db_url",),
+)
+async def get_all_postgres(ctx):
+    sessionmaker = await _postgres(ctx)
+
+    async def get_all() -> None:
+        async with sessionmaker() as session:
+            await UserRepository(session).get_all({"is_active": True})
+
+    return get_all
+
+
+# Bulk reads: the same 100k configs through each read path, with memory.
+
+
+async def _configs(ctx) -> async_sessionmaker:
+    """The Postgres schema plus BULK_READ_ROWS configs spread over its users."""
+    sessionmaker = await _postgres(ctx)
+    if not ctx.resources.get("configs"):
+        async with sessionmaker() as session:
+            await session.execute(
+                text(
+                    "INSERT INTO wireguard_configs "
+                    "(user_id, private_key, public_key, ip_address) "
+                    "SELECT 1 + g % :users, md5(g::text), md5(g::text), "
+                    "'10.0.0.0'::inet + g FROM generate_series(1, :rows) AS g"
+                ),
+                {"users": LARGE_TABLE_ROWS, "rows": BULK_READ_ROWS},
+            )
+            await session.execute(text("ANALYZE wireguard_configs"))
+            await session.commit()
+        ctx.resources["configs"] = True
+    return sessionmaker
+
+
+async def _bulk_read(ctx, read) -> Callable[[], Awaitable[None]]:
+    sessionmaker = await _configs(ctx)
+
+    async def run() -> None:
+        async with sessionmaker() as session:
+            await read(ConfigRepository(session))
+
+    return run
+
+
+@benchmark(
+    "repository.bulk_read.get_all.postgres",
+    ops=BULK_READ_ROWS,
+    requires=("db_url",),
+    memory=True,
+)
+async def bulk_read_get_all(ctx):
+    return await _bulk_read(ctx, lambda repo: repo.get_all({}))
+
+
+@benchmark(
+    "repository.bulk_read.find_columns.postgres",
+    ops=BULK_READ_ROWS,
+    requires=("db_url",),
+    memory=True,
+)
+async def bulk_read_find_columns(ctx):
+    return await _bulk_read(ctx, lambda repo: repo.find({"columns": BULK_READ_COLUMNS}))
+
+
+@benchmark(
+    "repository.bulk_read.rows.postgres",
+    ops=BULK_READ_ROWS,
+    requires=("db_url",),
+    memory=True,
+)
+async def bulk_read_rows(ctx):
+    return await _bulk_read(ctx, lambda repo: repo.rows({"columns": BULK_READ_COLUMNS}))
+
+
+@benchmark(
+    "repository.bulk_read.rows_dataclass.postgres",
+    ops=BULK_READ_ROWS,
+    requires=("db_url",),
+    memory=True,
+)
+async def bulk_read_rows_dataclass(ctx):
+    return await _bulk_read(
+        ctx,
+        lambda repo: repo.rows({"columns": BULK_READ_COLUMNS}, shape="dataclass"),
+    )
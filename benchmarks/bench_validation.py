@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from benchmarks.runner import benchmark
+from src.models import Payments, PaymentMethod, PaymentStatus, Users
+from src.repositories import PaymentRepository, UserRepository
+from src.schemes.payments import PaymentInsertScheme, PaymentModelScheme
+from src.schemes.users import UserFilterScheme, UserModelScheme
+
+
+@benchmark("validation.user_filter_input")
+async def user_filter_input(ctx):
+    data = {"telegram_id": 123456789}
+    return lambda: UserRepository._validate_input(data, UserFilterScheme)
+
+
+@benchmark("validation.payment_insert_input")
+async def payment_insert_input(ctx):
+    data = {
+        "user_id": 1,
+        "payment_method": PaymentMethod.card,
+        "amount": Decimal("199.00"),
+    }
+    return lambda: PaymentRepository._validate_input(data, PaymentInsertScheme)
+
+
+@benchmark("validation.user_output_row")
+async def user_output_row(ctx):
+    row = Users(id=1, telegram_id=123456789, is_active=True)
+    return lambda: UserRepository._validate_output(row, UserModelScheme)
+
+
+@benchmark("validation.payment_output_row")
+async def payment_output_row(ctx):
+    row = Payments(
+        id=1,
+        user_id=1,
+        status=PaymentStatus.paid,
+        payment_method=PaymentMethod.sbp,
+        amount=Decimal("199.00"),
+    )
+    return lambda: PaymentRepository._validate_output(row, PaymentModelScheme)
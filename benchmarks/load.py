@@ -0,0 +1,557 @@
+import asyncio
+import base64
+import csv
+import hashlib
+import hmac
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Protocol
+from urllib.parse import quote
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.config import config
+from src.core.database import DBConnection
+from src.models import PaymentMethod, Payments, PaymentStatus, Users, WireGuardConfigs
+
+
+# seeded users take telegram ids from here on, away from real ones
+SEED_TELEGRAM_ID = 9_000_000_000
+SEED_CHUNK = 1000
+SEED_AMOUNT = Decimal("100.00")
+
+DEFAULT_MIX = {"register": 1, "lookup": 3, "payment": 1, "config": 5}
+
+# latencies in milliseconds, rates per second; `total` covers every request
+DEFAULT_SLOS = {
+    "register": {"p99": 50.0},
+    "lookup": {"p99": 100.0},
+    "payment": {"p99": 100.0},
+    "config": {"p99": 50.0},
+    "total": {"error_rate": 0.001},
+}
+# metrics that must stay above their threshold, the rest must stay below
+AT_LEAST = ("rps",)
+
+
+class SeedUser(NamedTuple):
+    telegram_id: int
+    config_id: int
+    payment_id: int
+    payment_method: PaymentMethod
+    amount: Decimal
+
+
+class Client(Protocol):
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: bytes = b""
+    ) -> int: ...
+
+    async def close(self) -> None: ...
+
+
+class ASGIClient:
+    """Calls the application directly, without sockets or an HTTP parser,
+    so the numbers are the app's own and not those of a server."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: bytes = b""
+    ) -> int:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")]
+            + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        status = 0
+        finished = asyncio.Event()
+        received = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                finished.set()
+
+        await self.app(scope, receive, send)
+        finished.set()
+        return status
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """Talks to a running server, e.g. `uvicorn src.app:create_app --factory`."""
+
+    def __init__(self, url: str, connections: int) -> None:
+        try:
+            import httpx
+        except ImportError:
+            raise SystemExit("--url needs httpx: pip install httpx")
+        self._client = httpx.AsyncClient(
+            base_url=url,
+            limits=httpx.Limits(max_connections=connections),
+            timeout=30.0,
+        )
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: bytes = b""
+    ) -> int:
+        response = await self._client.request(
+            method, path, headers=headers, content=body
+        )
+        return response.status_code
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+async def seed(count: int) -> list[SeedUser]:
+    """Makes sure `count` users with a config and an unpaid payment each
+    exist. Rows of earlier runs are reused, so repeated runs don't grow
+    the tables beyond the payments their webhooks settled."""
+    from src.repositories import PaymentRepository
+
+    telegram_ids = range(SEED_TELEGRAM_ID, SEED_TELEGRAM_ID + count)
+    seeded = Users.telegram_id.between(telegram_ids.start, telegram_ids.stop - 1)
+    engine = DBConnection(config.db.url).engine
+    async with engine.begin() as connection:
+        await PaymentRepository.partitions.ensure(
+            connection, config.db.DB_PARTITION_MONTHS_AHEAD
+        )
+        for start in range(0, count, SEED_CHUNK):
+            await connection.execute(
+                insert(Users)
+                .values(
+                    [
+                        {"telegram_id": telegram_id, "is_active": True}
+                        for telegram_id in telegram_ids[start : start + SEED_CHUNK]
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[Users.telegram_id])
+            )
+        users = dict(
+            (
+                await connection.execute(
+                    select(Users.id, Users.telegram_id).where(seeded)
+                )
+            ).all()
+        )
+
+        configs = dict(
+            (
+                await connection.execute(
+                    select(WireGuardConfigs.user_id, func.min(WireGuardConfigs.id))
+                    .join(Users)
+                    .where(seeded)
+                    .group_by(WireGuardConfigs.user_id)
+                )
+            ).all()
+        )
+        missing = [user_id for user_id in users if user_id not in configs]
+        for start in range(0, len(missing), SEED_CHUNK):
+            rows = await connection.execute(
+                insert(WireGuardConfigs)
+                .values(
+                    [
+                        _config_row(user_id)
+                        for user_id in missing[start : start + SEED_CHUNK]
+                    ]
+                )
+                .returning(WireGuardConfigs.user_id, WireGuardConfigs.id)
+            )
+            configs.update(rows.all())
+
+        payments = {
+            row.user_id: row
+            for row in await connection.execute(
+                select(
+                    Payments.user_id,
+                    Payments.id,
+                    Payments.payment_method,
+                    Payments.amount,
+                )
+                .join(Users)
+                .where(and_(seeded, Payments.status == PaymentStatus.unpaid))
+                .distinct(Payments.user_id)
+            )
+        }
+        missing = [user_id for user_id in users if user_id not in payments]
+        methods = list(PaymentMethod)
+        for start in range(0, len(missing), SEED_CHUNK):
+            rows = await connection.execute(
+                insert(Payments)
+                .values(
+                    [
+                        {
+                            "user_id": user_id,
+                            "status": PaymentStatus.unpaid,
+                            "payment_method": methods[user_id % len(methods)],
+                            "amount": SEED_AMOUNT,
+                        }
+                        for user_id in missing[start : start + SEED_CHUNK]
+                    ]
+                )
+                .returning(
+                    Payments.user_id,
+                    Payments.id,
+                    Payments.payment_method,
+                    Payments.amount,
+                )
+            )
+            payments.update((row.user_id, row) for row in rows)
+
+    return [
+        SeedUser(
+            telegram_id,
+            configs[user_id],
+            payments[user_id].id,
+            payments[user_id].payment_method,
+            payments[user_id].amount,
+        )
+        for user_id, telegram_id in sorted(users.items())
+    ]
+
+
+def _config_row(user_id: int) -> dict[str, Any]:
+    # keys only need the shape of WireGuard keys, nobody connects with them
+    return {
+        "user_id": user_id,
+        "private_key": base64.b64encode(os.urandom(32)).decode(),
+        "public_key": base64.b64encode(os.urandom(32)).decode(),
+        "ip_address": f"10.{user_id >> 16 & 255}.{user_id >> 8 & 255}.{user_id & 255}/32",
+    }
+
+
+class Traffic:
+    """Builds and sends one request of each kind of traffic.
+
+    Requests carry the X-Telegram-Id of a seeded user, so rate limits apply
+    per user as they do in production instead of to one client address.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        users: list[SeedUser],
+        webhook_secret: str,
+        duplicates: float,
+        rng: random.Random,
+    ) -> None:
+        self.client = client
+        self.users = users
+        self.webhook_secret = webhook_secret.encode()
+        self.duplicates = duplicates
+        self.rng = rng
+        self._registrations = iter(range(SEED_TELEGRAM_ID + len(users), 2**62))
+        # recent webhook bodies, resent to exercise the idempotency path
+        self._sent: list[tuple[str, bytes]] = []
+
+    def _user(self) -> SeedUser:
+        return self.rng.choice(self.users)
+
+    async def register(self) -> int:
+        telegram_id = next(self._registrations)
+        return await self.client.request(
+            "POST",
+            "/auth/register",
+            {"content-type": "application/json", "x-telegram-id": str(telegram_id)},
+            json.dumps({"telegram_id": telegram_id}).encode(),
+        )
+
+    async def lookup(self) -> int:
+        user = self._user()
+        return await self.client.request(
+            "GET",
+            f"/users/{user.telegram_id}/profile",
+            {"x-telegram-id": str(user.telegram_id)},
+        )
+
+    async def config(self) -> int:
+        user = self._user()
+        return await self.client.request(
+            "GET",
+            f"/users/{user.telegram_id}/configs/{user.config_id}",
+            {"x-telegram-id": str(user.telegram_id)},
+        )
+
+    async def payment(self) -> int:
+        if self._sent and self.rng.random() < self.duplicates:
+            provider, body = self.rng.choice(self._sent)
+        else:
+            user = self._user()
+            provider = quote(user.payment_method.value)
+            body = json.dumps(
+                {
+                    "event_id": f"loadtest-{uuid.uuid4().hex}",
+                    "payment_id": user.payment_id,
+                    "status": PaymentStatus.paid.value,
+                    "amount": str(user.amount),
+                }
+            ).encode()
+            if len(self._sent) < 1000:
+                self._sent.append((provider, body))
+            else:
+                self._sent[self.rng.randrange(1000)] = (provider, body)
+        signature = hmac.new(self.webhook_secret, body, hashlib.sha256).hexdigest()
+        return await self.client.request(
+            "POST",
+            f"/webhooks/payments/{provider}",
+            {
+                "content-type": "application/json",
+                "x-webhook-signature": f"sha256={signature}",
+            },
+            body,
+        )
+
+
+@dataclass
+class OperationStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def record(self, latency: float, status: int) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def merge(self, other: "OperationStats") -> None:
+        self.latencies.extend(other.latencies)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        # 429s are the rate limiter doing its job, everything else over 399
+        # (and status 0, a request that raised) is a failure
+        limited = self.statuses.get(429, 0)
+        errors = sum(
+            count
+            for status, count in self.statuses.items()
+            if (status >= 400 or status == 0) and status != 429
+        )
+        return {
+            "requests": requests,
+            "errors": errors,
+            "limited": limited,
+            "error_rate": errors / requests if requests else 0.0,
+            "rps": requests / elapsed if elapsed else 0.0,
+            "p50": _percentile(latencies, 0.50) * 1000,
+            "p95": _percentile(latencies, 0.95) * 1000,
+            "p99": _percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+            "statuses": {
+                str(status): count for status, count in sorted(self.statuses.items())
+            },
+        }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class LoadTest:
+    """Sends a weighted mix of traffic for `duration` seconds.
+
+    Without `rate` it is a closed loop: `concurrency` workers each send
+    their next request as soon as the previous one is answered. With `rate`
+    requests start on a fixed schedule and latency counts from the planned
+    start, so a stalled server shows up in the percentiles instead of just
+    slowing the generator down; `concurrency` then caps the requests in
+    flight and schedule slots missed because of it are counted as dropped.
+    """
+
+    def __init__(
+        self,
+        traffic: Traffic,
+        mix: dict[str, float],
+        concurrency: int,
+        duration: float,
+        warmup: float = 0.0,
+        rate: Optional[float] = None,
+    ) -> None:
+        unknown = [name for name in mix if name not in DEFAULT_MIX]
+        if unknown:
+            raise ValueError(f"Unknown traffic {', '.join(unknown)}")
+        self.operations: dict[str, Callable[[], Awaitable[int]]] = {
+            name: getattr(traffic, name) for name, weight in mix.items() if weight > 0
+        }
+        self.weights = [mix[name] for name in self.operations]
+        self.rng = traffic.rng
+        self.concurrency = concurrency
+        self.duration = duration
+        self.warmup = warmup
+        self.rate = rate
+        self.stats = {name: OperationStats() for name in self.operations}
+        self.dropped = 0
+        self._recording = False
+
+    async def run(self) -> dict[str, Any]:
+        if self.warmup:
+            await self._run_for(self.warmup)
+            self.stats = {name: OperationStats() for name in self.operations}
+            self.dropped = 0
+        self._recording = True
+        started = time.perf_counter()
+        await self._run_for(self.duration)
+        elapsed = time.perf_counter() - started
+
+        total = OperationStats()
+        results = {}
+        for name, stats in self.stats.items():
+            results[name] = stats.summary(elapsed)
+            total.merge(stats)
+        results["total"] = total.summary(elapsed)
+        results["total"]["dropped"] = self.dropped
+        return results
+
+    async def _run_for(self, seconds: float) -> None:
+        deadline = time.perf_counter() + seconds
+        if self.rate is None:
+            await asyncio.gather(
+                *(self._worker(deadline) for _ in range(self.concurrency))
+            )
+        else:
+            await self._schedule(deadline)
+
+    async def _send(self, planned: float) -> None:
+        name = self.rng.choices(list(self.operations), self.weights)[0]
+        try:
+            status = await self.operations[name]()
+        except Exception:
+            status = 0
+        self.stats[name].record(time.perf_counter() - planned, status)
+
+    async def _worker(self, deadline: float) -> None:
+        while (now := time.perf_counter()) < deadline:
+            await self._send(now)
+
+    async def _schedule(self, deadline: float) -> None:
+        interval = 1 / self.rate
+        planned = time.perf_counter()
+        in_flight: set[asyncio.Task] = set()
+        while planned < deadline:
+            delay = planned - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.concurrency:
+                self.dropped += 1
+            else:
+                task = asyncio.create_task(self._send(planned))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            planned += interval
+        await asyncio.gather(*in_flight)
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """`register=1,lookup=3` -> {"register": 1.0, "lookup": 3.0}"""
+    mix = {}
+    for part in filter(None, spec.split(",")):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_slos(specs: list[str]) -> dict[str, dict[str, float]]:
+    """Applies `operation.metric=threshold` overrides to DEFAULT_SLOS,
+    e.g. `config.p99=20 total.rps=500`; `operation.metric=` drops one."""
+    slos = {name: dict(thresholds) for name, thresholds in DEFAULT_SLOS.items()}
+    for spec in specs:
+        target, _, threshold = spec.partition("=")
+        operation, _, metric = target.partition(".")
+        if not metric:
+            raise ValueError(f"Expected operation.metric=threshold, got {spec!r}")
+        if threshold:
+            slos.setdefault(operation, {})[metric] = float(threshold)
+        else:
+            slos.get(operation, {}).pop(metric, None)
+    return slos
+
+
+def check_slos(
+    results: dict[str, Any], slos: dict[str, dict[str, float]]
+) -> list[tuple[str, str, float, float, bool]]:
+    """Returns (operation, metric, threshold, value, met) per SLO of an
+    operation that was part of the run."""
+    rows = []
+    for operation, thresholds in slos.items():
+        summary = results.get(operation)
+        if summary is None:
+            continue
+        for metric, threshold in thresholds.items():
+            value = summary[metric]
+            met = value >= threshold if metric in AT_LEAST else value <= threshold
+            rows.append((operation, metric, threshold, value, met))
+    return rows
+
+
+HISTORY_FIELDS = (
+    "created_at",
+    "commit",
+    "target",
+    "operation",
+    "requests",
+    "rps",
+    "p50",
+    "p95",
+    "p99",
+    "max",
+    "error_rate",
+    "slo_met",
+)
+
+
+def append_history(path: str, report: dict[str, Any]) -> None:
+    """One CSV row per operation and run, for plotting runs across commits."""
+    failed = {row[0] for row in report["slos"] if not row[4]}
+    is_new = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, HISTORY_FIELDS, extrasaction="ignore")
+        if is_new:
+            writer.writeheader()
+        for operation, summary in report["results"].items():
+            writer.writerow(
+                {
+                    **summary,
+                    "created_at": report["meta"]["created_at"],
+                    "commit": report["meta"]["commit"],
+                    "target": report["meta"]["load"]["target"],
+                    "operation": operation,
+                    "slo_met": operation not in failed,
+                }
+            )
@@ -0,0 +1,194 @@
+import gc
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+
+@dataclass
+class BenchContext:
+    db_url: Optional[str] = None
+    redis_url: Optional[str] = None
+    resources: dict[str, Any] = field(default_factory=dict)
+    cleanups: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[BenchContext], Awaitable[Optional[Callable]]]
+    # operations performed by one call of the timed function
+    ops: int = 1
+    requires: tuple[str, ...] = ()
+    # also report the peak memory allocated by one call, per operation
+    memory: bool = False
+
+
+_benchmarks: list[Benchmark] = []
+
+
+def benchmark(
+    name: str, ops: int = 1, requires: tuple[str, ...] = (), memory: bool = False
+):
+    """Registers an async setup function returning the callable to time.
+
+    The callable may be sync or async. Returning None skips the benchmark.
+    """
+
+    def decorator(setup):
+        _benchmarks.append(Benchmark(name, setup, ops, requires, memory))
+        return setup
+
+    return decorator
+
+
+def registered() -> list[Benchmark]:
+    return list(_benchmarks)
+
+
+async def _time_once(fn: Callable, number: int, is_async: bool) -> float:
+    started = time.perf_counter_ns()
+    if is_async:
+        for _ in range(number):
+            await fn()
+    else:
+        for _ in range(number):
+            fn()
+    return time.perf_counter_ns() - started
+
+
+async def _calibrate(fn: Callable, is_async: bool, target_ns: int) -> int:
+    number = 1
+    while True:
+        elapsed = await _time_once(fn, number, is_async)
+        if elapsed >= target_ns or number >= 1_000_000:
+            return number
+        number *= 2 if elapsed * 10 > target_ns else 10
+
+
+async def _peak_memory(fn: Callable, is_async: bool) -> int:
+    """Peak bytes allocated while one call runs, results included."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        if is_async:
+            await result
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def run_benchmark(
+    bench: Benchmark, fn: Callable, rounds: int, target_ms: float
+) -> dict[str, Any]:
+    probe = fn()
+    is_async = inspect.isawaitable(probe)
+    if is_async:
+        await probe
+    number = await _calibrate(fn, is_async, int(target_ms * 1_000_000))
+    samples = []
+    for _ in range(rounds):
+        elapsed = await _time_once(fn, number, is_async)
+        samples.append(elapsed / (number * bench.ops))
+    median = statistics.median(samples)
+    result = {
+        "median_ns": median,
+        "min_ns": min(samples),
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1e9 / median if median else None,
+        "rounds": rounds,
+        "number": number,
+        "ops": bench.ops,
+    }
+    if bench.memory:
+        # a separate call: tracing slows allocations down too much to time
+        peak = await _peak_memory(fn, is_async)
+        result["peak_bytes"] = peak
+        result["bytes_per_op"] = peak / bench.ops
+    return result
+
+
+async def run_all(
+    ctx: BenchContext,
+    selected: list[Benchmark],
+    rounds: int,
+    target_ms: float,
+    report: Callable[[str, dict[str, Any]], None],
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    try:
+        for bench in selected:
+            missing = [r for r in bench.requires if not getattr(ctx, r)]
+            if missing:
+                report(
+                    bench.name, {"skipped": f"needs --{missing[0].replace('_', '-')}"}
+                )
+                continue
+            fn = await bench.setup(ctx)
+            if fn is None:
+                report(bench.name, {"skipped": "setup declined"})
+                continue
+            result = await run_benchmark(bench, fn, rounds, target_ms)
+            results[bench.name] = result
+            report(bench.name, result)
+    finally:
+        for cleanup in reversed(ctx.cleanups):
+            await cleanup()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[tuple[str, float, float, float, bool]]:
+    """Returns (name, baseline_ns, current_ns, ratio, regressed) per shared benchmark."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["median_ns"] / base["median_ns"]
+        rows.append(
+            (name, base["median_ns"], result["median_ns"], ratio, ratio > 1 + threshold)
+        )
+    return rows
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(path: str, report: dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,79 @@
+"""In-process replacements for Redis and the SQLAlchemy session.
+
+They let the benchmarks measure the Python side of the hot paths
+(statement building, validation, key generation, (de)serialization)
+on machines without Postgres or Redis.
+"""
+
+from typing import Any, Optional
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._data: dict[str, bytes] = {}
+
+    async def get(self, name: str) -> Optional[bytes]:
+        return self._data.get(name)
+
+    async def set(self, name: str, value: Any, ex: Optional[int] = None, **_) -> bool:
+        self._data[name] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def delete(self, *names: str) -> int:
+        return sum(self._data.pop(name, None) is not None for name in names)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self) -> None:
+        self._data.clear()
+
+
+class ForgetfulRedis(FakeRedis):
+    """Accepts writes but never returns them, so every lookup is a miss."""
+
+    async def get(self, name: str) -> Optional[bytes]:
+        return None
+
+
+class _StubScalars:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def all(self) -> list[Any]:
+        return list(self._rows)
+
+
+class _StubResult:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalar_one(self) -> Any:
+        return self._rows[0]
+
+    def scalar_one_or_none(self) -> Optional[Any]:
+        return self._rows[0] if self._rows else None
+
+    def scalars(self) -> _StubScalars:
+        return _StubScalars(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def all(self) -> list[Any]:
+        return list(self._rows)
+
+
+class StubSession:
+    """Answers every statement with a fixed list of ORM instances."""
+
+    def __init__(self, rows: list[Any]) -> None:
+        self.rows = rows
+        # repositories queue after-commit hooks here; a stub never commits
+        self.info: dict[str, Any] = {}
+
+    async def execute(self, statement: Any, *args, **kwargs) -> _StubResult:
+        return _StubResult(self.rows)
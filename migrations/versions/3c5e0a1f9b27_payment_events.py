@@ -0,0 +1,43 @@
+"""payment events
+
+Revision ID: 3c5e0a1f9b27
+Revises: 86e8ab3c17c8
+Create Date: 2026-10-19 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e0a1f9b27'
+down_revision: Union[str, None] = '86e8ab3c17c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_events',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('provider', postgresql.ENUM('telegram_stars', 'bitcoin', 'sbp', 'card', name='paymentmethod', create_type=False), nullable=False),
+    sa.Column('event_id', sa.String(length=128), nullable=False),
+    sa.Column('payment_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('paid', 'unpaid', name='paymentstatus', create_type=False), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('received_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('outcome', sa.String(length=16), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('provider', 'event_id')
+    )
+    op.create_index('ix_payment_events_unprocessed', 'payment_events', ['id'], unique=False, postgresql_where=sa.text('processed_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payment_events_unprocessed', table_name='payment_events', postgresql_where=sa.text('processed_at IS NULL'))
+    op.drop_table('payment_events')
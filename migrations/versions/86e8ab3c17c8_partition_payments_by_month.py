@@ -0,0 +1,117 @@
+"""partition payments by month
+
+Revision ID: 86e8ab3c17c8
+Revises: f8ddef2e8c6e
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '86e8ab3c17c8'
+down_revision: Union[str, None] = 'f8ddef2e8c6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# partitions created ahead of time; the app keeps this window filled
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, status, payment_method, amount, created_at, updated_at"
+
+CREATE_PARTITIONS = """
+CREATE OR REPLACE FUNCTION payments_create_partitions(first_month date, last_month date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_month)::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- every worker calls this at startup, serialize them
+    PERFORM pg_advisory_xact_lock(hashtext('payments_create_partitions'));
+    WHILE month <= last_month LOOP
+        partition_name := format('payments_p%s', to_char(month, 'YYYYMM'));
+        -- detached partitions keep their name and are not recreated
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF payments FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month, (month + interval '1 month')::date
+            );
+            created := created + 1;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+
+def _payments_columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('payments_id_seq'::regclass)"), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', postgresql.ENUM('paid', 'unpaid', name='paymentstatus', create_type=False), nullable=False),
+        sa.Column('payment_method', postgresql.ENUM('telegram_stars', 'bitcoin', 'sbp', 'card', name='paymentmethod', create_type=False), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # move the heap table aside; index names are schema-wide, rename them too
+    op.rename_table('payments', 'payments_legacy')
+    op.execute('ALTER INDEX payments_pkey RENAME TO payments_legacy_pkey')
+    op.execute('ALTER INDEX ix_payments_status RENAME TO ix_payments_legacy_status')
+    op.execute('ALTER INDEX ix_payments_user_id RENAME TO ix_payments_legacy_user_id')
+
+    op.create_table(
+        'payments',
+        *_payments_columns(),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='payments_pkey'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index(op.f('ix_payments_status'), 'payments', ['status'], unique=False)
+    op.create_index('ix_payments_user_id_created_at', 'payments', ['user_id', 'created_at'], unique=False)
+
+    op.execute(CREATE_PARTITIONS)
+    op.execute(
+        f"""
+        SELECT payments_create_partitions(
+            coalesce((SELECT min(created_at) FROM payments_legacy), now())::date,
+            (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date
+        )
+        """
+    )
+    op.execute(f'INSERT INTO payments ({COLUMNS}) SELECT {COLUMNS} FROM payments_legacy')
+
+    op.execute('ALTER SEQUENCE payments_id_seq OWNED BY payments.id')
+    op.drop_table('payments_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('payments', 'payments_partitioned')
+    op.execute('ALTER INDEX payments_pkey RENAME TO payments_partitioned_pkey')
+    op.execute('ALTER INDEX ix_payments_status RENAME TO ix_payments_partitioned_status')
+
+    op.create_table(
+        'payments',
+        *_payments_columns(),
+        sa.PrimaryKeyConstraint('id', name='payments_pkey'),
+    )
+    op.create_index(op.f('ix_payments_status'), 'payments', ['status'], unique=False)
+    op.create_index(op.f('ix_payments_user_id'), 'payments', ['user_id'], unique=False)
+    # rows of detached partitions are not brought back
+    op.execute(f'INSERT INTO payments ({COLUMNS}) SELECT {COLUMNS} FROM payments_partitioned')
+
+    op.execute('ALTER SEQUENCE payments_id_seq OWNED BY payments.id')
+    op.execute('DROP TABLE payments_partitioned')
+    op.execute('DROP FUNCTION payments_create_partitions(date, date)')
@@ -0,0 +1,79 @@
+"""servers
+
+Revision ID: a7d41c9e2b60
+Revises: 3c5e0a1f9b27
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d41c9e2b60'
+down_revision: Union[str, None] = '3c5e0a1f9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# placement reads every node's load, counting peers for it would scan them all
+COUNT_PEERS = """
+CREATE OR REPLACE FUNCTION wireguard_configs_count_peers()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.server_id IS NOT DISTINCT FROM NEW.server_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.server_id IS NOT NULL THEN
+        UPDATE servers SET peer_count = peer_count - 1 WHERE id = OLD.server_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.server_id IS NOT NULL THEN
+        UPDATE servers SET peer_count = peer_count + 1 WHERE id = NEW.server_id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('servers',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('endpoint', sa.String(length=255), nullable=False),
+    sa.Column('public_key', sa.String(length=44), nullable=False),
+    sa.Column('subnet', postgresql.CIDR(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('peer_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('capacity >= 0', name='servers_capacity_check'),
+    postgresql.ExcludeConstraint((sa.column('subnet'), '&&'), using='gist', name='servers_subnet_excl', ops={'subnet': 'inet_ops'}),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.add_column('wireguard_configs', sa.Column('server_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('wireguard_configs_server_id_fkey', 'wireguard_configs', 'servers', ['server_id'], ['id'], ondelete='RESTRICT')
+    op.create_unique_constraint('wireguard_configs_server_id_ip_address_key', 'wireguard_configs', ['server_id', 'ip_address'])
+    op.create_index('ix_wireguard_configs_server_peers', 'wireguard_configs', ['server_id', 'id'], unique=False, postgresql_include=['public_key', 'ip_address'])
+    op.execute(COUNT_PEERS)
+    op.execute(
+        "CREATE TRIGGER wireguard_configs_count_peers "
+        "AFTER INSERT OR DELETE OR UPDATE OF server_id ON wireguard_configs "
+        "FOR EACH ROW EXECUTE FUNCTION wireguard_configs_count_peers()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER wireguard_configs_count_peers ON wireguard_configs")
+    op.execute("DROP FUNCTION wireguard_configs_count_peers()")
+    op.drop_index('ix_wireguard_configs_server_peers', table_name='wireguard_configs')
+    op.drop_constraint('wireguard_configs_server_id_ip_address_key', 'wireguard_configs', type_='unique')
+    op.drop_constraint('wireguard_configs_server_id_fkey', 'wireguard_configs', type_='foreignkey')
+    op.drop_column('wireguard_configs', 'server_id')
+    op.drop_table('servers')
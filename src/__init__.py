@@ -0,0 +1,4 @@
+import time
+
+# reference point for the startup-time report
+STARTED_AT = time.perf_counter()
@@ -1,40 +1,196 @@
-import uvicorn
-from fastapi import APIRouter, FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from src.api import auth_router
-from src.core.config import config
-
-
-# class App:
-#     routers: list[APIRouter] = [auth_router]
-#
-#     def __init__(self, config) -> None:
-#         self._config = config
-#
-#     def setup_cors(self, application: FastAPI) -> None:
-#         application.add_middleware(
-#             CORSMiddleware,
-#             allow_origins=self._config.api.CORS_ORIGINS,
-#             allow_credentials=self._config.api.CORS_CREDENTIALS,
-#             allow_methods=self._config.api.CORS_METHODS,
-#             allow_headers=self._config.api.CORS_HEADERS,
-#         )
-#
-#     def include_routers(self, application: FastAPI) -> None:
-#         for router in self.routers:
-#             application.include_router(router)
-#
-#     def initialize(self) -> FastAPI:
-#         application = FastAPI()
-#         self.setup_cors(application)
-#         self.include_routers(application)
-#         return application
-
-
-app = FastAPI()
-app.include_router(auth_router)
+import argparse
+import asyncio
+import ipaddress
+import json
+import sys
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from src.server import run
+
+    run()
+    return 0
+
+
+async def _archive_run(args: argparse.Namespace) -> int:
+    from src.core.cache.helper import CacheHelper
+    from src.core.config import config
+    from src.core.database import DBConnection
+    from src.jobs import archive_job
+    from src.utils import setup_logging
+
+    setup_logging()
+    try:
+        job = archive_job(args.table, args.older_than_days, args.run)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"archive run: {e}", file=sys.stderr)
+        return 1
+    if args.batch_size:
+        job.batch_size = args.batch_size
+    # archived payments are dropped from the cached counts
+    await CacheHelper.connect(config.redis.url)
+    try:
+        checkpoint = await job.run(max_batches=args.max_batches)
+    finally:
+        await CacheHelper.disconnect()
+        await DBConnection(config.db.url).dispose()
+    state = "done" if checkpoint.done else "paused"
+    print(
+        f"{checkpoint.rows} rows in {len(checkpoint.parts)} parts ({state}) "
+        f"in {job.directory}"
+    )
+    return 0
+
+
+def _archive_read(args: argparse.Namespace) -> int:
+    from src.jobs import read_archive
+
+    for row in read_archive(args.path, dedupe=not args.no_dedupe):
+        sys.stdout.write(json.dumps(row, separators=(",", ":")) + "\n")
+    return 0
+
+
+async def _export(args: argparse.Namespace) -> int:
+    from src.jobs import export_tables
+
+    results = await export_tables(args.directory, args.tables, args.format)
+    print(f"exported {sum(r.rows for r in results)} rows to {args.directory}")
+    return 0
+
+
+async def _import(args: argparse.Namespace) -> int:
+    from src.jobs import import_tables
+
+    try:
+        results = await import_tables(args.directory, args.tables, args.on_conflict)
+    except ValueError as e:
+        print(f"import: {e}", file=sys.stderr)
+        return 1
+    print(f"imported {sum(r.rows for r in results)} rows from {args.directory}")
+    return 0
+
+
+async def _servers(args: argparse.Namespace) -> int:
+    from src.core.config import config
+    from src.core.database import DBConnection
+    from src.core.utils.uow import UnitOfWork
+    from src.schemes.servers import ServerInsertScheme
+    from src.services import ServerService
+    from src.utils import ServiceError
+
+    service = ServerService(UnitOfWork(kind="write"))
+    try:
+        if args.action == "add":
+            servers = [
+                await service.add(
+                    ServerInsertScheme(
+                        name=args.name,
+                        endpoint=args.endpoint,
+                        public_key=args.public_key,
+                        subnet=args.subnet,
+                        capacity=args.capacity,
+                    )
+                )
+            ]
+        elif args.action == "drain":
+            servers = [await service.drain(args.name)]
+        else:
+            servers = await service.get_all()
+    except ServiceError as e:
+        print(f"servers {args.action}: {e.response_status.value}", file=sys.stderr)
+        return 1
+    finally:
+        await DBConnection(config.db.url).dispose()
+    for server in servers:
+        state = "active" if server.is_active else "draining"
+        print(
+            f"{server.id}\t{server.name}\t{server.endpoint}\t{server.subnet}\t"
+            f"{server.peer_count}/{server.capacity}\t{state}"
+        )
+    return 0
+
+
+def main() -> int:
+    from src.jobs import SOURCES, TABLES
+
+    parser = argparse.ArgumentParser(prog="python -m src")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("serve", help="run the API server (default)")
+
+    archive = commands.add_parser("archive", help="move cold rows to archive files")
+    archive_commands = archive.add_subparsers(dest="action", required=True)
+    run = archive_commands.add_parser(
+        "run", help="archive (or resume archiving) a table"
+    )
+    run.add_argument("table", choices=tuple(SOURCES))
+    run.add_argument(
+        "--older-than-days",
+        type=int,
+        help="cutoff of a new run; an unfinished run resumes with its own",
+    )
+    run.add_argument("--run", help="resume this run (a directory under the table's)")
+    run.add_argument(
+        "--batch-size", type=int, help="rows per batch (ARCHIVE_BATCH_SIZE)"
+    )
+    run.add_argument(
+        "--max-batches", type=int, help="stop after N batches, resume later"
+    )
+    read = archive_commands.add_parser("read", help="stream an archive as NDJSON")
+    read.add_argument("path", help="archive directory or a single part file")
+    read.add_argument("--no-dedupe", action="store_true")
+
+    export = commands.add_parser("export", help="COPY tables out to files")
+    export.add_argument("directory")
+    export.add_argument("--format", choices=("binary", "csv"), default="binary")
+    export.add_argument(
+        "--tables", nargs="+", choices=list(TABLES), default=list(TABLES)
+    )
+
+    import_ = commands.add_parser("import", help="COPY an export back in")
+    import_.add_argument("directory")
+    import_.add_argument(
+        "--on-conflict",
+        choices=("skip", "update"),
+        default="skip",
+        help="keep existing rows on any conflict, or overwrite them by primary "
+        "key (other unique conflicts abort the table)",
+    )
+    import_.add_argument(
+        "--tables", nargs="+", choices=list(TABLES), default=list(TABLES)
+    )
+
+    servers = commands.add_parser("servers", help="manage the WireGuard nodes")
+    server_commands = servers.add_subparsers(dest="action", required=True)
+    add = server_commands.add_parser("add", help="add a node, peers rebalance onto it")
+    add.add_argument("name")
+    add.add_argument("--endpoint", required=True, help="host:port peers connect to")
+    add.add_argument("--public-key", required=True)
+    add.add_argument(
+        "--subnet",
+        type=ipaddress.IPv4Network,
+        required=True,
+        help="peer addresses, e.g. 10.1.0.0/16",
+    )
+    add.add_argument("--capacity", type=int, required=True, help="peers it can hold")
+    drain = server_commands.add_parser("drain", help="move every peer off a node")
+    drain.add_argument("name")
+    server_commands.add_parser("list", help="nodes with their peers and capacity")
+
+    args = parser.parse_args()
+    if args.command in (None, "serve"):
+        return _serve(args)
+    if args.command == "export":
+        return asyncio.run(_export(args))
+    if args.command == "import":
+        return asyncio.run(_import(args))
+    if args.command == "servers":
+        return asyncio.run(_servers(args))
+
+    if args.action == "run":
+        return asyncio.run(_archive_run(args))
+    return _archive_read(args)
 
 
 if __name__ == "__main__":
-    uvicorn.run("src.__main__:app", reload=True, host="0.0.0.0")
+    sys.exit(main())
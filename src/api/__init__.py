@@ -1,3 +1,17 @@
+from .admin_router import router as admin_router
 from .auth_router import router as auth_router
+from .config_router import router as config_router
+from .metrics_router import router as metrics_router
+from .server_router import router as server_router
+from .user_router import router as user_router
+from .webhook_router import router as webhook_router
 
-__all__ = ["auth_router"]
+__all__ = [
+    "admin_router",
+    "auth_router",
+    "config_router",
+    "metrics_router",
+    "server_router",
+    "user_router",
+    "webhook_router",
+]
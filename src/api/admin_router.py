@@ -0,0 +1,90 @@
+import hmac
+from typing import Annotated, Any, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.core.config import config, reloader
+from src.core.diagnostics import GroupBy, MemorySnapshots, dump_tasks, profile
+from src.utils import ForbiddenError
+
+
+def require_admin(x_admin_token: Annotated[Optional[str], Header()] = None) -> None:
+    token = config.admin.ADMIN_TOKEN
+    if not token or not x_admin_token:
+        raise ForbiddenError
+    if not hmac.compare_digest(token.encode(), x_admin_token.encode()):
+        raise ForbiddenError
+
+
+# every endpoint answers for the worker that serves the request only
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)]
+)
+
+memory = MemorySnapshots(frames=config.admin.ADMIN_TRACEMALLOC_FRAMES)
+reloader.bind("admin.ADMIN_TRACEMALLOC_FRAMES", memory, "frames")
+reloader.live("admin.ADMIN_TOKEN")
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def take_profile(
+    seconds: Annotated[
+        float, Query(gt=0, le=config.admin.ADMIN_PROFILE_MAX_SECONDS)
+    ] = 10.0,
+    interval: Annotated[
+        float, Query(ge=0.001, le=1.0)
+    ] = config.admin.ADMIN_PROFILE_INTERVAL,
+) -> PlainTextResponse:
+    """Samples the worker for `seconds`; the body is collapsed stacks for
+    flamegraph.pl or speedscope."""
+    profiler = await profile(seconds, interval)
+    return PlainTextResponse(
+        profiler.collapsed(), headers={"X-Profile-Samples": str(profiler.samples)}
+    )
+
+
+@router.post("/memory/snapshot")
+async def take_memory_snapshot(
+    group_by: GroupBy = "lineno",
+    limit: Annotated[int, Query(ge=1, le=500)] = 25,
+) -> dict[str, Any]:
+    """Starts tracemalloc if needed and makes a new baseline for /diff."""
+    return await memory.snapshot(group_by, limit)
+
+
+@router.get("/memory/diff")
+async def diff_memory(
+    group_by: GroupBy = "lineno",
+    limit: Annotated[int, Query(ge=1, le=500)] = 25,
+) -> dict[str, Any]:
+    return await memory.diff(group_by, limit)
+
+
+@router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_memory_tracing() -> Response:
+    memory.stop()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/tasks", response_class=PlainTextResponse)
+async def get_tasks(
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+) -> str:
+    return dump_tasks(limit)
+
+
+@router.post("/config/reload")
+async def reload_config() -> JSONResponse:
+    """Re-reads the settings and applies the live ones; the report lists
+    the changes that wait for a restart. Invalid settings change nothing
+    and are answered with 422."""
+    report = await reloader.reload()
+    return JSONResponse(
+        report.as_dict(),
+        status_code=(
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+            if report.errors
+            else status.HTTP_200_OK
+        ),
+    )
@@ -0,0 +1,46 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Response, status
+
+from src.core.utils.uow import UnitOfWork
+from src.schemes.configs import ConfigCreateScheme, ConfigPublicScheme
+from src.services import ConfigService
+
+
+router = APIRouter(tags=["Configs"])
+
+
+def get_config_service() -> ConfigService:
+    return ConfigService(UnitOfWork(kind="read"))
+
+
+def get_config_writer() -> ConfigService:
+    return ConfigService(UnitOfWork(kind="write"))
+
+
+@router.get("/users/{telegram_id}/configs/{config_id}", response_class=Response)
+async def download_config(
+    telegram_id: int,
+    config_id: int,
+    service: Annotated[ConfigService, Depends(get_config_service)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    download = await service.download(telegram_id, config_id, if_none_match)
+    headers = {
+        "ETag": download.etag,
+        # clients may keep a copy but must revalidate it
+        "Cache-Control": "private, no-cache",
+    }
+    if download.body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="wg{config_id}.conf"'
+    return Response(download.body, media_type="text/plain", headers=headers)
+
+
+@router.post("/users/{telegram_id}/configs", status_code=status.HTTP_201_CREATED)
+async def create_config(
+    telegram_id: int,
+    data: ConfigCreateScheme,
+    service: Annotated[ConfigService, Depends(get_config_writer)],
+) -> ConfigPublicScheme:
+    return await service.create(telegram_id, data)
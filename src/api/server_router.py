@@ -0,0 +1,38 @@
+import hmac
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+
+from src.core.config import config, reloader
+from src.core.utils.uow import UnitOfWork
+from src.schemes.servers import ServerPeersScheme
+from src.services import ServerService
+from src.utils import ForbiddenError
+
+
+def require_sync_token(x_sync_token: Annotated[Optional[str], Header()] = None) -> None:
+    token = config.placement.PLACEMENT_SYNC_TOKEN
+    if not token or not x_sync_token:
+        raise ForbiddenError
+    if not hmac.compare_digest(token.encode(), x_sync_token.encode()):
+        raise ForbiddenError
+
+
+reloader.live("placement.PLACEMENT_SYNC_TOKEN")
+
+router = APIRouter(tags=["Servers"], dependencies=[Depends(require_sync_token)])
+
+
+def get_server_service() -> ServerService:
+    return ServerService(UnitOfWork(kind="read"))
+
+
+@router.get("/servers/{server_id}/peers")
+async def get_peers(
+    server_id: int,
+    service: Annotated[ServerService, Depends(get_server_service)],
+    after: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=5000)] = 1000,
+) -> ServerPeersScheme:
+    """A node's peers by id; a sync pages through them with `after`."""
+    return await service.peers(server_id, after, limit)
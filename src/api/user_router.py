@@ -0,0 +1,23 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from src.core.utils.uow import UnitOfWork
+from src.schemes.users import UserProfileScheme
+from src.services import UserService
+
+
+router = APIRouter(tags=["Users"])
+
+
+def get_user_service() -> UserService:
+    return UserService(UnitOfWork(kind="read"))
+
+
+@router.get("/users/{telegram_id}/profile")
+async def get_profile(
+    telegram_id: int,
+    service: Annotated[UserService, Depends(get_user_service)],
+    payments: Annotated[int, Query(ge=0, le=100)] = 10,
+) -> UserProfileScheme:
+    return await service.profile(telegram_id, payments)
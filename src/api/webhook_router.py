@@ -0,0 +1,29 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Request, status
+
+from src.core.admission import Priority
+from src.core.utils.uow import UnitOfWork
+from src.models import PaymentMethod
+from src.schemes.payments import PaymentWebhookAckScheme
+from src.services import PaymentWebhookService
+
+
+router = APIRouter(tags=["Webhooks"])
+
+
+def get_payment_webhook_service() -> PaymentWebhookService:
+    # payment confirmations are the last work to be shed under load
+    return PaymentWebhookService(UnitOfWork(kind="write", priority=Priority.CRITICAL))
+
+
+@router.post("/webhooks/payments/{provider}", status_code=status.HTTP_202_ACCEPTED)
+async def payment_webhook(
+    provider: PaymentMethod,
+    request: Request,
+    service: Annotated[PaymentWebhookService, Depends(get_payment_webhook_service)],
+    x_webhook_signature: Annotated[Optional[str], Header()] = None,
+) -> PaymentWebhookAckScheme:
+    # the signature covers the raw bytes, not a re-serialized body
+    body = await request.body()
+    return await service.ingest(provider, body, x_webhook_signature)
@@ -0,0 +1,188 @@
+import asyncio
+import importlib
+import signal
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from fastapi import APIRouter, FastAPI
+
+import src
+from src.core.cache.helper import CacheHelper
+from src.core.config import config, reloader
+from src.core.coordination import LeaderElection, LeaseLost, check_fence
+from src.core.database import DBConnection
+from src.core.metrics import registry
+from src.core.middlewares import RateLimitMiddleware, TimingMiddleware
+from src.utils import get_logger, setup_logging, shutdown_logging
+from src.utils.service_errors import create_exception_handlers
+
+
+logger = get_logger().getChild(__name__)
+
+# imported when the application is built, not when this module is imported
+ROUTERS = (
+    "src.api.admin_router:router",
+    "src.api.auth_router:router",
+    "src.api.config_router:router",
+    "src.api.metrics_router:router",
+    "src.api.server_router:router",
+    "src.api.user_router:router",
+    "src.api.webhook_router:router",
+)
+
+reloader.live("db.DB_PARTITION_MONTHS_AHEAD")
+
+startup_seconds = registry.gauge(
+    "app_startup_seconds", "Duration of each startup phase", labels=("phase",)
+)
+
+
+class StartupReport:
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.phases: dict[str, float] = {}
+
+    def mark(self, name: str, since: float) -> None:
+        self.phases[name] = time.perf_counter() - since
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, started)
+
+    def finish(self) -> None:
+        self.mark("total", self.started)
+        for name, seconds in self.phases.items():
+            startup_seconds.set(seconds, phase=name)
+        logger.info(
+            "Startup finished in %.1f ms (%s)",
+            self.phases["total"] * 1000,
+            ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in self.phases.items()),
+            extra={
+                "startup_ms": {k: round(v * 1000, 2) for k, v in self.phases.items()}
+            },
+        )
+
+
+def _import_router(path: str) -> APIRouter:
+    module, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _warm_up_schemes() -> None:
+    from src.repositories import (
+        ConfigRepository,
+        PaymentEventRepository,
+        PaymentRepository,
+        UserRepository,
+    )
+
+    for repository in (
+        UserRepository,
+        PaymentRepository,
+        PaymentEventRepository,
+        ConfigRepository,
+    ):
+        repository.warm_up()
+
+
+MAINTENANCE = "maintenance"
+
+
+async def _maintain_partitions(fencing_token: int, interval: float = 12 * 3600) -> None:
+    from src.repositories import PaymentRepository
+
+    while True:
+        try:
+            await check_fence(MAINTENANCE, fencing_token)
+            # looked up every time, a reload may have replaced the engine
+            async with DBConnection(config.db.url).engine.begin() as connection:
+                await PaymentRepository.partitions.ensure(
+                    connection, config.db.DB_PARTITION_MONTHS_AHEAD
+                )
+        except LeaseLost:
+            raise
+        except Exception as e:
+            logger.error("Failed to create payment partitions: %s", e)
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    report: StartupReport = application.state.startup_report
+
+    with report.phase("db_pool"):
+        try:
+            await DBConnection(config.db.url).warm_up()
+        except Exception as e:
+            # the pool reconnects lazily, requests get DataFetchError meanwhile
+            logger.error("Failed to warm up the DB pool: %s", e)
+
+    with report.phase("redis"):
+        # an unreachable Redis only opens the breaker, the health check
+        # closes it again once the server is back
+        await CacheHelper.connect(
+            config.redis.url, max_connections=config.redis.REDIS_MAX_CONNECTIONS
+        )
+
+    with report.phase("schemes"):
+        _warm_up_schemes()
+
+    report.finish()
+
+    # maintenance runs on one replica at a time, off the startup path
+    maintenance = LeaderElection(MAINTENANCE, ttl=config.coordination.COORDINATION_TTL)
+    maintenance_task = asyncio.create_task(maintenance.run(_maintain_partitions))
+    # every replica drains stored payment webhooks
+    from src.jobs import payment_event_processor, rebalancer
+
+    events_task = asyncio.create_task(payment_event_processor.run())
+    # peers move between nodes from one replica
+    rebalance = LeaderElection(
+        rebalancer.ELECTION, ttl=config.coordination.COORDINATION_TTL
+    )
+    rebalance_task = asyncio.create_task(rebalance.run(rebalancer.run))
+
+    # SIGHUP reloads this worker's settings; uvicorn's supervisor restarts
+    # its workers on SIGHUP, so with --workers send it to the workers
+    sighup = getattr(signal, "SIGHUP", None)
+    loop = asyncio.get_running_loop()
+    if sighup is not None:
+        loop.add_signal_handler(sighup, reloader.reload_soon)
+
+    yield
+
+    logger.info("Shutting down")
+    if sighup is not None:
+        loop.remove_signal_handler(sighup)
+    tasks = (maintenance_task, events_task, rebalance_task)
+    for task in tasks:
+        task.cancel()
+    # lets the leaders release their leases while Redis is still connected
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await CacheHelper.disconnect()
+    if DBConnection.instance is not None:
+        await DBConnection.instance.dispose()
+        DBConnection.reset()
+    shutdown_logging()
+
+
+def create_app() -> FastAPI:
+    setup_logging()
+    report = StartupReport(src.STARTED_AT)
+    report.mark("imports", src.STARTED_AT)
+
+    with report.phase("routers"):
+        application = FastAPI(lifespan=lifespan)
+        application.add_middleware(RateLimitMiddleware)
+        application.add_middleware(TimingMiddleware)
+        create_exception_handlers(application)
+        for router in ROUTERS:
+            application.include_router(_import_router(router))
+
+    application.state.startup_report = report
+    return application
@@ -0,0 +1,15 @@
+from .controller import (
+    AdmissionController,
+    AdmissionGate,
+    Priority,
+    UoWKind,
+    admission,
+)
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionGate",
+    "Priority",
+    "UoWKind",
+    "admission",
+]
@@ -0,0 +1,201 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Literal
+
+from src.core.config import config, reloader
+from src.core.metrics import registry, track
+from src.utils import DataFetchError, get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+UoWKind = Literal["read", "write"]
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first."""
+
+    CRITICAL = 0  # payment webhooks
+    DEFAULT = 1
+    BULK = 2  # exports, archival, large listings
+
+
+queue_depth = registry.gauge(
+    "uow_admission_queue_depth",
+    "Units of work waiting for a slot",
+    labels=("kind", "priority"),
+)
+in_flight = registry.gauge(
+    "uow_admission_in_flight",
+    "Units of work holding a slot",
+    labels=("kind",),
+)
+wait_seconds = registry.histogram(
+    "uow_admission_wait_seconds",
+    "Time spent waiting for a slot",
+    labels=("kind",),
+)
+rejected = registry.counter(
+    "uow_admission_rejected_total",
+    "Units of work shed by admission control",
+    labels=("kind", "priority", "reason"),
+)
+
+
+class AdmissionGate:
+    """Bounded concurrency with a priority-ordered wait queue.
+
+    A released slot is handed straight to the best waiter (lowest priority
+    value, then FIFO), so new arrivals never overtake the queue. Waiters give
+    up after `queue_timeout` seconds. Once `max_queue` requests are waiting a
+    newcomer either evicts a lower-priority waiter or is rejected at once.
+    """
+
+    def __init__(
+        self, kind: UoWKind, limit: int, queue_timeout: float, max_queue: int
+    ) -> None:
+        self.kind = kind
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.in_use = 0
+        self.waiting = 0
+        # (priority, arrival, future); futures of abandoned waiters stay in
+        # the heap until release() pops them
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority: Priority = Priority.DEFAULT) -> None:
+        if self.in_use < self.limit and not self.waiting:
+            self.in_use += 1
+            in_flight.inc(kind=self.kind)
+            return
+        if self.waiting >= self.max_queue and not self._evict_below(priority):
+            self._reject(priority, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        self.waiting += 1
+        queue_depth.inc(kind=self.kind, priority=priority.name.lower())
+        started = time.perf_counter()
+        try:
+            with track("admission"):
+                await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(priority, "timeout")
+        except DataFetchError:
+            # pushed out of a full queue by a more important request
+            rejected.inc(
+                kind=self.kind, priority=priority.name.lower(), reason="evicted"
+            )
+            raise
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just as the caller went away
+                self.release()
+            raise
+        finally:
+            self.waiting -= 1
+            queue_depth.dec(kind=self.kind, priority=priority.name.lower())
+            wait_seconds.observe(time.perf_counter() - started, kind=self.kind)
+
+    def release(self) -> None:
+        # over a lowered limit the slot is given up instead of handed over
+        if self.in_use <= self.limit and self._hand_over():
+            return
+        self.in_use -= 1
+        in_flight.dec(kind=self.kind)
+
+    def resize(self, limit: int) -> None:
+        """Changes the limit; new slots go to waiters at once, slots over a
+        lower limit are given up as they are released."""
+        self.limit = limit
+        while self.in_use < limit and self._hand_over():
+            self.in_use += 1
+            in_flight.inc(kind=self.kind)
+
+    def _hand_over(self) -> bool:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    def _evict_below(self, priority: Priority) -> bool:
+        """Fails the latest waiter of the lowest priority class if it ranks
+        below `priority`, making room in a full queue."""
+        live = [entry for entry in self._waiters if not entry[2].done()]
+        if not live:
+            return False
+        victim = max(live, key=lambda entry: entry[:2])
+        if victim[0] <= priority:
+            return False
+        victim[2].set_exception(DataFetchError())
+        return True
+
+    def _reject(self, priority: Priority, reason: str) -> None:
+        rejected.inc(kind=self.kind, priority=priority.name.lower(), reason=reason)
+        logger.warning(
+            "Shedding %s unit of work (%s): %d in use, %d waiting",
+            self.kind,
+            reason,
+            self.in_use,
+            self.waiting,
+        )
+        raise DataFetchError
+
+
+class AdmissionController:
+    def __init__(self, enabled: bool, gates: dict[UoWKind, AdmissionGate]) -> None:
+        self.enabled = enabled
+        self.gates = gates
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdmissionController":
+        def gate(kind: UoWKind, limit: int) -> AdmissionGate:
+            return AdmissionGate(
+                kind,
+                limit,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+                max_queue=settings.ADMISSION_MAX_QUEUE,
+            )
+
+        return cls(
+            settings.ADMISSION_ENABLED,
+            {
+                "read": gate("read", settings.ADMISSION_READ_LIMIT),
+                "write": gate("write", settings.ADMISSION_WRITE_LIMIT),
+            },
+        )
+
+    def configure(self, settings) -> None:
+        self.enabled = settings.ADMISSION_ENABLED
+        for kind, limit in (
+            ("read", settings.ADMISSION_READ_LIMIT),
+            ("write", settings.ADMISSION_WRITE_LIMIT),
+        ):
+            gate = self.gates[kind]
+            gate.queue_timeout = settings.ADMISSION_QUEUE_TIMEOUT
+            gate.max_queue = settings.ADMISSION_MAX_QUEUE
+            gate.resize(limit)
+
+    async def acquire(self, kind: UoWKind, priority: Priority) -> bool:
+        """Waits for a slot; returns whether one has to be released."""
+        if not self.enabled:
+            return False
+        await self.gates[kind].acquire(priority)
+        return True
+
+    def release(self, kind: UoWKind) -> None:
+        self.gates[kind].release()
+
+
+admission = AdmissionController.from_settings(config.admission)
+reloader.on_change(
+    [f"admission.{name}" for name in type(config.admission).model_fields],
+    lambda: admission.configure(config.admission),
+)
@@ -0,0 +1,87 @@
+import time
+from enum import IntEnum
+
+from src.core.metrics import registry
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+
+class BreakerState(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+transitions = registry.counter(
+    "cache_circuit_transitions_total",
+    "Redis circuit breaker state changes",
+    labels=("name", "state"),
+)
+
+
+class CircuitBreaker:
+    """Counts consecutive failures and fails fast once `failure_threshold` is hit.
+
+    After `open_seconds` the breaker goes half-open and lets one call
+    through every `probe_interval` seconds: a success closes it, a failure
+    opens it again. Probes are time based, so callers that never report
+    back cannot wedge the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        open_seconds: float,
+        probe_interval: float,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.probe_interval = probe_interval
+        self.state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._next_probe_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state is BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state is BreakerState.OPEN:
+            if now - self._opened_at < self.open_seconds:
+                return False
+            self._set_state(BreakerState.HALF_OPEN)
+        if now >= self._next_probe_at:
+            self._next_probe_at = now + self.probe_interval
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state is not BreakerState.CLOSED:
+            self._set_state(BreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state is BreakerState.HALF_OPEN or (
+            self.state is BreakerState.CLOSED
+            and self._failures >= self.failure_threshold
+        ):
+            self.trip()
+
+    def trip(self) -> None:
+        self._opened_at = time.monotonic()
+        if self.state is not BreakerState.OPEN:
+            self._set_state(BreakerState.OPEN)
+
+    def reset(self) -> None:
+        self._failures = 0
+        self.state = BreakerState.CLOSED
+
+    def _set_state(self, state: BreakerState) -> None:
+        logger.warning("Circuit %s: %s -> %s", self.name, self.state.name, state.name)
+        self.state = state
+        transitions.inc(name=self.name, state=state.name.lower())
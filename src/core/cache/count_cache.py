@@ -0,0 +1,92 @@
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.core.cache.helper import CacheHelper
+from src.core.metrics import registry, track
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+lookups = registry.counter(
+    "count_cache_lookups_total",
+    "Cached row count lookups",
+    labels=("table", "result"),
+)
+
+
+class CountCache:
+    """Row counts of one table, by filters.
+
+    Every committed write bumps the table's generation, and counts are
+    stored in a hash per generation. A count read concurrently with a write
+    is filed under the generation it started in, which nobody reads any
+    more, so it can't outlive the write.
+    """
+
+    def __init__(self, table: str, ttl: int) -> None:
+        self.table = table
+        self.ttl = ttl
+        self._generation_key = f"count:{table}:generation"
+
+    def _key(self, generation: int) -> str:
+        return f"count:{self.table}:{generation}"
+
+    async def generation(self) -> Optional[int]:
+        """The current generation, or None while Redis is unavailable."""
+        client = CacheHelper.get_client()
+        if client is None:
+            return None
+        try:
+            with track("cache"):
+                value = await client.get(self._generation_key)
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Count cache read failed: %s", e)
+            return None
+        CacheHelper.report_success()
+        return int(value or 0)
+
+    async def get(self, generation: int, filters: str) -> Optional[int]:
+        client = CacheHelper.get_client()
+        if client is None:
+            return None
+        try:
+            with track("cache"):
+                value = await client.hget(self._key(generation), filters)
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Count cache read failed: %s", e)
+            return None
+        if value is None:
+            lookups.inc(table=self.table, result="miss")
+            return None
+        lookups.inc(table=self.table, result="hit")
+        return int(value)
+
+    async def set(self, generation: int, filters: str, count: int) -> None:
+        client = CacheHelper.get_client()
+        if client is None:
+            return
+        key = self._key(generation)
+        try:
+            with track("cache"):
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.hset(key, filters, count)
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Count cache write failed: %s", e)
+
+    async def invalidate(self) -> None:
+        client = CacheHelper.get_client()
+        if client is None:
+            return
+        try:
+            with track("cache"):
+                await client.incr(self._generation_key)
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Count cache invalidation failed: %s", e)
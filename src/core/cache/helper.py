@@ -1,9 +1,14 @@
+import asyncio
 import json
+import os
+from src.core.cache.breaker import CircuitBreaker
+from src.core.cache.keys import KeyBuilder
+from src.core.config import config, reloader
+from src.core.metrics import registry, track
 from src.utils import get_logger
-import hashlib
 from functools import wraps
-from typing import Callable, Optional, ParamSpec, TypeVar, Awaitable
-from redis.asyncio import Redis, ConnectionPool
+from typing import Callable, Optional, ParamSpec, Sequence, TypeVar, Awaitable
+from redis.asyncio import BlockingConnectionPool, Redis
 from redis.exceptions import RedisError, ConnectionError, TimeoutError
 
 # Configure logger
@@ -14,9 +19,19 @@ T = TypeVar("T")
 
 
 class CacheHelper:
-    _pool: Optional[ConnectionPool] = None
-    _client: Optional[Redis.connection] = None
+    _pool: Optional[BlockingConnectionPool] = None
+    _client: Optional[Redis] = None
     _initialized = False
+    _health_task: Optional[asyncio.Task] = None
+    _url: Optional[str] = None
+    # replaced pools, closed once their commands are done
+    _retiring: set[asyncio.Task] = set()
+    breaker = CircuitBreaker(
+        "redis",
+        failure_threshold=config.redis.REDIS_BREAKER_THRESHOLD,
+        open_seconds=config.redis.REDIS_BREAKER_OPEN_SECONDS,
+        probe_interval=config.redis.REDIS_BREAKER_PROBE_INTERVAL,
+    )
 
     @classmethod
     async def connect(cls, url: str, max_connections: int = 10) -> None:
@@ -24,89 +39,199 @@ class CacheHelper:
             logger.warning("Attempted to reconnect to Redis")
             return
 
+        settings = config.redis
+        cls._url = url
+        cls._pool = cls._create_pool(url, max_connections)
+        cls._client = Redis(connection_pool=cls._pool)
+        cls._initialized = True
+        cls.breaker.reset()
+        cls._health_task = asyncio.create_task(
+            cls._health_check(settings.REDIS_HEALTH_CHECK_INTERVAL)
+        )
+
         try:
-            cls._pool = Redis.from_url(
-                url, max_connections=max_connections
-            ).connection_pool
-            cls._client = Redis(connection_pool=cls._pool)
-            cls._initialized = True
+            await cls._client.ping()
             logger.info("Successfully connected to Redis")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}", exc_info=True)
-            raise
+        except (RedisError, OSError) as e:
+            # keep the client: the health check closes the breaker once
+            # Redis is reachable, until then callers skip the cache
+            cls.breaker.trip()
+            logger.error("Failed to connect to Redis: %s", e)
+
+    @staticmethod
+    def _create_pool(url: str, max_connections: int) -> BlockingConnectionPool:
+        settings = config.redis
+        return BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        )
 
     @classmethod
     async def disconnect(cls) -> None:
+        if cls._health_task is not None:
+            cls._health_task.cancel()
+            cls._health_task = None
+        # cancelling closes the replaced pools right away
+        retiring = list(cls._retiring)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
         if cls._client:
             try:
-                await cls._client.aclose()
+                await cls._client.aclose(close_connection_pool=True)
                 logger.info("Redis connection closed")
             except Exception as e:
-                logger.error(f"Failed to close Redis connection: {e}")
+                logger.error("Failed to close Redis connection: %s", e)
             finally:
                 cls._client = None
                 cls._pool = None
                 cls._initialized = False
 
     @classmethod
-    def _generate_key(cls, func_name: str, args: tuple, kwargs: dict) -> str:
-        try:
-            # Normalize kwargs for stable order
-            sorted_kwargs = sorted(kwargs.items())
+    def get_client(cls) -> Optional[Redis]:
+        """Returns the client, or None while Redis is unavailable.
+
+        Callers should report the outcome through `report_success` /
+        `report_failure` so the breaker tracks Redis health.
+        """
+        if not cls._initialized or not cls.breaker.allow():
+            return None
+        return cls._client
+
+    @classmethod
+    def report_success(cls) -> None:
+        cls.breaker.record_success()
+
+    @classmethod
+    def report_failure(cls) -> None:
+        cls.breaker.record_failure()
+
+    @classmethod
+    def report_error(cls, error: BaseException) -> None:
+        """Reports a failed Redis call: connection problems and timeouts
+        count against the breaker, command errors (a reachable Redis
+        refusing a command) don't."""
+        if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+            cls.breaker.record_failure()
+
+    @classmethod
+    async def _health_check(cls, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            client = cls._client
+            if client is None:
+                return
+            try:
+                await client.ping()
+                cls.breaker.record_success()
+            except (RedisError, OSError) as e:
+                logger.warning("Redis health check failed: %s", e)
+                cls.breaker.record_failure()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Redis health check error: %s", e, exc_info=True)
+
+    @classmethod
+    async def _apply_pool_settings(cls) -> None:
+        """Moves the client to a pool built from the current settings.
 
-            # Create hash of arguments for key uniqueness
-            args_hash = hashlib.sha256(
-                json.dumps((args, sorted_kwargs), default=str).encode()
-            ).hexdigest()
+        The old pool is closed once commands already waiting or running on
+        it had their pool and socket timeouts to finish.
+        """
+        old = cls._pool
+        if old is None:
+            return
+        cls._pool = cls._create_pool(cls._url, config.redis.REDIS_MAX_CONNECTIONS)
+        cls._client = Redis(connection_pool=cls._pool)
+        grace = (old.timeout or 0) + (old.connection_kwargs.get("socket_timeout") or 0)
+        task = asyncio.create_task(cls._close_later(old, grace))
+        cls._retiring.add(task)
+        task.add_done_callback(cls._retiring.discard)
+
+    @staticmethod
+    async def _close_later(pool: BlockingConnectionPool, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            await pool.aclose()
 
-            key = f"{func_name}:{args_hash}"
-            return key[:200]  # Limit key length (max 200 characters)
-        except Exception as e:
-            logger.error(f"Failed to generate cache key: {e}", exc_info=True)
-            raise
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        # never share the parent's sockets; the child reconnects on startup
+        cls._client = None
+        cls._pool = None
+        cls._initialized = False
+        cls._health_task = None
+        cls._retiring = set()
+        cls.breaker.reset()
 
     @classmethod
     def cache(
-        cls, ttl: int = 3600, prefix: str = "cache"
+        cls,
+        ttl: int = 3600,
+        prefix: str = "cache",
+        key: Optional[Sequence[str]] = None,
+        version: int = 1,
     ) -> Callable[[Callable[P, T]], Callable[P, Awaitable[T]]]:
+        """Caches JSON-serializable results in Redis.
+
+        `key` picks the arguments that identify a result (default: all but
+        `self`/`cls`) and `version` is bumped when the result's shape
+        changes; see KeyBuilder.
+        """
+
         def decorator(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+            build_key = KeyBuilder(
+                func, f"{prefix}:{config.redis.REDIS_CACHE_VERSION}", key, version
+            )
+
             @wraps(func)
             async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
                 if not cls._initialized or cls._client is None:
                     logger.warning("Caching unavailable: Redis client not initialized")
                     return await func(*args, **kwargs)
 
-                key = f"{prefix}:{func.__module__}.{func.__name__}"
+                # breaker open: go straight to the function, no timeouts paid
+                client = cls.get_client()
+                if client is None:
+                    return await func(*args, **kwargs)
 
                 try:
-                    # Generate unique key
-                    key = cls._generate_key(
-                        f"{prefix}:{func.__module__}.{func.__name__}", args, kwargs
-                    )
+                    key = build_key(args, kwargs)
                 except Exception as e:
-                    logger.error(f"Failed to generate cache key: {e}")
+                    logger.error("Failed to generate cache key: %s", e)
                     return await func(*args, **kwargs)
 
                 try:
                     # Try to get data from cache
-                    cached_value = await cls._client.get(key)
+                    with track("cache"):
+                        cached_value = await client.get(key)
+                    cls.report_success()
 
                     if cached_value is not None:
                         try:
                             data = json.loads(cached_value)
-                            logger.debug(f"Cache hit for key: {key}")
+                            logger.debug("Cache hit for key: %s", key)
                             return data
                         except json.JSONDecodeError as je:
-                            logger.error(f"Failed to decode JSON for key {key}: {je}")
-                            await cls._client.delete(key)  # Remove corrupted cache
+                            logger.error(
+                                "Failed to decode JSON for key %s: %s", key, je
+                            )
+                            await client.delete(key)  # Remove corrupted cache
 
                 except (ConnectionError, TimeoutError) as re:
-                    logger.error(f"Redis connection error: {re}")
+                    logger.error("Redis connection error: %s", re)
+                    cls.report_failure()
+                    client = None  # don't pay the timeout again on set
                 except RedisError as re:
-                    logger.error(f"Redis operation error: {re}")
+                    logger.error("Redis operation error: %s", re)
                 except Exception as e:
                     logger.error(
-                        f"Unexpected error during Redis operation: {e}", exc_info=True
+                        "Unexpected error during Redis operation: %s", e, exc_info=True
                     )
 
                 try:
@@ -114,31 +239,61 @@ class CacheHelper:
                     result = await func(*args, **kwargs)
 
                     # Cache result only if not None
-                    if result is not None and cls._initialized and cls._client:
+                    if result is not None and client is not None:
                         try:
-                            await cls._client.set(
-                                name=key,
-                                value=json.dumps(result, default=str),
-                                ex=ttl,
-                            )
-                            logger.debug(f"Result cached for key: {key}")
+                            with track("cache"):
+                                await client.set(
+                                    name=key,
+                                    value=json.dumps(result, default=str),
+                                    ex=ttl,
+                                )
+                            logger.debug("Result cached for key: %s", key)
                         except (ConnectionError, TimeoutError) as re:
-                            logger.error(f"Redis connection error: {re}")
+                            logger.error("Redis connection error: %s", re)
+                            cls.report_failure()
                         except RedisError as re:
-                            logger.error(f"Redis operation error: {re}")
+                            logger.error("Redis operation error: %s", re)
                         except Exception as e:
                             logger.error(
-                                f"Unexpected error saving to Redis: {e}", exc_info=True
+                                "Unexpected error saving to Redis: %s", e, exc_info=True
                             )
 
                     return result
 
                 except Exception as e:
                     logger.error(
-                        f"Error executing function {func.__name__}: {e}", exc_info=True
+                        "Error executing function %s: %s",
+                        func.__name__,
+                        e,
+                        exc_info=True,
                     )
                     raise
 
+            wrapper.cache_key = build_key
             return wrapper
 
         return decorator
+
+
+registry.gauge(
+    "cache_circuit_state",
+    "Redis circuit breaker state (0 closed, 1 open, 2 half-open)",
+    callback=lambda: int(CacheHelper.breaker.state),
+)
+
+reloader.on_change(
+    (
+        "redis.REDIS_MAX_CONNECTIONS",
+        "redis.REDIS_POOL_TIMEOUT",
+        "redis.REDIS_SOCKET_TIMEOUT",
+        "redis.REDIS_CONNECT_TIMEOUT",
+    ),
+    CacheHelper._apply_pool_settings,
+)
+reloader.bind("redis.REDIS_BREAKER_THRESHOLD", CacheHelper.breaker, "failure_threshold")
+reloader.bind("redis.REDIS_BREAKER_OPEN_SECONDS", CacheHelper.breaker, "open_seconds")
+reloader.bind(
+    "redis.REDIS_BREAKER_PROBE_INTERVAL", CacheHelper.breaker, "probe_interval"
+)
+
+os.register_at_fork(after_in_child=CacheHelper._reset_after_fork)
@@ -0,0 +1,78 @@
+from typing import Literal, Optional
+
+from redis.exceptions import RedisError
+
+from src.core.cache.helper import CacheHelper
+from src.core.metrics import track
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+ClaimState = Literal["new", "pending", "done"]
+
+_PENDING = b"pending"
+_DONE = b"done"
+
+
+class IdempotencyKeys:
+    """At-most-once claims on request keys, backed by SET NX.
+
+    A claim starts out pending with a short TTL and becomes done once its
+    work is stored. A crash in between leaves only the pending marker,
+    which expires, so the sender's retry is processed instead of being
+    acknowledged as a duplicate of work that never happened.
+    """
+
+    def __init__(self, namespace: str, pending_ttl: int, done_ttl: int) -> None:
+        self._namespace = namespace
+        self.pending_ttl = pending_ttl
+        self.done_ttl = done_ttl
+
+    def _key(self, key: str) -> str:
+        return f"idempotency:{self._namespace}:{key}"
+
+    async def claim(self, key: str) -> Optional[ClaimState]:
+        """`new` when the caller owns the key now, the state of the earlier
+        claim otherwise, or None while Redis is unavailable."""
+        client = CacheHelper.get_client()
+        if client is None:
+            return None
+        try:
+            with track("cache"):
+                if await client.set(
+                    self._key(key), _PENDING, nx=True, ex=self.pending_ttl
+                ):
+                    state = "new"
+                else:
+                    # an earlier claim that expired in between reads as
+                    # pending, the retry after it gets the key
+                    value = await client.get(self._key(key))
+                    state = "done" if value == _DONE else "pending"
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Idempotency claim failed: %s", e)
+            return None
+        CacheHelper.report_success()
+        return state
+
+    async def complete(self, key: str) -> None:
+        await self._write(key, _DONE)
+
+    async def release(self, key: str) -> None:
+        """Gives the key up after a failure, so the retry can claim it."""
+        await self._write(key, None)
+
+    async def _write(self, key: str, value: Optional[bytes]) -> None:
+        client = CacheHelper.get_client()
+        if client is None:
+            return
+        try:
+            with track("cache"):
+                if value is None:
+                    await client.delete(self._key(key))
+                else:
+                    await client.set(self._key(key), value, ex=self.done_ttl)
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Idempotency update failed: %s", e)
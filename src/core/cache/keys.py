@@ -0,0 +1,138 @@
+import hashlib
+import inspect
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+# argument parts longer than this are hashed, keeping keys short and whole
+MAX_RAW_LENGTH = 128
+_SKIPPED = ("self", "cls")
+_MISSING = object()
+
+
+def _encode_sequence(value) -> str:
+    return "[" + ",".join(encode(item) for item in value) + "]"
+
+
+def _encode_dict(value: dict) -> str:
+    items = sorted((encode(k), encode(v)) for k, v in value.items())
+    return "{" + ",".join(f"{k}={v}" for k, v in items) + "}"
+
+
+# str/bytes are quoted by repr, so separators inside them can't make two
+# different argument lists encode the same
+_ENCODERS: dict[type, Callable[[Any], str]] = {
+    type(None): lambda value: "~",
+    bool: lambda value: "T" if value else "F",
+    int: str,
+    float: repr,
+    Decimal: str,
+    str: repr,
+    bytes: repr,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    time: time.isoformat,
+    UUID: str,
+    tuple: _encode_sequence,
+    list: _encode_sequence,
+    # sorted by encoding, set members needn't be comparable with each other
+    frozenset: lambda value: "[" + ",".join(sorted(map(encode, value))) + "]",
+    dict: _encode_dict,
+}
+
+
+def _encoder_for(cls: type) -> Callable[[Any], str]:
+    if issubclass(cls, BaseModel):
+        # serialized by pydantic-core in field order, no JSON round trip
+        return lambda value: f"{cls.__name__}{value.model_dump_json()}"
+    if issubclass(cls, Enum):
+        return lambda value: f"{cls.__name__}.{value.name}"
+    for base, encoder in list(_ENCODERS.items()):
+        if issubclass(cls, base):
+            return encoder
+    raise TypeError(
+        f"Can't build a cache key from {cls.__name__}; choose the key "
+        "arguments with `key=(...)`"
+    )
+
+
+def encode(value: Any) -> str:
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        encoder = _ENCODERS[type(value)] = _encoder_for(type(value))
+    return encoder(value)
+
+
+class KeyBuilder:
+    """Cache keys for one function, compiled from its signature.
+
+    Keys read `<namespace>:<qualified name>:v<version>:<arguments>`. The
+    namespace carries the deploy-wide REDIS_CACHE_VERSION and `version` the
+    function's own, so changing either retires old entries instead of
+    reading them back in an outdated shape.
+
+    `key` names the arguments that identify a result; by default all of
+    them except `self`/`cls`, and functions taking `*args`/`**kwargs` must
+    name them. Services and units of work have no stable identity and must
+    be left out.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        namespace: str,
+        key: Optional[Sequence[str]] = None,
+        version: int = 1,
+    ) -> None:
+        parameters = list(inspect.signature(func).parameters.values())
+        names = [parameter.name for parameter in parameters]
+        if key is None:
+            if any(
+                parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD)
+                for parameter in parameters
+            ):
+                raise ValueError(
+                    f"{func.__qualname__} takes *args/**kwargs, name its key arguments"
+                )
+            key = [name for name in names if name not in _SKIPPED]
+        unknown = [name for name in key if name not in names]
+        if unknown:
+            raise ValueError(
+                f"{func.__qualname__} has no argument {', '.join(unknown)}"
+            )
+
+        self.prefix = f"{namespace}:{func.__module__}.{func.__qualname__}:v{version}:"
+        # (position or None for keyword-only, name, default)
+        self._fields = []
+        for name in key:
+            parameter = parameters[names.index(name)]
+            position = (
+                names.index(name)
+                if parameter.kind
+                in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+                else None
+            )
+            default = (
+                _MISSING if parameter.default is parameter.empty else parameter.default
+            )
+            self._fields.append((position, name, default))
+
+    def __call__(self, args: tuple, kwargs: dict) -> str:
+        parts = []
+        for position, name, default in self._fields:
+            if position is not None and position < len(args):
+                value = args[position]
+            else:
+                value = kwargs.get(name, default)
+                if value is _MISSING:
+                    raise TypeError(f"Missing argument {name!r}")
+            parts.append(encode(value))
+        raw = ":".join(parts)
+        if len(raw) > MAX_RAW_LENGTH:
+            raw = "#" + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+        return self.prefix + raw
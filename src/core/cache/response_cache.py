@@ -0,0 +1,126 @@
+from typing import NamedTuple, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.cache.helper import CacheHelper
+from src.core.metrics import registry, track
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+lookups = registry.counter(
+    "response_cache_lookups_total",
+    "Rendered response cache lookups",
+    labels=("namespace", "result"),
+)
+
+
+# bumped when the stored layout changes, so old entries are never parsed
+_FORMAT = 2
+
+# stores a response only if no invalidation happened since it was looked up
+_SET_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return 0
+"""
+
+
+class CachedResponse(NamedTuple):
+    # who may read the response; checked by the caller, a hit is not a grant
+    owner: str
+    etag: str
+    body: str
+
+
+class CacheLookup(NamedTuple):
+    response: Optional[CachedResponse]
+    # the key's generation at lookup, for `set`; None while Redis is down
+    generation: Optional[str]
+
+
+class ResponseCache:
+    """Rendered bodies with their owner and ETag, stored as one
+    `owner\\netag\\nbody` string so a lookup is a single round trip.
+
+    Every invalidation bumps the key's generation. A response is only
+    stored if the generation is still the one seen by the lookup that
+    missed, so a body rendered from rows read before a write can't land in
+    the cache after the write's invalidation.
+    """
+
+    def __init__(self, namespace: str, ttl: int) -> None:
+        self._namespace = namespace
+        self.ttl = ttl
+        self._script = None
+        self._script_client: Optional[Redis] = None
+
+    def _key(self, key: object) -> str:
+        return f"response:{_FORMAT}:{self._namespace}:{key}"
+
+    def _generation_key(self, key: object) -> str:
+        return f"{self._key(key)}:generation"
+
+    async def get(self, key: object) -> CacheLookup:
+        client = CacheHelper.get_client()
+        if client is None:
+            return CacheLookup(None, None)
+        try:
+            with track("cache"):
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.get(self._key(key))
+                    pipe.get(self._generation_key(key))
+                    value, generation = await pipe.execute()
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Response cache read failed: %s", e)
+            return CacheLookup(None, None)
+        CacheHelper.report_success()
+        generation = generation.decode() if generation else "0"
+        if value is None:
+            lookups.inc(namespace=self._namespace, result="miss")
+            return CacheLookup(None, generation)
+        lookups.inc(namespace=self._namespace, result="hit")
+        owner, etag, body = value.decode().split("\n", 2)
+        return CacheLookup(CachedResponse(owner, etag, body), generation)
+
+    async def set(
+        self, key: object, response: CachedResponse, generation: Optional[str]
+    ) -> None:
+        """Stores `response` unless `key` was invalidated since the lookup
+        that returned `generation`."""
+        client = CacheHelper.get_client()
+        if client is None or generation is None:
+            return
+        if client is not self._script_client:
+            self._script = client.register_script(_SET_IF_CURRENT)
+            self._script_client = client
+        try:
+            with track("cache"):
+                await self._script(
+                    keys=[self._key(key), self._generation_key(key)],
+                    args=[generation, "\n".join(response), self.ttl],
+                )
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Response cache write failed: %s", e)
+
+    async def invalidate(self, *keys: object) -> None:
+        client = CacheHelper.get_client()
+        if client is None or not keys:
+            return
+        try:
+            with track("cache"):
+                async with client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.delete(self._key(key))
+                        pipe.incr(self._generation_key(key))
+                        # outlives any lookup still rendering the old rows
+                        pipe.expire(self._generation_key(key), self.ttl)
+                    await pipe.execute()
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            logger.error("Response cache invalidation failed: %s", e)
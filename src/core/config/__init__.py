@@ -1,3 +1,4 @@
 from .config import config
+from .reload import ConfigReloader, ReloadReport, reloader
 
-__all__ = ["config"]
+__all__ = ["ConfigReloader", "ReloadReport", "config", "reloader"]
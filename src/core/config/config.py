@@ -1,4 +1,4 @@
-from pydantic import AfterValidator, BaseModel
+from pydantic import AfterValidator, BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Any, Annotated
 import os
@@ -27,6 +27,23 @@ class _DBConfig(BaseConfig):
     DB_HOST: str = os.getenv("DB_HOST")
     DB_PORT: int = os.getenv("DB_PORT")
     DB_DATABASE: str = os.getenv("DB_DATABASE")
+    DB_POOL_SIZE: int = os.getenv("DB_POOL_SIZE", 10)
+    DB_MAX_OVERFLOW: int = os.getenv("DB_MAX_OVERFLOW", 5)
+    DB_POOL_TIMEOUT: float = os.getenv("DB_POOL_TIMEOUT", 5.0)
+    DB_POOL_RECYCLE: int = os.getenv("DB_POOL_RECYCLE", 1800)
+    # statements per request before a warning; strict mode (tests) fails the
+    # request instead
+    DB_QUERY_BUDGET: int = os.getenv("DB_QUERY_BUDGET", 20)
+    DB_QUERY_STRICT: bool = os.getenv("DB_QUERY_STRICT", False)
+    # executions of one statement shape within a request reported as N+1
+    DB_REPEATED_QUERY_THRESHOLD: int = os.getenv("DB_REPEATED_QUERY_THRESHOLD", 5)
+    # monthly partitions of time-partitioned tables kept ready ahead of time
+    DB_PARTITION_MONTHS_AHEAD: int = os.getenv("DB_PARTITION_MONTHS_AHEAD", 3)
+    # how far back "recent payments" look; bounds the partitions scanned
+    PAYMENTS_RECENT_DAYS: int = os.getenv("PAYMENTS_RECENT_DAYS", 365)
+    # upper bound on cached counts missing an invalidation (bulk imports,
+    # Redis down during a commit)
+    DB_COUNT_CACHE_TTL: int = os.getenv("DB_COUNT_CACHE_TTL", 300)
 
     @property
     def url(self) -> str:
@@ -37,22 +54,36 @@ class _DBConfig(BaseConfig):
         )
 
 
-# class _RedisConfig(BaseConfig):
-#     REDIS_HOST: str = os.getenv("REDIS_HOST")
-#     REDIS_PORT: int = os.getenv("REDIS_PORT")
-#     REDIS_DATABASE: str = os.getenv("REDIS_DATABASE")
+class _RedisConfig(BaseConfig):
+    REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT: int = os.getenv("REDIS_PORT", 6379)
+    REDIS_DATABASE: str = os.getenv("REDIS_DATABASE", "0")
+    REDIS_MAX_CONNECTIONS: int = os.getenv("REDIS_MAX_CONNECTIONS", 10)
+    REDIS_SOCKET_TIMEOUT: float = os.getenv("REDIS_SOCKET_TIMEOUT", 0.1)
+    REDIS_CONNECT_TIMEOUT: float = os.getenv("REDIS_CONNECT_TIMEOUT", 0.2)
+    # how long a call may wait for a free connection from the pool
+    REDIS_POOL_TIMEOUT: float = os.getenv("REDIS_POOL_TIMEOUT", 0.05)
+    REDIS_BREAKER_THRESHOLD: int = os.getenv("REDIS_BREAKER_THRESHOLD", 5)
+    REDIS_BREAKER_OPEN_SECONDS: float = os.getenv("REDIS_BREAKER_OPEN_SECONDS", 10.0)
+    REDIS_BREAKER_PROBE_INTERVAL: float = os.getenv("REDIS_BREAKER_PROBE_INTERVAL", 1.0)
+    REDIS_HEALTH_CHECK_INTERVAL: float = os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 5.0)
+    # part of every CacheHelper.cache key; bump on deploys that change the
+    # shape of cached results
+    REDIS_CACHE_VERSION: str = os.getenv("REDIS_CACHE_VERSION", "1")
 
-#     @property
-#     def url(self) -> str:
-#         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DATABASE}"
+    @property
+    def url(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DATABASE}"
 
 
-# class _ApiConfig(BaseModel):
-#     CORS_ORIGINS: list_str = os.getenv("CORS_ORIGINS")
-#     CORS_CREDENTIALS: bool = os.getenv("CORS_CREDENTIALS")
-#     CORS_METHODS: list_str = os.getenv("CORS_METHODS")
-#     CORS_HEADERS: list_str = os.getenv("CORS_HEADERS")
-#     MODE: str = os.getenv("MODE")
+class _ApiConfig(BaseConfig):
+    # CORS_ORIGINS: list_str = os.getenv("CORS_ORIGINS")
+    # CORS_CREDENTIALS: bool = os.getenv("CORS_CREDENTIALS")
+    # CORS_METHODS: list_str = os.getenv("CORS_METHODS")
+    # CORS_HEADERS: list_str = os.getenv("CORS_HEADERS")
+    MODE: str = os.getenv("MODE", "DEV")
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", True)
+    SLOW_REQUEST_MS: float = os.getenv("SLOW_REQUEST_MS", 500)
 
 
 # class _RMQConfig(BaseConfig):
@@ -69,15 +100,139 @@ class _DBConfig(BaseConfig):
 #         )
 
 
+class _ServerConfig(BaseConfig):
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = os.getenv("PORT", 8000)
+    # 0 means one worker per available CPU
+    WORKERS: int = os.getenv("WORKERS", 0)
+    BACKLOG: int = os.getenv("BACKLOG", 2048)
+    KEEP_ALIVE: int = os.getenv("KEEP_ALIVE", 5)
+    # a worker restarts after MAX_REQUESTS plus up to MAX_REQUESTS_JITTER
+    # requests, drawn per worker so they don't all restart at once; 0 is off
+    MAX_REQUESTS: int = os.getenv("MAX_REQUESTS", 10_000)
+    MAX_REQUESTS_JITTER: int = os.getenv("MAX_REQUESTS_JITTER", 1000)
+    GRACEFUL_TIMEOUT: int = os.getenv("GRACEFUL_TIMEOUT", 30)
+
+
+class _WireGuardConfig(BaseConfig):
+    WG_SERVER_PUBLIC_KEY: str = os.getenv("WG_SERVER_PUBLIC_KEY", "")
+    WG_ENDPOINT: str = os.getenv("WG_ENDPOINT", "")
+    WG_DNS: str = os.getenv("WG_DNS", "1.1.1.1")
+    WG_ALLOWED_IPS: str = os.getenv("WG_ALLOWED_IPS", "0.0.0.0/0, ::/0")
+    WG_PERSISTENT_KEEPALIVE: int = os.getenv("WG_PERSISTENT_KEEPALIVE", 25)
+    WG_RESPONSE_CACHE_TTL: int = os.getenv("WG_RESPONSE_CACHE_TTL", 86400)
+
+
+class _PlacementConfig(BaseConfig):
+    # X-Sync-Token the nodes fetch their peers with; refused while empty
+    PLACEMENT_SYNC_TOKEN: str = os.getenv("PLACEMENT_SYNC_TOKEN", "")
+    # a node takes new peers until it holds this many times its capacity
+    # share of all peers; 1.0 is strict proportionality, higher keeps more
+    # peers on the node their key hashes to
+    PLACEMENT_LOAD_FACTOR: float = os.getenv("PLACEMENT_LOAD_FACTOR", 1.25)
+    # peers moved per rebalancing step, each one re-downloads its config
+    PLACEMENT_REBALANCE_STEP: int = os.getenv("PLACEMENT_REBALANCE_STEP", 50)
+    PLACEMENT_REBALANCE_INTERVAL: float = os.getenv(
+        "PLACEMENT_REBALANCE_INTERVAL", 60.0
+    )
+    # nodes within this fraction above their share are left alone
+    PLACEMENT_REBALANCE_TOLERANCE: float = os.getenv(
+        "PLACEMENT_REBALANCE_TOLERANCE", 0.1
+    )
+
+
+class _RateLimitConfig(BaseConfig):
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", True)
+    # requests per second and burst size for routes missing from RATE_LIMIT_ROUTES
+    RATE_LIMIT_RATE: float = os.getenv("RATE_LIMIT_RATE", 5.0)
+    RATE_LIMIT_BURST: int = os.getenv("RATE_LIMIT_BURST", 20)
+    # JSON, e.g. {"/auth/register": {"rate": 0.2, "burst": 3}}
+    RATE_LIMIT_ROUTES: dict[str, dict[str, float]] = {}
+    RATE_LIMIT_REDIS_TIMEOUT: float = os.getenv("RATE_LIMIT_REDIS_TIMEOUT", 0.05)
+    RATE_LIMIT_LOCAL_KEYS: int = os.getenv("RATE_LIMIT_LOCAL_KEYS", 100_000)
+
+
+class _AdmissionConfig(BaseConfig):
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", True)
+    # concurrent units of work per kind; together they should fit in
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW so requests queue here, not in the pool
+    ADMISSION_READ_LIMIT: int = os.getenv("ADMISSION_READ_LIMIT", 10)
+    ADMISSION_WRITE_LIMIT: int = os.getenv("ADMISSION_WRITE_LIMIT", 5)
+    # how long a request may wait for a slot before it is shed with a 503
+    ADMISSION_QUEUE_TIMEOUT: float = os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.5)
+    ADMISSION_MAX_QUEUE: int = os.getenv("ADMISSION_MAX_QUEUE", 100)
+
+
+class _CoordinationConfig(BaseConfig):
+    COORDINATION_PREFIX: str = os.getenv("COORDINATION_PREFIX", "coord")
+    # leases expire this long after the last renewal
+    COORDINATION_TTL: float = os.getenv("COORDINATION_TTL", 15.0)
+
+
+class _ArchiveConfig(BaseConfig):
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_BATCH_SIZE: int = os.getenv("ARCHIVE_BATCH_SIZE", 1000)
+    # share of wall time the job may spend inside batches
+    ARCHIVE_DUTY_CYCLE: Annotated[float, Field(gt=0, le=1)] = os.getenv(
+        "ARCHIVE_DUTY_CYCLE", 0.25
+    )
+    ARCHIVE_PART_BYTES: int = os.getenv("ARCHIVE_PART_BYTES", 128 * 1024 * 1024)
+    ARCHIVE_LOCK_TIMEOUT_MS: int = os.getenv("ARCHIVE_LOCK_TIMEOUT_MS", 1000)
+    ARCHIVE_STATEMENT_TIMEOUT_MS: int = os.getenv("ARCHIVE_STATEMENT_TIMEOUT_MS", 5000)
+    ARCHIVE_MAX_RETRIES: int = os.getenv("ARCHIVE_MAX_RETRIES", 5)
+
+
+class _WebhookConfig(BaseConfig):
+    # HMAC-SHA256 key of the X-Webhook-Signature header; webhooks are
+    # refused while it is empty
+    WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
+    # providers retry for days; older duplicates still hit the unique
+    # constraint of payment_events
+    WEBHOOK_IDEMPOTENCY_TTL: int = os.getenv("WEBHOOK_IDEMPOTENCY_TTL", 3 * 86400)
+    # how long a retry is told to come back later while the first delivery
+    # is still being stored
+    WEBHOOK_PENDING_TTL: int = os.getenv("WEBHOOK_PENDING_TTL", 30)
+    WEBHOOK_BATCH_SIZE: int = os.getenv("WEBHOOK_BATCH_SIZE", 500)
+    # wait after the first event of a burst so the rest join its batch
+    WEBHOOK_BATCH_LINGER: float = os.getenv("WEBHOOK_BATCH_LINGER", 0.02)
+    # polling picks up events stored by other replicas
+    WEBHOOK_POLL_INTERVAL: float = os.getenv("WEBHOOK_POLL_INTERVAL", 1.0)
+
+
+class _AdminConfig(BaseConfig):
+    # X-Admin-Token of the /admin endpoints; they refuse every request while
+    # it is empty
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    ADMIN_PROFILE_MAX_SECONDS: float = os.getenv("ADMIN_PROFILE_MAX_SECONDS", 60)
+    ADMIN_PROFILE_INTERVAL: float = os.getenv("ADMIN_PROFILE_INTERVAL", 0.005)
+    # frames kept per allocation while tracemalloc runs
+    ADMIN_TRACEMALLOC_FRAMES: int = os.getenv("ADMIN_TRACEMALLOC_FRAMES", 10)
+
+
 class _LoggingConfig(BaseConfig):
     FORMAT: str = os.getenv("FORMAT")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG")
+    LOG_SERIALIZE: bool = os.getenv("LOG_SERIALIZE", False)
+    LOG_QUEUE_SIZE: int = os.getenv("LOG_QUEUE_SIZE", 10_000)
+    LOG_RATE_LIMIT: int = os.getenv("LOG_RATE_LIMIT", 20)
+    LOG_RATE_WINDOW: float = os.getenv("LOG_RATE_WINDOW", 1.0)
+    LOG_SAMPLE_RATE: int = os.getenv("LOG_SAMPLE_RATE", 100)
 
 
 class _Config:
     def __init__(self) -> None:
         self.db = _DBConfig()
-        # self.redis = _RedisConfig()
-        # self.api = _ApiConfig()
+        self.redis = _RedisConfig()
+        self.api = _ApiConfig()
+        self.server = _ServerConfig()
+        self.rate_limit = _RateLimitConfig()
+        self.admission = _AdmissionConfig()
+        self.archive = _ArchiveConfig()
+        self.coordination = _CoordinationConfig()
+        self.wireguard = _WireGuardConfig()
+        self.placement = _PlacementConfig()
+        self.webhook = _WebhookConfig()
+        self.admin = _AdminConfig()
         # self.rmq = _RMQConfig()
         self.log = _LoggingConfig()
 
@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from pydantic import ValidationError
+from pydantic_settings import BaseSettings
+
+from .config import _Config, config
+
+
+# src.utils imports the config, so its logger is looked up by name here
+logger = logging.getLogger("MainServiceLogger").getChild(__name__)
+
+Applier = Callable[[], Optional[Awaitable[None]]]
+
+# values of these settings are masked in reports and logs
+_SECRET_MARKERS = ("PASSWORD", "SECRET", "TOKEN", "PRIVATE_KEY")
+
+
+def _sections(settings: _Config) -> dict[str, BaseSettings]:
+    return {
+        name: section
+        for name, section in vars(settings).items()
+        if isinstance(section, BaseSettings)
+    }
+
+
+def _shown(setting: str, value: Any) -> Any:
+    if any(marker in setting for marker in _SECRET_MARKERS):
+        return "***"
+    return (
+        value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+    )
+
+
+@dataclass
+class ReloadReport:
+    # "section.FIELD" -> (old, new)
+    applied: dict[str, tuple[Any, Any]] = field(default_factory=dict)
+    restart_required: dict[str, tuple[Any, Any]] = field(default_factory=dict)
+    # applier -> error; its settings are set but may not be in effect
+    failed: dict[str, str] = field(default_factory=dict)
+    # validation errors; nothing was changed
+    errors: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        def changes(items: dict[str, tuple[Any, Any]]) -> dict[str, Any]:
+            return {
+                setting: {"old": _shown(setting, old), "new": _shown(setting, new)}
+                for setting, (old, new) in items.items()
+            }
+
+        return {
+            "applied": changes(self.applied),
+            "restart_required": changes(self.restart_required),
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+class ConfigReloader:
+    """Re-reads the settings and applies the ones that can change at runtime.
+
+    A setting is live once its owner registered it: `live()` for values
+    read on every use, `bind()` for values copied onto an object, and
+    `on_change()` for anything that needs code to run, like replacing a
+    pool. Changes to every other setting are reported as needing a restart
+    and are not applied, so `config` keeps describing what is running.
+
+    The new values are validated as a whole first; an invalid file changes
+    nothing. Values come from the environment and env/.env as at startup,
+    and a running process can't see its environment change, so reloads pick
+    up edits to env/.env (for variables not also set in the environment).
+    """
+
+    def __init__(self, settings: _Config) -> None:
+        self._settings = settings
+        self._appliers: dict[str, list[Callable[[], Optional[Applier]]]] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def live(self, *settings: str) -> None:
+        """Marks settings that are read where they are used."""
+        for setting in settings:
+            self._check(setting)
+            self._appliers.setdefault(setting, [])
+
+    def on_change(self, settings: str | Iterable[str], applier: Applier) -> None:
+        """Runs `applier` once after a reload changed any of `settings`
+        ("section.FIELD"), with the new values already in `config`.
+
+        Bound methods are held weakly: registering one doesn't keep its
+        instance (a middleware, say) alive.
+        """
+        if isinstance(settings, str):
+            settings = (settings,)
+        ref = (
+            weakref.WeakMethod(applier)
+            if inspect.ismethod(applier)
+            else lambda: applier
+        )
+        for setting in settings:
+            self._check(setting)
+            self._appliers.setdefault(setting, []).append(ref)
+
+    def bind(self, setting: str, target: Any, attribute: str) -> None:
+        """Keeps `target.attribute` equal to the setting."""
+        section, name = setting.split(".")
+
+        def apply() -> None:
+            setattr(target, attribute, getattr(getattr(self._settings, section), name))
+
+        self.on_change(setting, apply)
+
+    def _check(self, setting: str) -> None:
+        section, _, name = setting.partition(".")
+        fields = getattr(
+            type(getattr(self._settings, section, None)), "model_fields", {}
+        )
+        if name not in fields:
+            raise ValueError(f"Unknown setting {setting!r}")
+
+    async def reload(self) -> ReloadReport:
+        async with self._lock:
+            return await self._reload()
+
+    def reload_soon(self) -> None:
+        """Starts a reload from a signal handler."""
+        task = asyncio.create_task(self.reload())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reload(self) -> ReloadReport:
+        report = ReloadReport()
+        try:
+            fresh = _sections(type(self._settings)())
+        except ValidationError as e:
+            report.errors = [
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in e.errors()
+            ]
+            logger.error("Config reload rejected: %s", "; ".join(report.errors))
+            return report
+
+        pending: list[Callable[[], Optional[Applier]]] = []
+        for section_name, section in _sections(self._settings).items():
+            new_section = fresh[section_name]
+            for name in type(section).model_fields:
+                old, new = getattr(section, name), getattr(new_section, name)
+                if old == new:
+                    continue
+                setting = f"{section_name}.{name}"
+                refs = self._appliers.get(setting)
+                if refs is None:
+                    report.restart_required[setting] = (old, new)
+                    continue
+                setattr(section, name, new)
+                report.applied[setting] = (old, new)
+                pending.extend(ref for ref in refs if ref not in pending)
+
+        for ref in pending:
+            applier = ref()
+            if applier is None:
+                continue
+            try:
+                result = applier()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                name = getattr(applier, "__qualname__", repr(applier))
+                report.failed[name] = repr(e)
+                logger.exception("Failed to apply reloaded settings in %s", name)
+
+        logger.info(
+            "Config reloaded: applied %s; restart required for %s",
+            ", ".join(report.applied) or "nothing",
+            ", ".join(report.restart_required) or "nothing",
+        )
+        return report
+
+
+reloader = ConfigReloader(config)
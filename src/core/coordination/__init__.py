@@ -0,0 +1,10 @@
+from .election import LeaderElection
+from .lease import CoordinationUnavailable, Lease, LeaseLost, check_fence
+
+__all__ = [
+    "CoordinationUnavailable",
+    "LeaderElection",
+    "Lease",
+    "LeaseLost",
+    "check_fence",
+]
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from src.core.metrics import registry
+from src.utils import get_logger
+
+from .lease import Lease, LeaseLost
+
+
+logger = get_logger().getChild(__name__)
+
+leadership = registry.gauge(
+    "coordination_leader",
+    "1 while this replica leads the named election",
+    labels=("name",),
+)
+elections = registry.counter(
+    "coordination_elections_total",
+    "Leaderships won by this replica",
+    labels=("name",),
+)
+
+
+class LeaderElection:
+    """Keeps campaigning for a lease and runs work only while holding it.
+
+    The lease is renewed every `ttl / 3` seconds. When a renewal fails the
+    work is cancelled before the TTL runs out, so a new leader never
+    overlaps with a live one, barring stalls the fencing token guards
+    against.
+    """
+
+    def __init__(self, name: str, ttl: float) -> None:
+        self.name = name
+        self._lease = Lease(name, ttl)
+        self._interval = ttl / 3
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lease.held
+
+    async def run(self, on_elected: Callable[[int], Awaitable[None]]) -> None:
+        """Runs `on_elected(fencing_token)` each time leadership is won.
+
+        The work should `check_fence(name, fencing_token)` before each step
+        and let LeaseLost end it.
+        """
+        while True:
+            if await self._lease.acquire():
+                await self._lead(on_elected)
+            await asyncio.sleep(self._interval)
+
+    async def _lead(self, on_elected: Callable[[int], Awaitable[None]]) -> None:
+        token = self._lease.token
+        logger.info("Elected leader of %s (token %d)", self.name, token)
+        elections.inc(name=self.name)
+        leadership.set(1, name=self.name)
+        work = asyncio.create_task(on_elected(token))
+        try:
+            while True:
+                await asyncio.wait({work}, timeout=self._interval)
+                if work.done():
+                    if not work.cancelled() and isinstance(work.exception(), LeaseLost):
+                        logger.warning("Lost leadership of %s", self.name)
+                    elif not work.cancelled() and work.exception() is not None:
+                        logger.error(
+                            "Leader work of %s failed: %r", self.name, work.exception()
+                        )
+                    return
+                if not await self._lease.renew():
+                    logger.warning("Lost leadership of %s", self.name)
+                    return
+        finally:
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            leadership.set(0, name=self.name)
+            await self._lease.release()
@@ -0,0 +1,165 @@
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.cache.helper import CacheHelper
+from src.core.config import config
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+# identifies this process among the replicas
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _reset_after_fork() -> None:
+    global REPLICA_ID
+    REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+_ACQUIRE = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CoordinationUnavailable(Exception):
+    """Redis can't be reached (or the circuit breaker is open)."""
+
+
+class LeaseLost(Exception):
+    """The lease was acquired again after this holder's token was issued."""
+
+
+class Script:
+    """A Lua script registered lazily on the current CacheHelper client."""
+
+    def __init__(self, source: str) -> None:
+        self._source = source
+        self._client: Optional[Redis] = None
+        self._script = None
+
+    async def __call__(self, keys: list[str], args: list) -> object:
+        client = CacheHelper.get_client()
+        if client is None:
+            raise CoordinationUnavailable
+        if client is not self._client:
+            self._script = client.register_script(self._source)
+            self._client = client
+        try:
+            result = await self._script(keys=keys, args=args)
+        except (RedisError, OSError) as e:
+            CacheHelper.report_error(e)
+            raise CoordinationUnavailable from e
+        CacheHelper.report_success()
+        return result
+
+
+_acquire = Script(_ACQUIRE)
+_renew = Script(_RENEW)
+_release = Script(_RELEASE)
+_fence = Script("return redis.call('GET', KEYS[1])")
+
+
+def key(*parts: str) -> str:
+    return ":".join((config.coordination.COORDINATION_PREFIX, *parts))
+
+
+async def check_fence(name: str, token: int) -> None:
+    """Raises LeaseLost if the lease `name` has been handed out again since
+    `token` was issued; holders call it before every step with side effects.
+    """
+    latest = await _fence([key("fence", name)], [])
+    if latest is not None and int(latest) > token:
+        raise LeaseLost(name)
+
+
+class Lease:
+    """A named, expiring claim held by at most one owner at a time.
+
+    Every successful acquisition gets a fencing token that is strictly
+    larger than all earlier ones. A holder that stalls past its TTL (GC
+    pause, network partition) may still believe it owns the lease, so work
+    with side effects should carry the token and the resource should reject
+    tokens older than the newest it has seen.
+    """
+
+    def __init__(self, name: str, ttl: float) -> None:
+        self.name = name
+        self.ttl = ttl
+        self._key = key("lease", name)
+        self._fence_key = key("fence", name)
+        # unique per holder, so two leases in one process don't share a claim
+        self._owner = f"{REPLICA_ID}:{uuid.uuid4().hex[:8]}"
+        self.token: Optional[int] = None
+        self._expires_at = 0.0
+
+    @property
+    def held(self) -> bool:
+        # local estimate; the clock started before the request was sent
+        return self.token is not None and time.monotonic() < self._expires_at
+
+    async def acquire(self) -> bool:
+        started = time.monotonic()
+        try:
+            token = await _acquire(
+                [self._key, self._fence_key], [self._owner, int(self.ttl * 1000)]
+            )
+        except CoordinationUnavailable:
+            return False
+        if not token:
+            return False
+        self.token = int(token)
+        self._expires_at = started + self.ttl
+        return True
+
+    async def renew(self) -> bool:
+        if self.token is None:
+            return False
+        started = time.monotonic()
+        try:
+            renewed = await _renew([self._key], [self._owner, int(self.ttl * 1000)])
+        except CoordinationUnavailable:
+            # the lease may still be ours, trust it until it would expire
+            return self.held
+        if not renewed:
+            # expired and possibly taken over
+            self.token = None
+            return False
+        self._expires_at = started + self.ttl
+        return True
+
+    async def release(self) -> None:
+        if self.token is None:
+            return
+        self.token = None
+        self._expires_at = 0.0
+        try:
+            await _release([self._key], [self._owner])
+        except CoordinationUnavailable:
+            # it expires on its own
+            pass
@@ -1,5 +1,17 @@
-from .base import TypedRepository, Base
+from .base import TypedRepository, Base, after_commit
 from .connection import DBConnection
+from .loader import Loader
+from .partitions import MonthlyPartitions
+from .query import QueryScheme, query_scheme
 
 
-__all__ = ["TypedRepository", "DBConnection", "Base"]
+__all__ = [
+    "TypedRepository",
+    "DBConnection",
+    "Loader",
+    "Base",
+    "MonthlyPartitions",
+    "QueryScheme",
+    "query_scheme",
+    "after_commit",
+]
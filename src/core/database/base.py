@@ -1,19 +1,78 @@
 from abc import ABC, abstractmethod
+import asyncio
+import json
 from datetime import datetime
 from inspect import currentframe
-from typing import Any, Generic, Optional, Type, TypeVar
-
-from pydantic import BaseModel, ValidationError
-from sqlalchemy import delete, select, update
-from sqlalchemy.dialects.postgresql import insert
+from functools import lru_cache, partial
+from itertools import starmap
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Literal,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import (
+    any_,
+    bindparam,
+    delete,
+    func,
+    inspect,
+    literal_column,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import DeclarativeBase, Mapped
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    joinedload,
+    selectinload,
+)
+from sqlalchemy.orm.interfaces import ORMOption
+
+from src.core.cache.count_cache import CountCache
+from src.core.metrics import track
+
+from .loader import Loader
+from .query import (
+    QueryScheme,
+    compile_query,
+    projection_scheme,
+    query_scheme,
+    row_class,
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+AFTER_COMMIT = "after_commit"
+LOADER_LOCK = "loader_lock"
+
+
+def after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """Schedules `callback` to run after UnitOfWork.commit() succeeds.
+
+    A callback equal to one already scheduled is dropped, so a batch of
+    writes invalidates a cache once instead of once per row.
+    """
+    callbacks = session.info.setdefault(AFTER_COMMIT, [])
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+
 class RepositoryABC(ABC):
     @abstractmethod
     async def get_one(self, data: dict[str, Any]) -> Any:
@@ -46,17 +105,40 @@ class RepositoryABC(ABC):
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# relationship paths ("wireguard_configs", "user.payments") or ready options
+LoadOption = str | ORMOption
+# exact: COUNT(*); approximate: planner statistics, whole table only;
+# cached: COUNT(*) remembered in Redis until the next committed write
+CountMode = Literal["exact", "approximate", "cached"]
+# row: SQLAlchemy Row tuples; dataclass: instances of query.row_class
+RowShape = Literal["row", "dataclass"]
+
+# partitioned parents have no statistics of their own (-1), their
+# partitions do; tables never analyzed report -1 as well
+_ESTIMATE_ROWS = text(
+    "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint FROM pg_class c "
+    "WHERE c.oid = CAST(:table AS regclass) OR c.oid IN ("
+    "SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))"
+)
+
 
 class SqlAlchemyRepository(RepositoryABC):
     _model: Type[ModelType]
+    # set on repositories whose counts are read often, see count()
+    count_cache: Optional[CountCache] = None
 
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    def _written(self) -> None:
+        if self.count_cache is not None:
+            after_commit(self._session, self.count_cache.invalidate)
+
     async def insert(self, data: dict[str, Any]) -> dict[str, Any] | None:
         stmt = insert(self._model).values(**data).returning(self._model)
         res = await self._session.execute(stmt)
         row = res.scalar_one()
+        self._written()
         return row
 
     async def insert_or_ignore(self, data: dict[str, Any]) -> dict[str, Any] | None:
@@ -68,21 +150,118 @@ class SqlAlchemyRepository(RepositoryABC):
         )
         res = await self._session.execute(stmt)
         if row := res.scalar_one_or_none():
+            self._written()
             return row
         return None
 
-    async def get_one(self, filters: dict[str, Any]) -> dict[str, Any] | None:
+    async def get_one(
+        self, filters: dict[str, Any], load: Sequence[LoadOption] = ()
+    ) -> dict[str, Any] | None:
         stmt = select(self._model).filter_by(**filters)
+        if load:
+            stmt = stmt.options(*self._loader_options(tuple(load)))
+            res = await self._session.execute(stmt)
+            # joined collections repeat the parent row
+            return res.unique().scalar_one_or_none()
         res = await self._session.execute(stmt)
         if row := res.scalar_one_or_none():
             return row
         return None
 
-    async def get_all(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+    async def get_all(
+        self, filters: dict[str, Any], load: Sequence[LoadOption] = ()
+    ) -> list[dict[str, Any]]:
         stmt = select(self._model).filter_by(**filters)
+        if load:
+            stmt = stmt.options(*self._loader_options(tuple(load)))
+            res = await self._session.execute(stmt)
+            return list(res.unique().scalars())
         res = await self._session.execute(stmt)
         return [row for row in res.scalars()]
 
+    async def find(
+        self, query: QueryScheme, load: Sequence[LoadOption] = ()
+    ) -> list[Any]:
+        """Rows matching a query scheme; models, or row mappings when the
+        query projects `columns`."""
+        stmt = compile_query(self._model, query)
+        if query.columns:
+            res = await self._session.execute(stmt)
+            return list(res.mappings())
+        if load:
+            stmt = stmt.options(*self._loader_options(tuple(load)))
+            res = await self._session.execute(stmt)
+            return list(res.unique().scalars())
+        res = await self._session.execute(stmt)
+        return list(res.scalars())
+
+    async def rows(self, query: QueryScheme, shape: RowShape = "row") -> list[Any]:
+        """Read-only rows of the query's `columns` (default: all of them).
+
+        The statement runs on the session's connection as Core, so no ORM
+        instances are built and nothing enters the identity map; values are
+        what the driver decoded, after the column types' own conversion.
+        """
+        columns = tuple(
+            query.columns or (attr.key for attr in inspect(self._model).column_attrs)
+        )
+        if query.columns is None:
+            query = query.model_copy(update={"columns": list(columns)})
+        connection = await self._session.connection()
+        res = await connection.execute(compile_query(self._model, query))
+        if shape == "dataclass":
+            return list(starmap(row_class(self._model, columns), res))
+        return res.all()
+
+    async def exists(self, filters: dict[str, Any]) -> bool:
+        inner = (
+            select(literal_column("1")).select_from(self._model).filter_by(**filters)
+        )
+        res = await self._session.execute(select(inner.exists()))
+        return res.scalar_one()
+
+    async def count(self, filters: dict[str, Any], mode: CountMode = "exact") -> int:
+        """Rows matching `filters`.
+
+        "approximate" reads the planner's row estimate as of the last
+        ANALYZE, in O(1), and only for the whole table. "cached" falls back
+        to an exact count when the repository has no count cache or Redis
+        is unavailable.
+        """
+        if mode == "approximate":
+            if filters:
+                raise ValueError("Approximate counts cover the whole table")
+            res = await self._session.execute(
+                _ESTIMATE_ROWS, {"table": self._model.__tablename__}
+            )
+            return res.scalar_one()
+        if mode == "cached" and self.count_cache is not None:
+            return await self._cached_count(filters)
+        return await self._count(filters)
+
+    async def _count(self, filters: dict[str, Any]) -> int:
+        stmt = select(func.count()).select_from(self._model).filter_by(**filters)
+        res = await self._session.execute(stmt)
+        return res.scalar_one()
+
+    async def _cached_count(self, filters: dict[str, Any]) -> int:
+        field = json.dumps(filters, sort_keys=True, default=str)
+        generation = await self.count_cache.generation()
+        if generation is None:
+            return await self._count(filters)
+        count = await self.count_cache.get(generation, field)
+        if count is None:
+            count = await self._count(filters)
+            await self.count_cache.set(generation, field, count)
+        return count
+
+    @classmethod
+    def _loader_options(cls, load: tuple[LoadOption, ...]) -> list[ORMOption]:
+        return [
+            _loader_for(cls._model, option) if isinstance(option, str) else option
+            for option in load
+        ]
+
     async def update(
         self,
         filters: dict[str, Any],
@@ -97,6 +276,7 @@ class SqlAlchemyRepository(RepositoryABC):
         )
         res = await self._session.execute(stmt)
         if row := res.scalar_one_or_none():
+            self._written()
             return row
         return None
 
@@ -104,10 +284,33 @@ class SqlAlchemyRepository(RepositoryABC):
         stmt = delete(self._model).filter_by(**filters).returning(self._model)
         res = await self._session.execute(stmt)
         if row := res.scalar_one_or_none():
+            self._written()
             return row
         return None
 
 
+@lru_cache(maxsize=None)
+def _loader_for(model: Type[Base], path: str) -> ORMOption:
+    """Eager-load option for a dotted relationship path.
+
+    Collections use selectinload (one extra `IN` query per level, no row
+    multiplication); many-to-one links use joinedload and ride along in the
+    same query.
+    """
+    option = None
+    for name in path.split("."):
+        attribute = getattr(model, name)
+        prop = attribute.property
+        if option is None:
+            option = selectinload(attribute) if prop.uselist else joinedload(attribute)
+        elif prop.uselist:
+            option = option.selectinload(attribute)
+        else:
+            option = option.joinedload(attribute)
+        model = prop.mapper.class_
+    return option
+
+
 class RepositoryValidationError(ValueError):
     def __init__(self, method: str, data: Any, errors: list, direction: str):
         self.method = method
@@ -130,6 +333,11 @@ class RepositoryValidationError(ValueError):
         return repr(data)
 
 
+@lru_cache(maxsize=None)
+def _list_adapter_for(scheme: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[scheme])
+
+
 ModelSchemeType = TypeVar("ModelSchemeType", bound=BaseModel)
 InsertSchemeType = TypeVar("InsertSchemeType", bound=BaseModel)
 FilterSchemeType = TypeVar("FilterSchemeType", bound=BaseModel)
@@ -147,9 +355,12 @@ class TypedRepository(
     _insert_scheme: Type[InsertSchemeType]
     _filter_scheme: Type[FilterSchemeType]
     _update_scheme: Type[UpdateSchemeType]
+    _query_scheme: Type[QueryScheme]
+    _list_adapter: TypeAdapter
 
     def __init__(self, session: AsyncSession):
         super().__init__(session)
+        self._loaders: dict[str, Loader] = {}
 
     def __init_subclass__(cls, **kwargs):
         required_kwargs = [
@@ -168,8 +379,23 @@ class TypedRepository(
         cls._insert_scheme = kwargs.pop("insert_scheme")
         cls._filter_scheme = kwargs.pop("filter_scheme")
         cls._update_scheme = kwargs.pop("update_scheme")
+        cls._query_scheme = query_scheme(cls._model)
+        cls._list_adapter = TypeAdapter(list[cls._model_scheme])
         super().__init_subclass__(**kwargs)
 
+    @classmethod
+    def warm_up(cls) -> None:
+        """Builds the validators of every scheme ahead of the first request."""
+        for scheme in (
+            cls._model_scheme,
+            cls._insert_scheme,
+            cls._filter_scheme,
+            cls._update_scheme,
+            cls._query_scheme,
+        ):
+            scheme.model_rebuild()
+        cls._list_adapter.validate_python([])
+
     @classmethod
     def _get_caller_method(cls) -> str:
         frame = currentframe().f_back.f_back
@@ -179,30 +405,100 @@ class TypedRepository(
     def _validate_input(
         cls, data: dict[str, Any] | Type[BaseModel], scheme: Type[BaseModel]
     ) -> dict[str, Any]:
-        method = cls._get_caller_method()
         try:
-            # if we pass PydanticScheme in methods bellow,
-            # we return data back
-            if isinstance(data, scheme):
-                return data.model_dump(exclude_none=True)
-            return scheme(**data).model_dump(exclude_none=True)
+            with track("validation"):
+                # if we pass PydanticScheme in methods bellow,
+                # we return data back
+                if isinstance(data, scheme):
+                    return data.model_dump(exclude_none=True)
+                return scheme(**data).model_dump(exclude_none=True)
         except ValidationError as exc:
+            method = cls._get_caller_method()
             raise RepositoryValidationError(
                 method=method, data=data, errors=exc.errors(), direction="input"
             ) from exc
 
+    @classmethod
+    def _validate_query(cls, query: dict[str, Any] | QueryScheme) -> QueryScheme:
+        if isinstance(query, cls._query_scheme):
+            return query
+        try:
+            with track("validation"):
+                return cls._query_scheme.model_validate(query)
+        except ValidationError as exc:
+            method = cls._get_caller_method()
+            raise RepositoryValidationError(
+                method=method, data=query, errors=exc.errors(), direction="input"
+            ) from exc
+
     @classmethod
     def _validate_output(
         cls, data: dict[str, Any] | ModelType, scheme: Type[BaseModel]
     ) -> BaseModel:
-        method = cls._get_caller_method()
         try:
-            return scheme.model_validate(data, from_attributes=True)
+            with track("validation"):
+                return scheme.model_validate(data, from_attributes=True)
+        except ValidationError as exc:
+            method = cls._get_caller_method()
+            raise RepositoryValidationError(
+                method=method, data=data, errors=exc.errors(), direction="output"
+            ) from exc
+
+    @classmethod
+    def _validate_output_many(
+        cls, data: list[ModelType], scheme: Optional[Type[BaseModel]] = None
+    ) -> list[BaseModel]:
+        # one call into pydantic-core for the whole list instead of one per row
+        adapter = cls._list_adapter if scheme is None else _list_adapter_for(scheme)
+        try:
+            with track("validation"):
+                return adapter.validate_python(data, from_attributes=True)
         except ValidationError as exc:
+            method = cls._get_caller_method()
             raise RepositoryValidationError(
                 method=method, data=data, errors=exc.errors(), direction="output"
             ) from exc
 
+    def loader(self, key: str = "id") -> Loader[Any, ModelSchemeType]:
+        """The batching loader by a unique column, one per repository and
+        so per UnitOfWork; see Loader."""
+        if key not in self._loaders:
+            column = self._model.__table__.columns.get(key)
+            if column is None or not (column.primary_key or column.unique):
+                raise ValueError(f"{self._model.__name__}.{key} is not a unique column")
+            lock = self._session.info.setdefault(LOADER_LOCK, asyncio.Lock())
+            self._loaders[key] = Loader(partial(self._load_batch, key), lock)
+        return self._loaders[key]
+
+    async def load(self, value: Any, key: str = "id") -> Optional[ModelSchemeType]:
+        """Like get_one({key: value}), but lookups from concurrent coroutines
+        share one query and repeated ones don't query again."""
+        return await self.loader(key).load(value)
+
+    async def load_many(
+        self, values: Sequence[Any], key: str = "id"
+    ) -> list[Optional[ModelSchemeType]]:
+        return await self.loader(key).load_many(values)
+
+    async def _load_batch(
+        self, key: str, values: list[Any]
+    ) -> dict[Any, ModelSchemeType]:
+        column = getattr(self._model, key)
+        # one array parameter: the same statement for every batch size
+        stmt = select(self._model).where(
+            column == any_(bindparam("keys", values, type_=ARRAY(column.type)))
+        )
+        res = await self._session.execute(stmt)
+        rows = list(res.scalars())
+        results = self._validate_output_many(rows)
+        return {getattr(row, key): result for row, result in zip(rows, results)}
+
+    def _written(self) -> None:
+        super()._written()
+        # memoized rows may be stale now
+        for loader in self._loaders.values():
+            loader.clear()
+
     async def insert(self, data: dict[str, Any] | InsertSchemeType) -> ModelSchemeType:
         validated_data = self._validate_input(data, self._insert_scheme)
         result = await super().insert(validated_data)
@@ -218,20 +514,83 @@ class TypedRepository(
         return None
 
     async def get_one(
-        self, filters: dict[str, Any] | FilterSchemeType
+        self,
+        filters: dict[str, Any] | FilterSchemeType,
+        load: Sequence[LoadOption] = (),
+        scheme: Optional[Type[BaseModel]] = None,
     ) -> Optional[ModelSchemeType]:
+        """`load` eager-loads relationships; pass a `scheme` with the matching
+        nested fields to get them back, the default model scheme drops them."""
         validated_filters = self._validate_input(filters, self._filter_scheme)
-        result = await super().get_one(validated_filters)
+        result = await super().get_one(validated_filters, load)
         if result:
-            return self._validate_output(result, self._model_scheme)
+            return self._validate_output(result, scheme or self._model_scheme)
         return None
 
     async def get_all(
-        self, filters: dict[str, Any] | FilterSchemeType
+        self,
+        filters: dict[str, Any] | FilterSchemeType,
+        load: Sequence[LoadOption] = (),
+        scheme: Optional[Type[BaseModel]] = None,
     ) -> list[ModelSchemeType]:
         validated_filters = self._validate_input(filters, self._filter_scheme)
-        results = await super().get_all(validated_filters)
-        return [self._validate_output(r, self._model_scheme) for r in results]
+        results = await super().get_all(validated_filters, load)
+        return self._validate_output_many(results, scheme)
+
+    async def find(
+        self,
+        query: dict[str, Any] | QueryScheme,
+        load: Sequence[LoadOption] = (),
+        scheme: Optional[Type[BaseModel]] = None,
+    ) -> list[BaseModel]:
+        """Rows matching a query of the model's generated query scheme, e.g.
+
+            await uow.payments.find({
+                "user_id": 1,
+                "created_at__gte": since,
+                "payment_method__in": [PaymentMethod.sbp, PaymentMethod.bitcoin],
+                "order_by": ["-created_at"],
+                "limit": 20,
+            })
+
+        With `columns` only those are selected, and each row comes back as
+        `scheme` (default: the model scheme) cut down to them.
+        """
+        validated_query = self._validate_query(query)
+        results = await super().find(validated_query, load)
+        scheme = scheme or self._model_scheme
+        if validated_query.columns:
+            scheme = projection_scheme(
+                self._model, scheme, tuple(validated_query.columns)
+            )
+        return self._validate_output_many(results, scheme)
+
+    async def rows(
+        self, query: dict[str, Any] | QueryScheme, shape: RowShape = "row"
+    ) -> list[Any]:
+        """Plain rows for bulk reads that don't need models, e.g.
+
+            await uow.configs.rows(
+                {"columns": ["id", "public_key", "ip_address"]}, shape="dataclass"
+            )
+
+        The query is validated, the rows are not: no scheme runs over them,
+        so secrets among `columns` come back unmasked.
+        """
+        validated_query = self._validate_query(query)
+        return await super().rows(validated_query, shape)
+
+    async def exists(self, filters: dict[str, Any] | FilterSchemeType) -> bool:
+        validated_filters = self._validate_input(filters, self._filter_scheme)
+        return await super().exists(validated_filters)
+
+    async def count(
+        self,
+        filters: Optional[dict[str, Any] | FilterSchemeType] = None,
+        mode: CountMode = "exact",
+    ) -> int:
+        validated_filters = self._validate_input(filters or {}, self._filter_scheme)
+        return await super().count(validated_filters, mode)
 
     async def update(
         self,
@@ -1,8 +1,11 @@
+import asyncio
+import os
 from typing import Optional
 
-from sqlalchemy import NullPool
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
+from src.core.config import config, reloader
+from src.core.metrics import instrument_engine
 from src.core.utils.singleton import singleton
 
 
@@ -12,15 +15,86 @@ class DBConnection:
         if url is None:
             raise ValueError("URL cannot be None")
 
-        self._engine = create_async_engine(
-            url,
-            poolclass=NullPool,
-        )
+        self._url = url
+        self._engine = self._create_engine()
         self._async_session = async_sessionmaker(
             self._engine,
             expire_on_commit=False,
         )
 
+    def _create_engine(self) -> AsyncEngine:
+        engine = create_async_engine(
+            self._url,
+            pool_size=config.db.DB_POOL_SIZE,
+            max_overflow=config.db.DB_MAX_OVERFLOW,
+            pool_timeout=config.db.DB_POOL_TIMEOUT,
+            pool_recycle=config.db.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        instrument_engine(engine.sync_engine)
+        return engine
+
+    @property
+    def engine(self):
+        return self._engine
+
     @property
     def async_session(self):
         return self._async_session
+
+    async def warm_up(self) -> int:
+        """Opens `pool_size` connections at once so the first requests
+        don't pay for the TCP/TLS/auth handshakes."""
+        size = self._engine.pool.size()
+        results = await asyncio.gather(
+            *(self._engine.connect() for _ in range(size)), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for connection in results:
+            if not isinstance(connection, BaseException):
+                await connection.close()
+        if errors:
+            raise errors[0]
+        return size
+
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+
+    async def replace_pool(self) -> None:
+        """Swaps in an engine built from the current pool settings.
+
+        New sessions use it at once. Disposing the old engine closes its
+        idle connections; the ones still checked out finish their work and
+        are closed with the old pool.
+        """
+        old = self._engine
+        self._engine = self._create_engine()
+        self._async_session.configure(bind=self._engine)
+        await old.dispose()
+
+
+def _reset_after_fork() -> None:
+    instance = DBConnection.instance
+    if instance is not None:
+        # the pooled connections belong to the parent process: drop them
+        # without closing, the child opens its own on first use
+        instance.engine.sync_engine.dispose(close=False)
+        DBConnection.reset()
+
+
+async def _apply_pool_settings() -> None:
+    instance = DBConnection.instance
+    if instance is not None:
+        await instance.replace_pool()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+reloader.on_change(
+    (
+        "db.DB_POOL_SIZE",
+        "db.DB_MAX_OVERFLOW",
+        "db.DB_POOL_TIMEOUT",
+        "db.DB_POOL_RECYCLE",
+    ),
+    _apply_pool_settings,
+)
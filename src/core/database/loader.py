@@ -0,0 +1,96 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MAX_BATCH = 1000
+
+
+class Loader(Generic[K, V]):
+    """Coalesces lookups by key into batches, DataLoader style.
+
+        users = await asyncio.gather(*(loader.load(i) for i in ids))
+
+    Keys requested before the event loop gets back to the loader (all
+    coroutines of a gather, a loop of create_task) are fetched with one
+    `batch` call. Results, misses included, are memoized for the loader's
+    life, so a loader should not outlive the request it serves.
+
+    `lock` serializes batches that share a session, which can't run two
+    statements at once.
+    """
+
+    def __init__(
+        self,
+        batch: Callable[[list[K]], Awaitable[dict[K, V]]],
+        lock: Optional[asyncio.Lock] = None,
+        max_batch: int = MAX_BATCH,
+    ) -> None:
+        self._batch = batch
+        self._lock = lock or asyncio.Lock()
+        self._max_batch = max_batch
+        self._results: dict[K, asyncio.Future] = {}
+        self._pending: dict[K, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            if not self._pending:
+                # runs after every callback already scheduled for this tick
+                loop.call_soon(self._dispatch)
+            self._pending[key] = future
+        # one cancelled caller must not cancel the result for the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        if key in self._results:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    def clear(self) -> None:
+        """Forgets memoized results, e.g. after the rows were written."""
+        self._results = {
+            key: future for key, future in self._results.items() if not future.done()
+        }
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self._max_batch):
+            chunk = {key: pending[key] for key in keys[start : start + self._max_batch]}
+            task = asyncio.create_task(self._fetch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, futures: dict[K, asyncio.Future]) -> None:
+        try:
+            async with self._lock:
+                found = await self._batch(list(futures))
+        except BaseException as e:
+            for key, future in futures.items():
+                # the next load() retries instead of replaying the failure
+                if self._results.get(key) is future:
+                    del self._results[key]
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(found.get(key))
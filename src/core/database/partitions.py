@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+
+class Partition(NamedTuple):
+    name: str
+    # bound expression as Postgres prints it, e.g.
+    # FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')
+    bounds: str
+
+
+def month_start(moment: date | datetime) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class MonthlyPartitions:
+    """Maintenance of a table range-partitioned by month.
+
+    Partitions are named `<table>_pYYYYMM` and created by the
+    `<table>_create_partitions(first_month, last_month)` SQL function from
+    the migration, so cron jobs and the app share one implementation.
+    """
+
+    def __init__(self, table: str) -> None:
+        self.table = table
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_p{month:%Y%m}"
+
+    async def ensure(self, connection: AsyncConnection, months_ahead: int) -> int:
+        """Creates missing partitions from the current month up to
+        `months_ahead` months ahead; returns how many were created."""
+        this_month = month_start(datetime.now())
+        created = await connection.scalar(
+            text(f"SELECT {self.table}_create_partitions(:first, :last)"),
+            {"first": this_month, "last": add_months(this_month, months_ahead)},
+        )
+        if created:
+            logger.info("Created %d %s partitions", created, self.table)
+        return created
+
+    async def partitions(self, connection: AsyncConnection) -> list[Partition]:
+        res = await connection.execute(
+            text(
+                "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+                "FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:table AS regclass) "
+                "ORDER BY child.relname"
+            ),
+            {"table": self.table},
+        )
+        return [Partition(*row) for row in res]
+
+    async def detach(self, engine: AsyncEngine, month: date) -> str:
+        """Detaches the partition of `month`, leaving it as a standalone
+        table that can be dumped and dropped without touching the parent.
+
+        DETACH ... CONCURRENTLY only takes a SHARE UPDATE EXCLUSIVE lock, so
+        writes keep flowing, but it can't run inside a transaction block.
+        """
+        name = self.partition_name(month_start(month))
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            await connection.execute(
+                text(f'ALTER TABLE {self.table} DETACH PARTITION "{name}" CONCURRENTLY')
+            )
+        logger.info("Detached partition %s", name)
+        return name
@@ -0,0 +1,190 @@
+import operator
+from dataclasses import make_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Literal, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.orm import DeclarativeBase
+
+
+MAX_LIMIT = 1000
+
+# `<column>__<operator>` fields; a bare `<column>` is equality
+OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "in": lambda column, values: column.in_(values),
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "is_null": lambda column, flag: column.is_(None) if flag else column.is_not(None),
+}
+_RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+_RANGE_TYPES = (int, float, Decimal, date, datetime)
+_RESERVED = ("order_by", "limit", "columns")
+
+
+class QueryScheme(BaseModel):
+    """Base of the generated query schemes.
+
+        {"user_id__in": [1, 2], "created_at__gte": since,
+         "order_by": ["-created_at"], "limit": 20, "columns": ["id", "amount"]}
+
+    Unknown fields are rejected, so a typo can't silently widen a query.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    order_by: Optional[list[str]] = None
+    limit: Optional[int] = None
+    columns: Optional[list[str]] = None
+
+
+def _python_type(column) -> type:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        # INET and friends: Postgres parses the text form
+        return str
+
+
+def _columns(model: Type[DeclarativeBase]) -> dict[str, Any]:
+    return {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+
+
+def _indexed(model: Type[DeclarativeBase]) -> set[str]:
+    """Attributes Postgres can read in index order."""
+    table = model.__table__
+    names = {column.name for column in table.primary_key.columns}
+    for column in table.columns:
+        if column.index or column.unique:
+            names.add(column.name)
+    for index in table.indexes:
+        names.update(column.name for column in index.columns)
+    return {key for key, column in _columns(model).items() if column.name in names}
+
+
+@lru_cache(maxsize=None)
+def query_scheme(
+    model: Type[DeclarativeBase], max_limit: int = MAX_LIMIT
+) -> Type[QueryScheme]:
+    """Builds the query scheme of a model from its columns.
+
+    Every column gets equality and `__in`; numbers and dates also get the
+    range operators, nullable columns `__is_null`. `order_by` only accepts
+    indexed columns (`-` for descending), so a limited query is served
+    from an index instead of sorting the table.
+    """
+    fields: dict[str, Any] = {}
+    for key, column in _columns(model).items():
+        python_type = _python_type(column)
+        fields[key] = (Optional[python_type], None)
+        fields[f"{key}__in"] = (
+            Optional[list[python_type]],
+            Field(None, max_length=max_limit),
+        )
+        if issubclass(python_type, _RANGE_TYPES) and python_type is not bool:
+            for op in _RANGE_OPERATORS:
+                fields[f"{key}__{op}"] = (Optional[python_type], None)
+        if column.nullable:
+            fields[f"{key}__is_null"] = (Optional[bool], None)
+
+    orderable = sorted(_indexed(model))
+    directions = [*orderable, *(f"-{key}" for key in orderable)]
+    fields["order_by"] = (Optional[list[Literal[tuple(directions)]]], None)
+    fields["limit"] = (Optional[int], Field(None, ge=1, le=max_limit))
+    fields["columns"] = (
+        Optional[list[Literal[tuple(_columns(model))]]],
+        Field(None, min_length=1),
+    )
+    return create_model(f"{model.__name__}Query", __base__=QueryScheme, **fields)
+
+
+def _split(name: str) -> tuple[str, Optional[str]]:
+    key, _, op = name.rpartition("__")
+    if key and op in OPERATORS:
+        return key, op
+    return name, None
+
+
+def compile_query(model: Type[DeclarativeBase], query: QueryScheme) -> Select:
+    """Turns a validated query into a SELECT.
+
+    Conditions compare bare columns, never expressions over them, so they
+    stay usable by indexes and by partition pruning. Ordering is completed
+    with the primary key, which keeps `limit` pages deterministic.
+    """
+    if query.columns:
+        stmt = select(*(getattr(model, key) for key in query.columns))
+    else:
+        stmt = select(model)
+
+    conditions = []
+    # sorted: the same filters always render the same SQL text, which keeps
+    # asyncpg's prepared statement cache warm
+    for name in sorted(query.model_fields_set):
+        value = getattr(query, name)
+        if name in _RESERVED or value is None:
+            continue
+        key, op = _split(name)
+        column = getattr(model, key)
+        if op is None:
+            conditions.append(column == value)
+        else:
+            conditions.append(OPERATORS[op](column, value))
+    if conditions:
+        stmt = stmt.where(*conditions)
+
+    if query.order_by:
+        ordering = [
+            (
+                getattr(model, key[1:]).desc()
+                if key.startswith("-")
+                else getattr(model, key)
+            )
+            for key in query.order_by
+        ]
+        ordered = {key.lstrip("-") for key in query.order_by}
+        descending = query.order_by[-1].startswith("-")
+        mapper = inspect(model)
+        for column in mapper.primary_key:
+            key = mapper.get_property_by_column(column).key
+            if key not in ordered:
+                attribute = getattr(model, key)
+                ordering.append(attribute.desc() if descending else attribute)
+        stmt = stmt.order_by(*ordering)
+    if query.limit is not None:
+        stmt = stmt.limit(query.limit)
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def projection_scheme(
+    model: Type[DeclarativeBase], scheme: Type[BaseModel], columns: tuple[str, ...]
+) -> Type[BaseModel]:
+    """A scheme with only `columns`, typed like `scheme` where it has them
+    (so e.g. SecretStr stays masked) and like the model column otherwise."""
+    model_columns = _columns(model)
+    fields = {}
+    for key in columns:
+        field = scheme.model_fields.get(key)
+        annotation = (
+            field.annotation if field else Optional[_python_type(model_columns[key])]
+        )
+        fields[key] = (annotation, ...)
+    name = f"{scheme.__name__}[{','.join(columns)}]"
+    return create_model(name, **fields)
+
+
+@lru_cache(maxsize=None)
+def row_class(model: Type[DeclarativeBase], columns: tuple[str, ...]) -> type:
+    """A `__slots__` dataclass for rows of `columns`: attribute access at
+    close to the size of a tuple, without a per-instance __dict__."""
+    model_columns = _columns(model)
+    return make_dataclass(
+        f"{model.__name__}Row",
+        [(key, _python_type(model_columns[key])) for key in columns],
+        slots=True,
+    )
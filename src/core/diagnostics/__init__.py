@@ -0,0 +1,11 @@
+from .memory import GroupBy, MemorySnapshots
+from .profiler import SamplingProfiler, profile
+from .tasks import dump_tasks
+
+__all__ = [
+    "GroupBy",
+    "MemorySnapshots",
+    "SamplingProfiler",
+    "dump_tasks",
+    "profile",
+]
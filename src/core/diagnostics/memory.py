@@ -0,0 +1,89 @@
+import asyncio
+import tracemalloc
+from typing import Any, Literal, Optional
+
+from src.utils import DataConflictServiceError
+
+
+# how allocation sites are grouped: by line, by file, or by whole traceback
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# allocations of the tracing machinery itself are noise
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class MemorySnapshots:
+    """tracemalloc snapshots of this worker, diffed against a baseline.
+
+    Tracing starts with the first snapshot and slows every allocation down
+    until stop(); before that, and after it, nothing is recorded.
+    """
+
+    def __init__(self, frames: int) -> None:
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    async def snapshot(self, group_by: GroupBy, limit: int) -> dict[str, Any]:
+        """Starts tracing if needed, takes the new baseline and returns its
+        largest allocation sites."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        snapshot = await self._take()
+        self._baseline = snapshot
+        stats = snapshot.statistics(group_by)
+        return {
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+            "sites": [
+                {
+                    "size": stat.size,
+                    "count": stat.count,
+                    "traceback": _frames(stat.traceback),
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    async def diff(self, group_by: GroupBy, limit: int) -> dict[str, Any]:
+        """The sites whose allocations grew the most since the baseline."""
+        baseline = self._baseline
+        if baseline is None or not tracemalloc.is_tracing():
+            raise DataConflictServiceError
+        snapshot = await self._take()
+        # comparing walks every trace of both snapshots
+        stats = await asyncio.to_thread(snapshot.compare_to, baseline, group_by)
+        return {
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+            "sites": [
+                {
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                    "traceback": _frames(stat.traceback),
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stop(self) -> None:
+        self._baseline = None
+        tracemalloc.stop()
+
+    @staticmethod
+    async def _take() -> tracemalloc.Snapshot:
+        return await asyncio.to_thread(
+            lambda: tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        )
+
+
+def _frames(traceback: tracemalloc.Traceback) -> list[str]:
+    # most recent call first, as tracemalloc stores them
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
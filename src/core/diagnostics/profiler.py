@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache
+from types import CodeType, FrameType
+
+from src.utils import DataConflictServiceError
+
+
+# one profile per worker at a time, two samplers would only skew each other
+_profiling = asyncio.Lock()
+
+
+@lru_cache(maxsize=4096)
+def _label(code: CodeType) -> str:
+    return (
+        f"{code.co_qualname} "
+        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _collapse(frame: FrameType) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread.
+
+    Stacks are counted in the collapsed format flamegraph.pl and speedscope
+    read: `outer;inner;innermost <samples>`. The profiled thread runs
+    untouched; the cost is the sampler taking the GIL once per `interval`,
+    and only while a profile is being taken.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+            # the frame keeps its whole stack alive until released
+            del frame
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+async def profile(seconds: float, interval: float) -> SamplingProfiler:
+    """Samples the event loop thread of this worker for `seconds`.
+
+    Only the worker that serves the request is profiled; idle time shows
+    up as stacks ending in the selector.
+    """
+    if _profiling.locked():
+        raise DataConflictServiceError
+    async with _profiling:
+        profiler = SamplingProfiler(threading.get_ident(), interval)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    return profiler
@@ -0,0 +1,15 @@
+import asyncio
+import io
+from typing import Optional
+
+
+def dump_tasks(limit: Optional[int] = None) -> str:
+    """The stack of every pending asyncio task of this worker, innermost
+    frame last; `limit` caps the frames shown per task."""
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    output = io.StringIO()
+    output.write(f"{len(tasks)} tasks\n")
+    for task in tasks:
+        output.write("\n")
+        task.print_stack(limit=limit, file=output)
+    return output.getvalue()
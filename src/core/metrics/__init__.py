@@ -0,0 +1,36 @@
+from .metrics import registry, Counter, Gauge, Histogram
+from .queries import (
+    QueryBudgetExceeded,
+    QueryStats,
+    count_queries,
+    current_queries,
+    reset_query_stats,
+    start_query_stats,
+)
+from .timing import (
+    RequestTimings,
+    current_timings,
+    instrument_engine,
+    reset_request_timings,
+    start_request_timings,
+    track,
+)
+
+__all__ = [
+    "registry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "QueryBudgetExceeded",
+    "QueryStats",
+    "count_queries",
+    "current_queries",
+    "reset_query_stats",
+    "start_query_stats",
+    "RequestTimings",
+    "current_timings",
+    "instrument_engine",
+    "reset_request_timings",
+    "start_request_timings",
+    "track",
+]
@@ -0,0 +1,93 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+# expanded IN lists and multi-row VALUES differ only in their placeholder
+# count, they are the same query shape
+_PLACEHOLDER_LIST = re.compile(r"\$\d+(?:\s*,\s*\$\d+)+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("$n", " ".join(statement.split()))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request or block runs too many statements."""
+
+
+class QueryStats:
+    __slots__ = ("count", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        # raw statement text -> executions; shapes are only computed on report
+        self.statements: dict[str, int] = {}
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def shapes(self) -> dict[str, int]:
+        shapes: dict[str, int] = {}
+        for statement, count in self.statements.items():
+            shape = statement_shape(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return shapes
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Shapes executed at least `threshold` times, likely N+1 loops."""
+        return {
+            shape: count for shape, count in self.shapes().items() if count >= threshold
+        }
+
+    def check_budget(self, budget: int, where: str) -> None:
+        if self.count > budget:
+            worst = sorted(self.shapes().items(), key=lambda item: -item[1])[:3]
+            details = "; ".join(f"{count}x {shape[:120]}" for shape, count in worst)
+            raise QueryBudgetExceeded(
+                f"{where} ran {self.count} statements, budget is {budget}: {details}"
+            )
+
+
+_current_queries: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_queries() -> Optional[QueryStats]:
+    return _current_queries.get()
+
+
+def start_query_stats() -> tuple[QueryStats, object]:
+    stats = QueryStats()
+    return stats, _current_queries.set(stats)
+
+
+def reset_query_stats(token) -> None:
+    _current_queries.reset(token)
+
+
+def record_statement(statement: str) -> None:
+    stats = _current_queries.get()
+    if stats is not None:
+        stats.record(statement)
+
+
+@contextmanager
+def count_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """Counts statements run inside the block, for tests:
+
+        with count_queries(budget=2) as stats:
+            await service.profile(user_id)
+
+    A block over `budget` raises QueryBudgetExceeded once it completed.
+    """
+    stats, token = start_query_stats()
+    try:
+        yield stats
+    finally:
+        reset_query_stats(token)
+    if budget is not None:
+        stats.check_budget(budget, "block")
@@ -0,0 +1,4 @@
+from .rate_limit import RateLimitMiddleware
+from .timing import TimingMiddleware
+
+__all__ = ["RateLimitMiddleware", "TimingMiddleware"]
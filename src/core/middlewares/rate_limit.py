@@ -0,0 +1,194 @@
+import json
+import re
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import config, reloader
+from src.core.rate_limit import RateLimit, RateLimiter, retry_after_header
+
+
+# code defaults, RATE_LIMIT_ROUTES overrides them per route template
+ROUTE_LIMITS: dict[str, RateLimit] = {
+    "/auth/register": RateLimit(rate=0.2, burst=3),
+    "/users/{telegram_id}/configs/{config_id}": RateLimit(rate=1.0, burst=10),
+    "/users/{telegram_id}/configs": RateLimit(rate=0.1, burst=3),
+}
+# webhooks come in provider bursts and are authenticated by signature, node
+# syncs page through every peer and are authenticated by token
+EXEMPT_ROUTES = {
+    "/metrics",
+    "/servers/{server_id}/peers",
+    "/webhooks/payments/{provider}",
+}
+
+TELEGRAM_ID_HEADER = b"x-telegram-id"
+MAX_INSPECTED_BODY = 4096
+
+_REJECTED_BODY = json.dumps({"detail": "TOO MANY REQUESTS"}).encode()
+
+
+class _LimitedRoute:
+    __slots__ = ("regex", "path", "methods", "limit")
+
+    def __init__(self, route: Route, limit: RateLimit) -> None:
+        self.regex: re.Pattern = route.path_regex
+        self.path: str = route.path
+        self.methods: Optional[set[str]] = route.methods
+        self.limit = limit
+
+
+def _limit_for(path: str) -> RateLimit:
+    override = config.rate_limit.RATE_LIMIT_ROUTES.get(path)
+    if override is not None:
+        return RateLimit(rate=override["rate"], burst=int(override["burst"]))
+    return ROUTE_LIMITS.get(
+        path,
+        RateLimit(
+            rate=config.rate_limit.RATE_LIMIT_RATE,
+            burst=config.rate_limit.RATE_LIMIT_BURST,
+        ),
+    )
+
+
+class RateLimitMiddleware:
+    """Rejects over-limit requests before routing, body parsing or any DB work.
+
+    Clients are identified by the `X-Telegram-Id` header, then by a
+    `telegram_id` query/path parameter, then by the `telegram_id` field of a
+    small JSON body, and finally by the peer address.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.enabled = config.rate_limit.RATE_LIMIT_ENABLED
+        self.limiter = RateLimiter(
+            redis_timeout=config.rate_limit.RATE_LIMIT_REDIS_TIMEOUT,
+            local_keys=config.rate_limit.RATE_LIMIT_LOCAL_KEYS,
+        )
+        self._routes: Optional[list[_LimitedRoute]] = None
+        reloader.on_change(
+            [f"rate_limit.{name}" for name in type(config.rate_limit).model_fields],
+            self._apply_settings,
+        )
+
+    def _apply_settings(self) -> None:
+        settings = config.rate_limit
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.limiter.configure(
+            redis_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            local_keys=settings.RATE_LIMIT_LOCAL_KEYS,
+        )
+        # limits are resolved per route once, on the next request
+        self._routes = None
+
+    def _build_routes(self, scope: Scope) -> list[_LimitedRoute]:
+        return [
+            _LimitedRoute(route, _limit_for(route.path))
+            for route in scope["app"].router.routes
+            if isinstance(route, Route) and route.path not in EXEMPT_ROUTES
+        ]
+
+    def _match(
+        self, scope: Scope
+    ) -> tuple[Optional[_LimitedRoute], Optional[re.Match]]:
+        if self._routes is None:
+            self._routes = self._build_routes(scope)
+        path, method = scope["path"], scope["method"]
+        for route in self._routes:
+            match = route.regex.match(path)
+            if match and (route.methods is None or method in route.methods):
+                return route, match
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route, match = self._match(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        client_key, receive = await self._client_key(scope, receive, match)
+        decision = await self.limiter.hit(route.path, client_key, route.limit)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_REJECTED_BODY)).encode()),
+                    (b"retry-after", retry_after_header(decision).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": _REJECTED_BODY})
+
+    async def _client_key(
+        self, scope: Scope, receive: Receive, match: re.Match
+    ) -> tuple[str, Receive]:
+        headers = dict(scope["headers"])
+        if telegram_id := headers.get(TELEGRAM_ID_HEADER):
+            return f"tg:{telegram_id.decode('latin-1')}", receive
+
+        if telegram_id := match.groupdict().get("telegram_id"):
+            return f"tg:{telegram_id}", receive
+
+        if query := scope.get("query_string"):
+            for name, value in parse_qsl(query.decode("latin-1")):
+                if name == "telegram_id":
+                    return f"tg:{value}", receive
+
+        content_type = headers.get(b"content-type", b"")
+        content_length = headers.get(b"content-length")
+        if (
+            content_type.startswith(b"application/json")
+            and content_length is not None
+            and content_length.isdigit()
+            and int(content_length) <= MAX_INSPECTED_BODY
+        ):
+            body, receive = await _buffer_body(receive)
+            try:
+                telegram_id = json.loads(body).get("telegram_id")
+            except (ValueError, AttributeError):
+                telegram_id = None
+            if telegram_id is not None:
+                return f"tg:{telegram_id}", receive
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", receive
+
+
+async def _buffer_body(receive: Receive) -> tuple[bytes, Receive]:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            # disconnected while sending the body, let the app see it
+            pending: list[Message] = [message]
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    else:
+        pending = []
+    body = b"".join(chunks)
+    replay: list[Message] = [
+        {"type": "http.request", "body": body, "more_body": False},
+        *pending,
+    ]
+
+    async def replay_receive() -> Message:
+        if replay:
+            return replay.pop(0)
+        return await receive()
+
+    return body, replay_receive
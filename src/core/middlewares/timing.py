@@ -0,0 +1,157 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import config, reloader
+from src.core.metrics import (
+    QueryStats,
+    registry,
+    reset_query_stats,
+    reset_request_timings,
+    start_query_stats,
+    start_request_timings,
+)
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    labels=("method", "route", "status"),
+)
+component_duration = registry.histogram(
+    "http_request_component_seconds",
+    "Time spent per component (db, cache, validation) within a request",
+    labels=("route", "component"),
+)
+request_queries = registry.histogram(
+    "http_request_queries",
+    "SQL statements executed per request",
+    labels=("route",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+repeated_queries = registry.counter(
+    "http_request_repeated_queries_total",
+    "Requests that repeated one statement shape (likely N+1)",
+    labels=("route",),
+)
+
+# statement budgets tighter than DB_QUERY_BUDGET, by route template
+QUERY_BUDGETS: dict[str, int] = {
+    "/users/{telegram_id}/configs/{config_id}": 2,
+    "/users/{telegram_id}/profile": 2,
+}
+
+
+def _route_name(scope: Scope) -> str:
+    # the matched template keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._apply_settings()
+        reloader.on_change(
+            (
+                "api.SERVER_TIMING",
+                "api.SLOW_REQUEST_MS",
+                "db.DB_QUERY_BUDGET",
+                "db.DB_QUERY_STRICT",
+                "db.DB_REPEATED_QUERY_THRESHOLD",
+            ),
+            self._apply_settings,
+        )
+
+    def _apply_settings(self) -> None:
+        self.server_timing = config.api.SERVER_TIMING
+        self.slow_threshold = config.api.SLOW_REQUEST_MS / 1000
+        self.query_budget = config.db.DB_QUERY_BUDGET
+        self.strict_queries = config.db.DB_QUERY_STRICT
+        self.repeated_threshold = config.db.DB_REPEATED_QUERY_THRESHOLD
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request_timings()
+        queries, queries_token = start_query_stats()
+        status_code = 500
+        completed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", timings.server_timing(timings.elapsed())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            completed = True
+        finally:
+            total = timings.elapsed()
+            reset_request_timings(token)
+            reset_query_stats(queries_token)
+            route = _route_name(scope)
+            request_duration.observe(
+                total, method=scope["method"], route=route, status=status_code
+            )
+            for component, seconds in timings.durations.items():
+                component_duration.observe(seconds, route=route, component=component)
+            if total >= self.slow_threshold:
+                logger.warning(
+                    "Slow request %s %s: %.1f ms (%s)",
+                    scope["method"],
+                    route,
+                    total * 1000,
+                    timings.server_timing(total),
+                    extra={
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round(total * 1000, 2),
+                        "breakdown_ms": {
+                            k: round(v * 1000, 2) for k, v in timings.durations.items()
+                        },
+                        "calls": timings.counts,
+                    },
+                )
+            if queries.count:
+                # raising while the request's own error propagates would
+                # replace it, so a failed request only logs its overrun
+                self._check_queries(scope["method"], route, queries, completed)
+
+    def _check_queries(
+        self, method: str, route: str, queries: QueryStats, completed: bool
+    ) -> None:
+        request_queries.observe(queries.count, route=route)
+        repeated = queries.repeated(self.repeated_threshold)
+        if repeated:
+            repeated_queries.inc(route=route)
+            for shape, count in repeated.items():
+                logger.warning(
+                    "Possible N+1 in %s %s: %d x %s",
+                    method,
+                    route,
+                    count,
+                    shape[:200],
+                    extra={"route": route, "repeats": count},
+                )
+        budget = QUERY_BUDGETS.get(route, self.query_budget)
+        if self.strict_queries and completed:
+            queries.check_budget(budget, f"{method} {route}")
+        elif queries.count > budget:
+            logger.warning(
+                "%s %s ran %d statements, budget is %d",
+                method,
+                route,
+                queries.count,
+                budget,
+            )
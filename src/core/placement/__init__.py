@@ -0,0 +1,11 @@
+from .addresses import peer_network, peer_range, peer_slots
+from .engine import Node, Placement, score
+
+__all__ = [
+    "Node",
+    "Placement",
+    "peer_network",
+    "peer_range",
+    "peer_slots",
+    "score",
+]
@@ -0,0 +1,17 @@
+from ipaddress import IPv4Address, IPv4Network
+
+
+def peer_range(subnet: IPv4Network) -> tuple[IPv4Address, IPv4Address]:
+    """First and last peer address of a node's subnet; the first host is
+    the node's own interface."""
+    return subnet.network_address + 2, subnet.broadcast_address - 1
+
+
+def peer_slots(subnet: IPv4Network) -> int:
+    first, last = peer_range(subnet)
+    return max(int(last) - int(first) + 1, 0)
+
+
+def peer_network(address: IPv4Address) -> IPv4Network:
+    # a peer routes exactly its own address
+    return IPv4Network(f"{address}/32")
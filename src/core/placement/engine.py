@@ -0,0 +1,108 @@
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+
+@dataclass(slots=True)
+class Node:
+    id: int
+    capacity: int
+    # peers on the node
+    load: int = 0
+
+
+def score(node: Node, key: str) -> float:
+    """Weighted rendezvous score of `key` on `node`, the highest one wins.
+
+    -ln(u) of a uniform u is exponentially distributed, so a node wins a
+    share of all keys proportional to its capacity. A node that joins only
+    takes the keys it now wins, a node that leaves only gives up its own.
+    """
+    digest = hashlib.blake2b(f"{node.id}:{key}".encode(), digest_size=8).digest()
+    # strictly between 0 and 1
+    u = (int.from_bytes(digest, "big") + 1) / (2**64 + 1)
+    return node.capacity / -math.log(u)
+
+
+class Placement:
+    """Places peers, keyed by public key, on nodes.
+
+    Every key ranks the nodes by `score`. A new peer goes to the first node
+    in its ranking that is under a bounded load: `load_factor` times its
+    capacity share of all peers, and never more than its capacity. The
+    bound keeps a node that many keys hash to from filling up first, the
+    ranking keeps the choice stable while loads stay within the bound.
+
+    Loads are updated through `add` and `move`, so one instance can plan a
+    batch of placements. `unplaced` counts peers on nodes outside the
+    placement (inactive ones) that still have to be moved in.
+    """
+
+    def __init__(
+        self, nodes: Iterable[Node], load_factor: float, unplaced: int = 0
+    ) -> None:
+        # a node without capacity never wins a key
+        self.nodes = [node for node in nodes if node.capacity > 0]
+        self.load_factor = load_factor
+        self.capacity = sum(node.capacity for node in self.nodes)
+        self.peers = sum(node.load for node in self.nodes) + unplaced
+
+    def __contains__(self, node: Node) -> bool:
+        return any(node is candidate for candidate in self.nodes)
+
+    def ranking(self, key: str) -> list[Node]:
+        return sorted(self.nodes, key=lambda node: score(node, key), reverse=True)
+
+    def share(self, node: Node) -> float:
+        """The node's fair share of the current peers."""
+        return self.peers * node.capacity / self.capacity
+
+    def bound(self, node: Node) -> int:
+        # counting the peer being placed keeps every bound above zero, and
+        # the bounds' sum above the peers, so only full nodes refuse
+        share = (self.peers + 1) * node.capacity / self.capacity
+        return min(node.capacity, math.ceil(share * self.load_factor))
+
+    def choose(self, key: str, exclude: Iterable[int] = ()) -> Optional[Node]:
+        """The node a new peer goes to, None when every node is full."""
+        excluded = set(exclude)
+        for node in self.ranking(key):
+            if node.id not in excluded and node.load < self.bound(node):
+                return node
+        return None
+
+    def overload(self, node: Node, tolerance: float) -> int:
+        """Peers to move off `node` to bring it back to its share; zero while
+        it stays within `tolerance` above it. Every peer of a node outside
+        the placement has to move."""
+        if node not in self:
+            return node.load
+        share = self.share(node)
+        if node.load <= share * (1 + tolerance):
+            return 0
+        return node.load - math.ceil(share)
+
+    def destination(self, key: str, current: Node) -> Optional[Node]:
+        """Where rebalancing moves a peer of `current`, None to keep it.
+
+        A peer only moves to a node it ranks above `current` and that is
+        under its share, so moves follow the hashing: a node that joined
+        takes the keys it wins, and nothing else is shuffled.
+        """
+        if current not in self:
+            return self.choose(key)
+        for node in self.ranking(key):
+            if node is current:
+                return None
+            if node.load < self.share(node):
+                return node
+        return None
+
+    def add(self, node: Node) -> None:
+        node.load += 1
+        self.peers += 1
+
+    def move(self, source: Node, target: Node) -> None:
+        source.load -= 1
+        target.load += 1
@@ -0,0 +1,15 @@
+from .limiter import (
+    Decision,
+    LocalTokenBucket,
+    RateLimit,
+    RateLimiter,
+    retry_after_header,
+)
+
+__all__ = [
+    "Decision",
+    "LocalTokenBucket",
+    "RateLimit",
+    "RateLimiter",
+    "retry_after_header",
+]
@@ -0,0 +1,155 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.cache.helper import CacheHelper
+from src.core.metrics import registry
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+decisions = registry.counter(
+    "rate_limit_decisions_total",
+    "Rate limit decisions by route, result and backend",
+    labels=("route", "result", "backend"),
+)
+
+# GCRA: one key per client holds the "theoretical arrival time" (ms).
+# A request is allowed while it would not push the TAT further than
+# `burst` emission intervals ahead of now.
+_GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + tonumber(now_parts[2]) / 1000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local ahead = new_tat - now
+if ahead > tolerance then
+    return {0, math.ceil(ahead - tolerance)}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(ahead))
+return {1, 0}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    rate: float  # sustained requests per second
+    burst: int  # requests allowed at once
+
+    @property
+    def interval_ms(self) -> float:
+        return 1000 / self.rate
+
+    @property
+    def tolerance_ms(self) -> float:
+        return self.interval_ms * self.burst
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class LocalTokenBucket:
+    """Per-process fallback used while Redis is unavailable."""
+
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str, limit: RateLimit) -> Decision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(limit.burst), now))
+        tokens = min(float(limit.burst), tokens + (now - updated_at) * limit.rate)
+        if tokens >= 1:
+            self._store(key, tokens - 1, now)
+            return Decision(True)
+        self._store(key, tokens, now)
+        return Decision(False, (1 - tokens) / limit.rate)
+
+    def resize(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        while len(self._buckets) > max_keys:
+            self._buckets.popitem(last=False)
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        redis_timeout: float,
+        local_keys: int,
+        prefix: str = "rl",
+    ) -> None:
+        self._redis_timeout = redis_timeout
+        self._prefix = prefix
+        self._local = LocalTokenBucket(local_keys)
+        self._script = None
+        self._script_client: Optional[Redis] = None
+
+    def configure(self, redis_timeout: float, local_keys: int) -> None:
+        self._redis_timeout = redis_timeout
+        self._local.resize(local_keys)
+
+    def _redis(self) -> Optional[Redis]:
+        # None while the Redis circuit breaker is open
+        client = CacheHelper.get_client()
+        if client is not None and client is not self._script_client:
+            self._script = client.register_script(_GCRA_SCRIPT)
+            self._script_client = client
+        return client
+
+    async def hit(self, route: str, client_key: str, limit: RateLimit) -> Decision:
+        key = f"{self._prefix}:{route}:{client_key}"
+        if self._redis() is not None:
+            try:
+                allowed, retry_ms = await asyncio.wait_for(
+                    self._script(
+                        keys=[key], args=[limit.interval_ms, limit.tolerance_ms]
+                    ),
+                    timeout=self._redis_timeout,
+                )
+                CacheHelper.report_success()
+                decision = Decision(bool(allowed), int(retry_ms) / 1000)
+                self._count(route, decision, "redis")
+                return decision
+            except (RedisError, OSError, asyncio.TimeoutError) as e:
+                CacheHelper.report_error(e)
+                logger.warning("Rate limiter falls back to local buckets: %r", e)
+
+        decision = self._local.hit(key, limit)
+        self._count(route, decision, "local")
+        return decision
+
+    @staticmethod
+    def _count(route: str, decision: Decision, backend: str) -> None:
+        decisions.inc(
+            route=route,
+            result="allowed" if decision.allowed else "rejected",
+            backend=backend,
+        )
+
+
+def retry_after_header(decision: Decision) -> str:
+    return str(max(1, math.ceil(decision.retry_after)))
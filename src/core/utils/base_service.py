@@ -22,22 +22,38 @@ class BaseService:
                 return await func(*args, **kwargs)
             except ServiceError as service_error:
                 logger.error(
-                    f"Service error in {service_name}.{func.__name__}: {service_error.response_status.value}, params: {kwargs}"
+                    "Service error in %s.%s: %s, params: %s",
+                    service_name,
+                    func.__name__,
+                    service_error.response_status.value,
+                    kwargs,
                 )
                 raise service_error
             except ValidationError as validation_error:
                 logger.error(
-                    f"Validating error in {service_name}.{func.__name__}: {validation_error}, params: {kwargs}"
+                    "Validating error in %s.%s: %s, params: %s",
+                    service_name,
+                    func.__name__,
+                    validation_error,
+                    kwargs,
                 )
                 raise validation_error
             except SQLAlchemyError as db_error:
                 logger.error(
-                    f"SQLAlchemy error in {service_name}.{func.__name__}: {db_error}, params: {kwargs}"
+                    "SQLAlchemy error in %s.%s: %s, params: %s",
+                    service_name,
+                    func.__name__,
+                    db_error,
+                    kwargs,
                 )
                 raise InternalServiceError
             except Exception as unexpected_error:
                 logger.error(
-                    f"Unexpected error in {service_name}.{func.__name__}: {unexpected_error}, params: {kwargs}"
+                    "Unexpected error in %s.%s: %s, params: %s",
+                    service_name,
+                    func.__name__,
+                    unexpected_error,
+                    kwargs,
                 )
                 raise InternalServiceError
 
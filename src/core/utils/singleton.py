@@ -8,6 +8,13 @@ class _SingletonWrapper:
             self.__instance = self.__wrapped__(*args, **kwargs)
         return self.__instance
 
+    @property
+    def instance(self):
+        return self.__instance
+
+    def reset(self) -> None:
+        self.__instance = None
+
 
 def singleton(cls):
     return _SingletonWrapper(cls)
@@ -1,8 +1,21 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
+from src.core.admission import Priority, UoWKind, admission
 from src.core.config import config
+from src.core.database.base import AFTER_COMMIT
 from src.core.database.connection import DBConnection
+from src.repositories import (
+    ConfigRepository,
+    PaymentEventRepository,
+    PaymentRepository,
+    ServerRepository,
+    UserRepository,
+)
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
 
 
 class UnitOfWorkABC(ABC):
@@ -28,18 +41,50 @@ class UnitOfWorkABC(ABC):
 
 
 class UnitOfWork(UnitOfWorkABC):
-    def __init__(self) -> None:
+    users: UserRepository
+    payments: PaymentRepository
+    payment_events: PaymentEventRepository
+    configs: ConfigRepository
+    servers: ServerRepository
+
+    def __init__(
+        self, kind: UoWKind = "write", priority: Priority = Priority.DEFAULT
+    ) -> None:
         self.async_session = DBConnection(config.db.url).async_session
+        self.kind = kind
+        self.priority = priority
+        self._admitted = False
 
-    async def __aenter__(self) -> None:
+    async def __aenter__(self) -> "UnitOfWork":
+        # sheds the request with DataFetchError when no slot frees up in time
+        self._admitted = await admission.acquire(self.kind, self.priority)
         self.session = self.async_session()
+        self.users = UserRepository(self.session)
+        self.payments = PaymentRepository(self.session)
+        self.payment_events = PaymentEventRepository(self.session)
+        self.configs = ConfigRepository(self.session)
+        self.servers = ServerRepository(self.session)
+        return self
 
     async def __aexit__(self, *args: Any) -> None:
-        await self.rollback()
-        await self.session.close()
+        try:
+            await self.rollback()
+            await self.session.close()
+        finally:
+            if self._admitted:
+                self._admitted = False
+                admission.release(self.kind)
 
     async def commit(self) -> None:
         await self.session.commit()
+        # hooks registered by repositories, e.g. cache invalidation, only
+        # run once the data they depend on is visible to other sessions
+        for callback in self.session.info.pop(AFTER_COMMIT, []):
+            try:
+                await callback()
+            except Exception as e:
+                logger.error("After-commit hook %r failed: %s", callback, e)
 
     async def rollback(self) -> None:
         await self.session.rollback()
+        self.session.info.pop(AFTER_COMMIT, None)
@@ -0,0 +1,18 @@
+from .archive import SOURCES, ArchiveJob, archive_job, read_archive
+from .bulk import TABLES, export_tables, import_tables
+from .payment_events import PaymentEventProcessor, payment_event_processor
+from .rebalance import Rebalancer, rebalancer
+
+__all__ = [
+    "ArchiveJob",
+    "PaymentEventProcessor",
+    "Rebalancer",
+    "SOURCES",
+    "TABLES",
+    "archive_job",
+    "export_tables",
+    "import_tables",
+    "payment_event_processor",
+    "read_archive",
+    "rebalancer",
+]
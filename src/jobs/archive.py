@@ -0,0 +1,353 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import config
+from src.core.metrics import registry
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+archived_rows = registry.counter(
+    "archive_rows_total",
+    "Rows moved from hot tables into archive files",
+    labels=("table",),
+)
+
+CHECKPOINT = "checkpoint.json"
+# a re-archived batch directly follows its first copy, so remembering the
+# latest keys is enough to drop it
+DEDUPE_WINDOW = 100_000
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveSource:
+    table: str
+    # selects the primary keys of one batch of cold rows, locking them
+    select_batch: str
+    # primary key columns, matched against the batch selection
+    key: str
+
+    def delete_statement(self) -> str:
+        return (
+            f"DELETE FROM {self.table} WHERE ({self.key}) IN ({self.select_batch}) "
+            "RETURNING *"
+        )
+
+
+# configs have no deleted marker to tell a cold row from a live one, so only
+# payments are archived for now
+SOURCES = {
+    "payments": ArchiveSource(
+        table="payments",
+        # created_at bounds the scan to the cold partitions
+        select_batch=(
+            "SELECT id, created_at FROM payments WHERE created_at < :cutoff "
+            "ORDER BY created_at LIMIT :batch FOR UPDATE SKIP LOCKED"
+        ),
+        key="id, created_at",
+    ),
+}
+
+
+@dataclass
+class Part:
+    name: str
+    rows: int = 0
+    # end of the last batch written before its DELETE committed
+    offset: int = 0
+
+
+@dataclass
+class Checkpoint:
+    table: str
+    cutoff: str
+    parts: list[Part] = field(default_factory=list)
+    rows: int = 0
+    batches: int = 0
+    done: bool = False
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["Checkpoint"]:
+        path = os.path.join(directory, CHECKPOINT)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        data["parts"] = [Part(**part) for part in data["parts"]]
+        return cls(**data)
+
+    def save(self, directory: str) -> None:
+        # write-then-rename, so a crash never leaves half a checkpoint
+        path = os.path.join(directory, CHECKPOINT)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+
+def _json_default(value: Any) -> str:
+    # datetimes, Decimals, inet addresses
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class ArchiveJob:
+    """Moves cold rows of one table into gzip-compressed NDJSON files.
+
+    Every batch is one gzip member appended to the current part file. The
+    member is fsynced and the checkpoint saved *before* the DELETE commits,
+    so a crash can at worst archive a batch twice (the reader drops the
+    duplicates), never lose it. On resume the part file is truncated to the
+    checkpointed offset, dropping a member whose checkpoint never happened.
+
+    Between batches the job sleeps so it holds locks at most `duty_cycle`
+    of the time, and short lock/statement timeouts make it back off rather
+    than queue behind production traffic.
+
+    `directory` holds one run; resuming it keeps the cutoff of its
+    checkpoint, whatever `cutoff` was passed.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        source: ArchiveSource,
+        cutoff: datetime,
+        directory: str,
+        batch_size: int,
+        duty_cycle: float,
+        part_bytes: int,
+    ) -> None:
+        self.engine = engine
+        self.source = source
+        self.cutoff = cutoff
+        self.directory = directory
+        self.batch_size = batch_size
+        self.duty_cycle = duty_cycle
+        self.part_bytes = part_bytes
+
+    async def run(self, max_batches: Optional[int] = None) -> Checkpoint:
+        os.makedirs(self.directory, exist_ok=True)
+        checkpoint = Checkpoint.load(self.directory) or Checkpoint(
+            self.source.table, self.cutoff.isoformat()
+        )
+        if checkpoint.done:
+            logger.info("Archive %s is already complete", self.directory)
+            return checkpoint
+        # rows are deleted with the cutoff they were archived with
+        self.cutoff = datetime.fromisoformat(checkpoint.cutoff)
+        part = self._resume_part(checkpoint)
+
+        batches = failures = 0
+        while max_batches is None or batches < max_batches:
+            started = time.perf_counter()
+            try:
+                count = await self._move_batch(checkpoint, part)
+            except DBAPIError as e:
+                # lock or statement timeout: production traffic comes first
+                failures += 1
+                if failures > config.archive.ARCHIVE_MAX_RETRIES:
+                    raise
+                logger.warning("Archive batch failed, backing off: %s", e)
+                await asyncio.sleep(min(2**failures, 60))
+                continue
+            batches += 1
+            failures = 0
+            if count < self.batch_size:
+                checkpoint.done = True
+                checkpoint.save(self.directory)
+                break
+            if part.offset >= self.part_bytes:
+                part = self._new_part(checkpoint)
+            await self._throttle(time.perf_counter() - started)
+
+        logger.info(
+            "Archived %d %s rows in %d batches to %s",
+            checkpoint.rows,
+            self.source.table,
+            checkpoint.batches,
+            self.directory,
+        )
+        return checkpoint
+
+    async def _move_batch(self, checkpoint: Checkpoint, part: Part) -> int:
+        settings = config.archive
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                text(
+                    f"SET LOCAL lock_timeout = {int(settings.ARCHIVE_LOCK_TIMEOUT_MS)}"
+                )
+            )
+            await connection.execute(
+                text(
+                    "SET LOCAL statement_timeout = "
+                    f"{int(settings.ARCHIVE_STATEMENT_TIMEOUT_MS)}"
+                )
+            )
+            res = await connection.execute(
+                text(self.source.delete_statement()),
+                {"cutoff": self.cutoff, "batch": self.batch_size},
+            )
+            rows = res.mappings().all()
+            if rows:
+                part.offset = self._append(part, rows)
+                part.rows += len(rows)
+                checkpoint.rows += len(rows)
+                checkpoint.batches += 1
+                checkpoint.save(self.directory)
+            # the transaction commits here, after the rows are on disk
+        if rows:
+            archived_rows.inc(len(rows), table=self.source.table)
+            await self._after_delete(rows)
+        return len(rows)
+
+    def _append(self, part: Part, rows) -> int:
+        lines = "".join(
+            json.dumps(dict(row), default=_json_default, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+        path = os.path.join(self.directory, part.name)
+        with open(path, "ab") as f:
+            f.write(gzip.compress(lines.encode(), compresslevel=6))
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    async def _after_delete(self, rows) -> None:
+        from src.repositories import PaymentRepository
+
+        if self.source.table == "payments":
+            await PaymentRepository.count_cache.invalidate()
+
+    def _resume_part(self, checkpoint: Checkpoint) -> Part:
+        if not checkpoint.parts:
+            return self._new_part(checkpoint)
+        part = checkpoint.parts[-1]
+        path = os.path.join(self.directory, part.name)
+        if os.path.exists(path) and os.path.getsize(path) > part.offset:
+            logger.warning("Dropping an unfinished batch from %s", path)
+            with open(path, "r+b") as f:
+                f.truncate(part.offset)
+        return part
+
+    def _new_part(self, checkpoint: Checkpoint) -> Part:
+        part = Part(f"part-{len(checkpoint.parts) + 1:05d}.ndjson.gz")
+        # a leftover file of an unsaved part is discarded
+        open(os.path.join(self.directory, part.name), "wb").close()
+        checkpoint.parts.append(part)
+        return part
+
+    async def _throttle(self, busy: float) -> None:
+        if self.duty_cycle < 1:
+            await asyncio.sleep(busy * (1 - self.duty_cycle) / self.duty_cycle)
+
+
+def unfinished_run(table: str) -> Optional[str]:
+    """The latest run of `table` whose checkpoint is not done."""
+    root = os.path.join(config.archive.ARCHIVE_DIR, table)
+    if not os.path.isdir(root):
+        return None
+    for run in sorted(os.listdir(root), reverse=True):
+        checkpoint = Checkpoint.load(os.path.join(root, run))
+        if checkpoint is not None and not checkpoint.done:
+            return run
+    return None
+
+
+def archive_job(
+    table: str, older_than_days: Optional[int] = None, run: Optional[str] = None
+) -> ArchiveJob:
+    """Resumes `run`, or else the table's unfinished run; starts a new run
+    only when there is none, which needs `older_than_days`."""
+    from src.core.database import DBConnection
+
+    settings = config.archive
+    root = os.path.join(settings.ARCHIVE_DIR, table)
+    run = run or unfinished_run(table)
+    if run is not None:
+        checkpoint = Checkpoint.load(os.path.join(root, run))
+        if checkpoint is None:
+            raise FileNotFoundError(f"No {CHECKPOINT} in {os.path.join(root, run)}")
+        cutoff = datetime.fromisoformat(checkpoint.cutoff)
+        logger.info("Resuming archive run %s of %s (cutoff %s)", run, table, cutoff)
+        if older_than_days is not None:
+            logger.warning(
+                "A resumed archive keeps its cutoff, older_than_days is ignored"
+            )
+    elif older_than_days is None:
+        raise ValueError(f"No unfinished archive of {table}, older_than_days is needed")
+    else:
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        run = f"{cutoff:%Y%m%dT%H%M%S}"
+    return ArchiveJob(
+        DBConnection(config.db.url).engine,
+        SOURCES[table],
+        cutoff=cutoff,
+        directory=os.path.join(root, run),
+        batch_size=settings.ARCHIVE_BATCH_SIZE,
+        duty_cycle=settings.ARCHIVE_DUTY_CYCLE,
+        part_bytes=settings.ARCHIVE_PART_BYTES,
+    )
+
+
+def read_archive(path: str, dedupe: bool = True) -> Iterator[dict[str, Any]]:
+    """Streams the rows of an archive directory (or of a single part file).
+
+    Only the checkpointed bytes of each part are read, and rows written
+    twice by a crash-and-resume are yielded once.
+    """
+    if os.path.isfile(path):
+        files = [(path, None)]
+        key = None
+    else:
+        checkpoint = Checkpoint.load(path)
+        if checkpoint is None:
+            raise FileNotFoundError(f"No {CHECKPOINT} in {path}")
+        files = [(os.path.join(path, p.name), p.offset) for p in checkpoint.parts]
+        key = SOURCES[checkpoint.table].key if checkpoint.table in SOURCES else None
+
+    seen: OrderedDict[tuple, None] = OrderedDict()
+    key_columns = [column.strip() for column in key.split(",")] if key else []
+    for name, offset in files:
+        with open(name, "rb") as raw:
+            limited = _LimitedReader(raw, offset)
+            with gzip.GzipFile(fileobj=limited) as f:
+                for line in f:
+                    row = json.loads(line)
+                    if dedupe and key_columns:
+                        row_key = tuple(row[column] for column in key_columns)
+                        if row_key in seen:
+                            continue
+                        seen[row_key] = None
+                        if len(seen) > DEDUPE_WINDOW:
+                            seen.popitem(last=False)
+                    yield row
+
+
+class _LimitedReader:
+    """File wrapper that ends at `limit` bytes, hiding an unfinished batch."""
+
+    def __init__(self, raw, limit: Optional[int]) -> None:
+        self._raw = raw
+        self._remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining is None:
+            return self._raw.read(size)
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._raw.read(size)
+        self._remaining -= len(data)
+        return data
@@ -0,0 +1,237 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional
+
+import asyncpg
+
+from src.core.config import config
+from src.models import Payments, Servers, Users, WireGuardConfigs
+
+
+CopyFormat = Literal["binary", "csv"]
+OnConflict = Literal["skip", "update"]
+
+MANIFEST = "manifest.json"
+# parents first, so foreign keys hold at every step of an import
+TABLES = {
+    model.__tablename__: model.__table__
+    for model in (Users, Payments, Servers, WireGuardConfigs)
+}
+# peer_count belongs to the trigger on wireguard_configs, which counts the
+# configs imported after the servers
+_RECOUNT_PEERS = (
+    "UPDATE servers s SET peer_count = "
+    "(SELECT count(*) FROM wireguard_configs c WHERE c.server_id = s.id)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Throughput:
+    table: str
+    action: str
+    rows: int
+    bytes: int
+    seconds: float
+
+    def __str__(self) -> str:
+        rate = self.rows / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.action} {self.table:<18} {self.rows:>10} rows "
+            f"{self.bytes / 1e6:>9.1f} MB {self.seconds:>7.2f} s "
+            f"{rate:>12,.0f} rows/s"
+        )
+
+
+def _columns(table: str) -> list[str]:
+    return [column.name for column in TABLES[table].columns]
+
+
+def _primary_key(table: str) -> list[str]:
+    return [column.name for column in TABLES[table].primary_key.columns]
+
+
+def _rows(status: str) -> int:
+    # asyncpg returns the command tag, e.g. "COPY 1000000"
+    return int(status.split()[-1])
+
+
+async def connect() -> asyncpg.Connection:
+    settings = config.db
+    return await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        database=settings.DB_DATABASE,
+    )
+
+
+async def _schema_revision(connection: asyncpg.Connection) -> Optional[str]:
+    try:
+        return await connection.fetchval("SELECT version_num FROM alembic_version")
+    except asyncpg.UndefinedTableError:
+        return None
+
+
+async def export_tables(
+    directory: str,
+    tables: list[str],
+    fmt: CopyFormat = "binary",
+    report: Callable[[Throughput], None] = print,
+) -> list[Throughput]:
+    """COPYs each table straight into a file; asyncpg streams the data, so
+    memory use does not depend on the table size."""
+    os.makedirs(directory, exist_ok=True)
+    connection = await connect()
+    results = []
+    try:
+        # one snapshot for all tables, so the files are consistent together
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            manifest = {
+                "format": fmt,
+                "revision": await _schema_revision(connection),
+                "tables": {},
+            }
+            for table in TABLES:
+                if table not in tables:
+                    continue
+                path = os.path.join(directory, f"{table}.{fmt}")
+                started = time.perf_counter()
+                # COPY <table> TO refuses partitioned tables such as
+                # payments, COPY (SELECT ...) TO reads every partition
+                status = await connection.copy_from_query(
+                    f"SELECT {', '.join(_columns(table))} FROM {table}",
+                    output=path,
+                    format=fmt,
+                )
+                result = Throughput(
+                    table,
+                    "export",
+                    _rows(status),
+                    os.path.getsize(path),
+                    time.perf_counter() - started,
+                )
+                manifest["tables"][table] = {
+                    "file": os.path.basename(path),
+                    "columns": _columns(table),
+                    "rows": result.rows,
+                }
+                results.append(result)
+                report(result)
+    finally:
+        await connection.close()
+
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return results
+
+
+def _merge_statement(table: str, columns: list[str], on_conflict: OnConflict) -> str:
+    column_list = ", ".join(columns)
+    statement = (
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT {column_list} FROM stage_{table}"
+    )
+    if on_conflict == "skip":
+        return f"{statement} ON CONFLICT DO NOTHING"
+    key = _primary_key(table)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in key)
+    return f"{statement} ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
+
+
+async def _import_table(
+    connection: asyncpg.Connection,
+    directory: str,
+    table: str,
+    entry: dict,
+    fmt: CopyFormat,
+    on_conflict: OnConflict,
+) -> Throughput:
+    path = os.path.join(directory, entry["file"])
+    columns = entry["columns"]
+    started = time.perf_counter()
+    async with connection.transaction():
+        # rows land in a temporary copy of the table first: COPY can't skip
+        # or merge conflicting rows, INSERT ... SELECT can
+        await connection.execute(
+            f"CREATE TEMP TABLE stage_{table} (LIKE {table} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP"
+        )
+        await connection.copy_to_table(
+            f"stage_{table}", source=path, columns=columns, format=fmt
+        )
+        if table == Payments.__tablename__:
+            # imported history may predate the existing partitions
+            await connection.execute(
+                "SELECT payments_create_partitions(min(created_at)::date, "
+                "max(created_at)::date) FROM stage_payments HAVING count(*) > 0"
+            )
+        try:
+            status = await connection.execute(
+                _merge_statement(table, columns, on_conflict)
+            )
+        except (asyncpg.UniqueViolationError, asyncpg.ExclusionViolationError) as e:
+            # update mode only merges on the primary key: a row with a new
+            # id but, say, a telegram_id that exists can't be merged
+            raise ValueError(
+                f"{table}: imported rows clash with existing ones on "
+                f"{e.constraint_name} ({e.detail}); --on-conflict update only "
+                "merges rows with the same primary key"
+            ) from e
+        if table == Servers.__tablename__:
+            await connection.execute(_RECOUNT_PEERS)
+        if "id" in columns:
+            # explicit ids bypass the sequence, move it past them
+            await connection.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+            )
+    return Throughput(
+        table,
+        "import",
+        _rows(status),
+        os.path.getsize(path),
+        time.perf_counter() - started,
+    )
+
+
+async def import_tables(
+    directory: str,
+    tables: list[str],
+    on_conflict: OnConflict = "skip",
+    report: Callable[[Throughput], None] = print,
+) -> list[Throughput]:
+    """Merges an export into the database, a table per transaction.
+
+    "skip" keeps the existing row on any unique conflict. "update"
+    overwrites existing rows by primary key; a row that clashes on another
+    unique key aborts its table with a ValueError.
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    fmt = manifest["format"]
+
+    connection = await connect()
+    results = []
+    try:
+        revision = await _schema_revision(connection)
+        if fmt == "binary" and manifest["revision"] != revision:
+            # binary COPY needs the exact column types it was written with
+            raise ValueError(
+                f"Export is from schema {manifest['revision']}, database is at "
+                f"{revision}; re-export with --format csv"
+            )
+        for table in TABLES:
+            entry = manifest["tables"].get(table)
+            if entry is None or table not in tables:
+                continue
+            result = await _import_table(
+                connection, directory, table, entry, fmt, on_conflict
+            )
+            results.append(result)
+            report(result)
+    finally:
+        await connection.close()
+    return results
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from src.core.admission import Priority
+from src.core.config import config, reloader
+from src.core.metrics import registry
+from src.core.utils.uow import UnitOfWork
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+processed_events = registry.counter(
+    "payment_events_processed_total",
+    "Payment webhook events closed by the processor",
+    labels=("outcome",),
+)
+batch_seconds = registry.histogram(
+    "payment_events_batch_seconds",
+    "Time to claim, apply and close one batch of payment events",
+)
+
+
+class PaymentEventProcessor:
+    """Applies stored payment webhooks to payments, in batches.
+
+    Every replica runs one; they claim disjoint batches with SKIP LOCKED.
+    `notify()` wakes the local processor right after an event is stored,
+    polling picks up events stored by other replicas.
+    """
+
+    def __init__(self, batch_size: int, linger: float, poll_interval: float) -> None:
+        self.batch_size = batch_size
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self._wake = asyncio.Event()
+
+    @classmethod
+    def from_settings(cls) -> "PaymentEventProcessor":
+        settings = config.webhook
+        return cls(
+            batch_size=settings.WEBHOOK_BATCH_SIZE,
+            linger=settings.WEBHOOK_BATCH_LINGER,
+            poll_interval=settings.WEBHOOK_POLL_INTERVAL,
+        )
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error("Failed to process payment events: %s", e)
+                processed = 0
+            if processed >= self.batch_size:
+                # a backlog: keep draining
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                # let the rest of a burst arrive and join the batch
+                await asyncio.sleep(self.linger)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def process_batch(self) -> int:
+        started = time.perf_counter()
+        async with UnitOfWork(kind="write", priority=Priority.CRITICAL) as uow:
+            events = await uow.payment_events.claim(self.batch_size)
+            if not events:
+                return 0
+            applied = await uow.payments.apply_events(events)
+            outcomes = {
+                "applied": [event.id for event in events if event.id in applied],
+                "ignored": [event.id for event in events if event.id not in applied],
+            }
+            await uow.payment_events.mark_processed(outcomes)
+            await uow.commit()
+        batch_seconds.observe(time.perf_counter() - started)
+        for outcome, ids in outcomes.items():
+            if ids:
+                processed_events.inc(len(ids), outcome=outcome)
+        return len(events)
+
+
+payment_event_processor = PaymentEventProcessor.from_settings()
+reloader.bind("webhook.WEBHOOK_BATCH_SIZE", payment_event_processor, "batch_size")
+reloader.bind("webhook.WEBHOOK_BATCH_LINGER", payment_event_processor, "linger")
+reloader.bind("webhook.WEBHOOK_POLL_INTERVAL", payment_event_processor, "poll_interval")
@@ -0,0 +1,142 @@
+import asyncio
+from typing import Optional
+
+from src.core.admission import Priority
+from src.core.config import config, reloader
+from src.core.coordination import LeaseLost, check_fence
+from src.core.metrics import registry
+from src.core.placement import Node, Placement, peer_network, peer_range
+from src.core.utils.uow import UnitOfWork
+from src.utils import get_logger
+
+
+logger = get_logger().getChild(__name__)
+
+moved_peers = registry.counter(
+    "placement_moved_peers_total", "Peers moved between nodes by the rebalancer"
+)
+
+reloader.live(
+    "placement.PLACEMENT_LOAD_FACTOR",
+    "placement.PLACEMENT_REBALANCE_STEP",
+    "placement.PLACEMENT_REBALANCE_INTERVAL",
+    "placement.PLACEMENT_REBALANCE_TOLERANCE",
+)
+
+
+class Rebalancer:
+    """Moves peers off draining and overloaded nodes, a bounded step at a
+    time, so a node joining or leaving doesn't reshuffle every peer at once.
+
+    A moved peer gets an address on its new node and a new updated_at; its
+    owner downloads the changed config like after any other update.
+    """
+
+    # peers looked at per step for every peer moved, so a step over nodes
+    # that keep their peers still ends
+    SCAN_FACTOR = 20
+    # the leader election it runs under
+    ELECTION = "rebalance"
+
+    def __init__(self) -> None:
+        # server id -> last peer id looked at, so steps go through a node's
+        # peers instead of re-reading the ones that stay
+        self._cursors: dict[int, int] = {}
+
+    async def run(self, fencing_token: int) -> None:
+        while True:
+            try:
+                moved = await self.step(fencing_token)
+            except LeaseLost:
+                raise
+            except Exception as e:
+                logger.error("Failed to rebalance peers: %s", e)
+                moved = 0
+            if moved < config.placement.PLACEMENT_REBALANCE_STEP:
+                await asyncio.sleep(config.placement.PLACEMENT_REBALANCE_INTERVAL)
+
+    async def step(self, fencing_token: Optional[int] = None) -> int:
+        """Moves up to PLACEMENT_REBALANCE_STEP peers in one transaction.
+
+        With a fencing token the moves commit only while no newer leader
+        exists; a stalled former leader rolls back instead.
+        """
+        settings = config.placement
+        async with UnitOfWork(kind="write", priority=Priority.BULK) as uow:
+            await uow.servers.lock_placement()
+            servers = await uow.servers.get_all({})
+            nodes = {
+                server.id: Node(server.id, server.capacity, server.peer_count)
+                for server in servers
+            }
+            active = [nodes[server.id] for server in servers if server.is_active]
+            placement = Placement(
+                active,
+                settings.PLACEMENT_LOAD_FACTOR,
+                unplaced=sum(
+                    server.peer_count for server in servers if not server.is_active
+                ),
+            )
+            by_id = {server.id: server for server in servers}
+            # draining nodes first, they have to end up empty
+            sources = sorted(
+                (
+                    node
+                    for node in nodes.values()
+                    if placement.overload(node, settings.PLACEMENT_REBALANCE_TOLERANCE)
+                ),
+                key=lambda node: node in placement,
+            )
+            moved = 0
+            budget = settings.PLACEMENT_REBALANCE_STEP * self.SCAN_FACTOR
+            for source in sources:
+                excess = placement.overload(
+                    source, settings.PLACEMENT_REBALANCE_TOLERANCE
+                )
+                while excess > 0 and budget > 0:
+                    limit = min(budget, settings.PLACEMENT_REBALANCE_STEP)
+                    after = self._cursors.get(source.id, 0)
+                    peers = await uow.configs.peers(source.id, after, limit)
+                    if len(peers) < limit:
+                        # the next step starts over from the node's first peer
+                        self._cursors.pop(source.id, None)
+                    elif peers:
+                        self._cursors[source.id] = peers[-1].id
+                    budget -= len(peers)
+                    for peer in peers:
+                        target = placement.destination(peer.public_key, source)
+                        if target is None:
+                            continue
+                        address = await uow.configs.free_address(
+                            target.id, *peer_range(by_id[target.id].subnet)
+                        )
+                        if address is None:
+                            continue
+                        await uow.configs.update(
+                            {"id": peer.id},
+                            {
+                                "server_id": target.id,
+                                "ip_address": peer_network(address),
+                            },
+                        )
+                        placement.move(source, target)
+                        moved += 1
+                        excess -= 1
+                        if excess == 0 or moved == settings.PLACEMENT_REBALANCE_STEP:
+                            break
+                    if moved == settings.PLACEMENT_REBALANCE_STEP:
+                        break
+                    if len(peers) < limit:
+                        break
+                if moved == settings.PLACEMENT_REBALANCE_STEP or budget <= 0:
+                    break
+            if fencing_token is not None:
+                await check_fence(self.ELECTION, fencing_token)
+            await uow.commit()
+        if moved:
+            moved_peers.inc(moved)
+            logger.info("Moved %d peers between nodes", moved)
+        return moved
+
+
+rebalancer = Rebalancer()
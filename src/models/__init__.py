@@ -1,5 +1,15 @@
 from .users import Users
 from .payments import Payments, PaymentStatus, PaymentMethod
+from .payment_events import PaymentEvents
+from .servers import Servers
 from .wireguard_configs import WireGuardConfigs
 
-__all__ = ["Users", "Payments", "WireGuardConfigs", "PaymentStatus", "PaymentMethod"]
+__all__ = [
+    "Users",
+    "Payments",
+    "PaymentEvents",
+    "Servers",
+    "WireGuardConfigs",
+    "PaymentStatus",
+    "PaymentMethod",
+]
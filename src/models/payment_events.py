@@ -0,0 +1,56 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Enum as SQLAlchemyEnum,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.core.database import Base
+
+from .payments import PaymentMethod, PaymentStatus
+
+
+class PaymentEvents(Base):
+    """Raw payment provider webhooks, appended as they arrive.
+
+    Rows are never changed except for `processed_at`/`outcome`, which the
+    event processor sets once it applied (or skipped) the event.
+    """
+
+    __tablename__ = "payment_events"
+    __table_args__ = (
+        # providers retry deliveries: one row per provider event
+        UniqueConstraint("provider", "event_id"),
+        # the processor's work queue, it shrinks back as events are applied
+        Index(
+            "ix_payment_events_unprocessed",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+    id: Mapped[int] = mapped_column(BigInteger, autoincrement=True, primary_key=True)
+    provider: Mapped[PaymentMethod] = mapped_column(
+        SQLAlchemyEnum(PaymentMethod), nullable=False
+    )
+    event_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    payment_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[PaymentStatus] = mapped_column(
+        SQLAlchemyEnum(PaymentStatus), nullable=False
+    )
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    received_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    processed_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    # "applied" or "ignored"
+    outcome: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
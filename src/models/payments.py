@@ -1,12 +1,18 @@
+from datetime import datetime
 from decimal import Decimal
+from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Enum as SQLAlchemyEnum, ForeignKey, Numeric
+from sqlalchemy import Integer, Enum as SQLAlchemyEnum, ForeignKey, Index, Numeric
+from sqlalchemy.sql import func
 from enum import Enum
 
 from src.core.database import Base
 from src.core.dependencies import TimestampMixin
 
+if TYPE_CHECKING:
+    from .users import Users
+
 
 class PaymentStatus(str, Enum):
     paid = "PAID"
@@ -22,9 +28,18 @@ class PaymentMethod(str, Enum):
 
 class Payments(Base, TimestampMixin):
     __tablename__ = "payments"
+    # one partition per month of created_at, see MonthlyPartitions
+    __table_args__ = (
+        Index("ix_payments_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     id: Mapped[int] = mapped_column(Integer, autoincrement=True, primary_key=True)
+    # the partition key has to be part of the primary key
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), primary_key=True
+    )
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     status: Mapped[PaymentStatus] = mapped_column(
         SQLAlchemyEnum(PaymentStatus),
@@ -37,4 +52,4 @@ class Payments(Base, TimestampMixin):
     )
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
 
-    user = relationship("Users", back_populates="payments")
+    user: Mapped["Users"] = relationship(back_populates="payments", lazy="raise_on_sql")
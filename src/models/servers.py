@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Boolean, CheckConstraint, Integer, String
+from sqlalchemy.dialects.postgresql import CIDR, ExcludeConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.core.database import Base
+from src.core.dependencies import TimestampMixin
+
+if TYPE_CHECKING:
+    from .wireguard_configs import WireGuardConfigs
+
+
+class Servers(Base, TimestampMixin):
+    """WireGuard nodes that peers are placed on.
+
+    A node hands out peer addresses from its own `subnet`. Inactive nodes
+    take no new peers and are emptied by the rebalancer, which is how a
+    node leaves.
+    """
+
+    __tablename__ = "servers"
+    __table_args__ = (
+        # every node routes its own subnet
+        ExcludeConstraint(
+            ("subnet", "&&"),
+            name="servers_subnet_excl",
+            using="gist",
+            ops={"subnet": "inet_ops"},
+        ),
+        CheckConstraint("capacity >= 0", name="servers_capacity_check"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    # host:port the clients connect to
+    endpoint: Mapped[str] = mapped_column(String(255), nullable=False)
+    public_key: Mapped[str] = mapped_column(String(44), nullable=False)
+    subnet: Mapped[str] = mapped_column(CIDR, nullable=False)
+    # peers the node can serve
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # kept by a trigger on wireguard_configs, so it also covers cascades,
+    # COPY and archiving
+    peer_count: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+
+    wireguard_configs: Mapped[list["WireGuardConfigs"]] = relationship(
+        back_populates="server", lazy="raise_on_sql"
+    )
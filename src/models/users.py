@@ -1,8 +1,14 @@
+from typing import TYPE_CHECKING
+
 from src.core.database import Base
 from src.core.dependencies import TimestampMixin
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import Integer, BigInteger, Boolean
 
+if TYPE_CHECKING:
+    from .payments import Payments
+    from .wireguard_configs import WireGuardConfigs
+
 
 class Users(Base, TimestampMixin):
     __tablename__ = "users"
@@ -10,5 +16,11 @@ class Users(Base, TimestampMixin):
     telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
-    payment = relationship("Payments", back_populates="users")
-    wireguard_configs = relationship("WireGuardConfigs", back_populates="users")
+    # lazy loads are implicit round trips (and fail under asyncio), so
+    # related rows must be loaded explicitly with selectinload/joinedload
+    payments: Mapped[list["Payments"]] = relationship(
+        back_populates="user", lazy="raise_on_sql"
+    )
+    wireguard_configs: Mapped[list["WireGuardConfigs"]] = relationship(
+        back_populates="user", lazy="raise_on_sql"
+    )
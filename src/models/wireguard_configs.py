@@ -1,19 +1,45 @@
+from typing import TYPE_CHECKING, Optional
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.database import Base
 from src.core.dependencies import TimestampMixin
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Index, Integer, String, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import INET
 
+if TYPE_CHECKING:
+    from .servers import Servers
+    from .users import Users
+
 
 class WireGuardConfigs(Base, TimestampMixin):
     __tablename__ = "wireguard_configs"
+    __table_args__ = (
+        # addresses are allocated per node; also serves max(ip_address)
+        UniqueConstraint("server_id", "ip_address"),
+        # a node's sync pages through its peers by id, from the index alone
+        Index(
+            "ix_wireguard_configs_server_peers",
+            "server_id",
+            "id",
+            postgresql_include=["public_key", "ip_address"],
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, autoincrement=True, primary_key=True)
-    user_id = mapped_column(
+    user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     private_key: Mapped[str] = mapped_column(String(44), nullable=False)
     public_key: Mapped[str] = mapped_column(String(44), nullable=False)
     ip_address: Mapped[str] = mapped_column(INET, nullable=False)
+    # None for configs made before nodes existed, served by the WG_* settings
+    server_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("servers.id", ondelete="RESTRICT"), nullable=True
+    )
 
-    users = relationship("Users", back_populates="wireguard_configs")
+    user: Mapped["Users"] = relationship(
+        back_populates="wireguard_configs", lazy="raise_on_sql"
+    )
+    server: Mapped[Optional["Servers"]] = relationship(
+        back_populates="wireguard_configs", lazy="raise_on_sql"
+    )
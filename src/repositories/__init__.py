@@ -1,5 +1,13 @@
 from .user_repository import UserRepository
 from .payments_repository import PaymentRepository
+from .payment_events_repository import PaymentEventRepository
 from .config_repository import ConfigRepository
+from .server_repository import ServerRepository
 
-__all__ = ["UserRepository", "PaymentRepository", "ConfigRepository"]
+__all__ = [
+    "UserRepository",
+    "PaymentRepository",
+    "PaymentEventRepository",
+    "ConfigRepository",
+    "ServerRepository",
+]
@@ -1,10 +1,38 @@
-from src.models import WireGuardConfigs
-from src.core.database import TypedRepository
+from functools import partial
+from ipaddress import IPv4Address, ip_interface
+from typing import Any, Optional
+
+from sqlalchemy import func, select, text
+
+from src.models import Servers, Users, WireGuardConfigs
+from src.core.cache.response_cache import ResponseCache
+from src.core.config import config, reloader
+from src.core.database import TypedRepository, after_commit
 from src.schemes.configs import (
     ConfigInsertScheme,
     ConfigFilterScheme,
     ConfigUpdateScheme,
     ConfigModelScheme,
+    ConfigPeerScheme,
+    ConfigVersionScheme,
+)
+from src.schemes.servers import ServerModelScheme
+
+
+# first address after a used one that is itself free; only needed once a
+# node's addresses reached the end of its subnet
+_FREE_ADDRESS = text(
+    "SELECT candidate FROM ("
+    "SELECT CAST(:first AS inet) AS candidate "
+    "UNION ALL "
+    "SELECT ip_address + 1 FROM wireguard_configs WHERE server_id = :server_id"
+    ") AS candidates "
+    "WHERE candidate BETWEEN CAST(:first AS inet) AND CAST(:last AS inet) "
+    "AND NOT EXISTS ("
+    "SELECT 1 FROM wireguard_configs "
+    "WHERE server_id = :server_id AND ip_address = candidate"
+    ") "
+    "ORDER BY candidate LIMIT 1"
 )
 
 
@@ -22,4 +50,122 @@ class ConfigRepository(
     filter_scheme=ConfigFilterScheme,
     update_scheme=ConfigUpdateScheme,
 ):
-    pass
+    # rendered config files keyed by config id
+    response_cache = ResponseCache(
+        "wg-config", ttl=config.wireguard.WG_RESPONSE_CACHE_TTL
+    )
+
+    async def get_owned(
+        self, config_id: int, telegram_id: int
+    ) -> Optional[tuple[ConfigModelScheme, Optional[ServerModelScheme]]]:
+        """The config and its node if it belongs to the user, None otherwise.
+
+        The node's endpoint and key are part of the file, so they come with
+        the config in the same statement.
+        """
+        stmt = (
+            select(WireGuardConfigs, Servers)
+            .join(Users, Users.id == WireGuardConfigs.user_id)
+            .outerjoin(Servers, Servers.id == WireGuardConfigs.server_id)
+            .where(WireGuardConfigs.id == config_id, Users.telegram_id == telegram_id)
+        )
+        res = await self._session.execute(stmt)
+        row = res.one_or_none()
+        if row is None:
+            return None
+        wg_config, server = row
+        return (
+            self._validate_output(wg_config, self._model_scheme),
+            self._validate_output(server, ServerModelScheme) if server else None,
+        )
+
+    async def get_version(
+        self, config_id: int, telegram_id: int
+    ) -> Optional[ConfigVersionScheme]:
+        # the node's endpoint and key are part of the file too
+        stmt = (
+            select(
+                WireGuardConfigs.id,
+                func.greatest(WireGuardConfigs.updated_at, Servers.updated_at).label(
+                    "updated_at"
+                ),
+            )
+            .join(Users, Users.id == WireGuardConfigs.user_id)
+            .outerjoin(Servers, Servers.id == WireGuardConfigs.server_id)
+            .where(WireGuardConfigs.id == config_id, Users.telegram_id == telegram_id)
+        )
+        res = await self._session.execute(stmt)
+        if row := res.one_or_none():
+            return self._validate_output(row, ConfigVersionScheme)
+        return None
+
+    async def peers(
+        self, server_id: int, after_id: int, limit: int
+    ) -> list[ConfigPeerScheme]:
+        """One page of a node's peers by id, for keyset pagination; served
+        from ix_wireguard_configs_server_peers without touching the table."""
+        stmt = (
+            select(
+                WireGuardConfigs.id,
+                WireGuardConfigs.public_key,
+                WireGuardConfigs.ip_address,
+            )
+            .where(
+                WireGuardConfigs.server_id == server_id,
+                WireGuardConfigs.id > after_id,
+            )
+            .order_by(WireGuardConfigs.id)
+            .limit(limit)
+        )
+        res = await self._session.execute(stmt)
+        return self._validate_output_many(res.all(), ConfigPeerScheme)
+
+    async def free_address(
+        self, server_id: int, first: IPv4Address, last: IPv4Address
+    ) -> Optional[IPv4Address]:
+        """The next free address of a node between `first` and `last`, None
+        when there is none. Hold ServerRepository.lock_placement, or two
+        peers may get the same one."""
+        res = await self._session.execute(
+            select(func.max(WireGuardConfigs.ip_address)).where(
+                WireGuardConfigs.server_id == server_id
+            )
+        )
+        highest = res.scalar_one()
+        if highest is None:
+            return first
+        # addresses are handed out in order, so the next one is usually free
+        following = ip_interface(str(highest)).ip + 1
+        if first <= following <= last:
+            return following
+        res = await self._session.execute(
+            _FREE_ADDRESS,
+            {"server_id": server_id, "first": str(first), "last": str(last)},
+        )
+        candidate = res.scalar_one_or_none()
+        return None if candidate is None else ip_interface(str(candidate)).ip
+
+    async def update(
+        self,
+        filters: dict[str, Any] | ConfigFilterScheme,
+        data: dict[str, Any] | ConfigUpdateScheme,
+    ) -> Optional[ConfigModelScheme]:
+        result = await super().update(filters, data)
+        if result:
+            after_commit(
+                self._session, partial(self.response_cache.invalidate, result.id)
+            )
+        return result
+
+    async def delete(
+        self, filters: dict[str, Any] | ConfigFilterScheme
+    ) -> Optional[ConfigModelScheme]:
+        result = await super().delete(filters)
+        if result:
+            after_commit(
+                self._session, partial(self.response_cache.invalidate, result.id)
+            )
+        return result
+
+
+reloader.bind("wireguard.WG_RESPONSE_CACHE_TTL", ConfigRepository.response_cache, "ttl")
@@ -0,0 +1,52 @@
+from sqlalchemy import func, select, update
+
+from src.core.database import TypedRepository
+from src.models import PaymentEvents
+from src.schemes.payments import (
+    PaymentEventFilterScheme,
+    PaymentEventInsertScheme,
+    PaymentEventModelScheme,
+    PaymentEventUpdateScheme,
+)
+
+
+class PaymentEventRepository(
+    TypedRepository[
+        PaymentEvents,
+        PaymentEventModelScheme,
+        PaymentEventInsertScheme,
+        PaymentEventFilterScheme,
+        PaymentEventUpdateScheme,
+    ],
+    model=PaymentEvents,
+    model_scheme=PaymentEventModelScheme,
+    insert_scheme=PaymentEventInsertScheme,
+    filter_scheme=PaymentEventFilterScheme,
+    update_scheme=PaymentEventUpdateScheme,
+):
+    async def claim(self, limit: int) -> list[PaymentEventModelScheme]:
+        """Oldest unprocessed events, locked until the transaction ends.
+
+        Events locked by another processor are skipped, so any number of
+        replicas can drain the queue side by side.
+        """
+        stmt = (
+            select(PaymentEvents)
+            .where(PaymentEvents.processed_at.is_(None))
+            .order_by(PaymentEvents.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        res = await self._session.execute(stmt)
+        return self._validate_output_many(list(res.scalars()))
+
+    async def mark_processed(self, outcomes: dict[str, list[int]]) -> None:
+        """Closes events, `outcomes` maps an outcome to event ids."""
+        for outcome, ids in outcomes.items():
+            if not ids:
+                continue
+            await self._session.execute(
+                update(PaymentEvents)
+                .where(PaymentEvents.id.in_(ids))
+                .values(processed_at=func.now(), outcome=outcome)
+            )
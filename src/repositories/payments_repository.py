@@ -1,6 +1,15 @@
-from src.core.database import TypedRepository
-from src.models import Payments
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import column, func, update, values
+
+from src.core.cache.count_cache import CountCache
+from src.core.config import config, reloader
+from src.core.database import MonthlyPartitions, TypedRepository
+from src.models import Payments, PaymentStatus
 from src.schemes.payments import (
+    PaymentEventModelScheme,
+    PaymentHistoryScheme,
     PaymentModelScheme,
     PaymentUpdateScheme,
     PaymentInsertScheme,
@@ -8,6 +17,12 @@ from src.schemes.payments import (
 )
 
 
+# status a webhook moves a payment to -> statuses it may move it out of
+TRANSITIONS: dict[PaymentStatus, tuple[PaymentStatus, ...]] = {
+    PaymentStatus.paid: (PaymentStatus.unpaid,),
+}
+
+
 class PaymentRepository(
     TypedRepository[
         Payments,
@@ -22,4 +37,79 @@ class PaymentRepository(
     filter_scheme=PaymentFilterScheme,
     update_scheme=PaymentUpdateScheme,
 ):
-    pass
+    # payments are range-partitioned by created_at month: queries that bound
+    # created_at let Postgres skip every other partition
+    partitions = MonthlyPartitions("payments")
+    count_cache = CountCache("payments", ttl=config.db.DB_COUNT_CACHE_TTL)
+
+    async def get_recent(
+        self, user_id: int, limit: int, since: datetime
+    ) -> list[PaymentHistoryScheme]:
+        return await self.find(
+            {
+                "user_id": user_id,
+                "created_at__gte": since,
+                "order_by": ["-created_at"],
+                "limit": limit,
+            },
+            scheme=PaymentHistoryScheme,
+        )
+
+    async def get_between(
+        self,
+        filters: dict[str, Any] | PaymentFilterScheme,
+        start: datetime,
+        end: Optional[datetime] = None,
+    ) -> list[PaymentHistoryScheme]:
+        """Payments created in [start, end)."""
+        validated_filters = self._validate_input(filters, self._filter_scheme)
+        query = {
+            **validated_filters,
+            "created_at__gte": start,
+            "created_at__lt": end,
+            "order_by": ["created_at"],
+        }
+        return await self.find(query, scheme=PaymentHistoryScheme)
+
+    async def apply_events(self, events: Sequence[PaymentEventModelScheme]) -> set[int]:
+        """Moves payments to the status of their webhook events, with one
+        UPDATE per target status for the whole batch.
+
+        An event only applies to a payment made with the provider that
+        sent it, for the same amount, and in a status TRANSITIONS allows
+        leaving. Returns the ids of the events that changed a payment.
+        """
+        applied = set()
+        for target, sources in TRANSITIONS.items():
+            # the latest event of a payment wins
+            latest = {
+                event.payment_id: event for event in events if event.status is target
+            }
+            if not latest:
+                continue
+            batch = values(
+                column("id", Payments.id.type),
+                column("payment_method", Payments.payment_method.type),
+                column("amount", Payments.amount.type),
+                name="batch",
+            ).data([(e.payment_id, e.provider, e.amount) for e in latest.values()])
+            stmt = (
+                update(Payments)
+                .where(
+                    Payments.id == batch.c.id,
+                    Payments.payment_method == batch.c.payment_method,
+                    Payments.amount == batch.c.amount,
+                    Payments.status.in_(sources),
+                )
+                .values(status=target, updated_at=func.now())
+                .returning(Payments.id)
+                .execution_options(synchronize_session=False)
+            )
+            res = await self._session.execute(stmt)
+            applied.update(latest[payment_id].id for payment_id in res.scalars())
+        if applied:
+            self._written()
+        return applied
+
+
+reloader.bind("db.DB_COUNT_CACHE_TTL", PaymentRepository.count_cache, "ttl")
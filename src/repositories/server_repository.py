@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from src.core.database import TypedRepository
+from src.models import Servers
+from src.schemes.servers import (
+    ServerFilterScheme,
+    ServerInsertScheme,
+    ServerModelScheme,
+    ServerUpdateScheme,
+)
+
+
+_LOCK_PLACEMENT = text("SELECT pg_advisory_xact_lock(hashtext('placement'))")
+
+
+class ServerRepository(
+    TypedRepository[
+        Servers,
+        ServerModelScheme,
+        ServerInsertScheme,
+        ServerFilterScheme,
+        ServerUpdateScheme,
+    ],
+    model=Servers,
+    model_scheme=ServerModelScheme,
+    insert_scheme=ServerInsertScheme,
+    filter_scheme=ServerFilterScheme,
+    update_scheme=ServerUpdateScheme,
+):
+    async def lock_placement(self) -> None:
+        """Serializes placement until the transaction ends.
+
+        Placing and moving peers read every node's load and hand out
+        addresses; one at a time, both stay exact. Read the servers after
+        taking the lock, their peer counts are current then.
+        """
+        await self._session.execute(_LOCK_PLACEMENT)
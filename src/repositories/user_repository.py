@@ -1,3 +1,5 @@
+from src.core.cache.count_cache import CountCache
+from src.core.config import config, reloader
 from src.core.database import TypedRepository
 from src.models import Users
 from src.schemes.users import (
@@ -18,4 +20,7 @@ class UserRepository(
     filter_scheme=UserFilterScheme,
     update_scheme=UserUpdateScheme,
 ):
-    pass
+    count_cache = CountCache("users", ttl=config.db.DB_COUNT_CACHE_TTL)
+
+
+reloader.bind("db.DB_COUNT_CACHE_TTL", UserRepository.count_cache, "ttl")
@@ -1,13 +1,21 @@
 from .configs import (
+    ConfigCreateScheme,
     ConfigFilterScheme,
     ConfigInsertScheme,
     ConfigModelScheme,
+    ConfigPeerScheme,
+    ConfigPublicScheme,
     ConfigUpdateScheme,
+    ConfigVersionScheme,
 )
 
 __all__ = [
+    "ConfigCreateScheme",
     "ConfigModelScheme",
     "ConfigUpdateScheme",
     "ConfigFilterScheme",
     "ConfigInsertScheme",
+    "ConfigPeerScheme",
+    "ConfigPublicScheme",
+    "ConfigVersionScheme",
 ]
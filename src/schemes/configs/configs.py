@@ -1,27 +1,71 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field, field_serializer
 from pydantic.types import SecretStr
 from ipaddress import IPv4Network
 from typing import Optional
 
 
+class _ConfigWriteScheme(BaseModel):
+    # the database needs the raw key, not the masked SecretStr
+    @field_serializer("private_key", check_fields=False)
+    def serialize_private_key(self, private_key: Optional[SecretStr]):
+        return private_key.get_secret_value() if private_key else None
+
+
 class ConfigModelScheme(BaseModel):
     id: int
     user_id: int
     private_key: SecretStr
+    public_key: str
+    ip_address: IPv4Network
+    server_id: Optional[int]
+    updated_at: datetime
+
+
+class ConfigPublicScheme(BaseModel):
+    """A config without its private key, for listings."""
+
+    id: int
+    public_key: str
+    ip_address: IPv4Network
+    updated_at: datetime
+
+
+class ConfigVersionScheme(BaseModel):
+    id: int
+    updated_at: datetime
+
+
+class ConfigPeerScheme(BaseModel):
+    """What a node needs to know about one of its peers."""
+
+    id: int
+    public_key: str
     ip_address: IPv4Network
 
 
-class ConfigInsertScheme(BaseModel):
+class ConfigInsertScheme(_ConfigWriteScheme):
     user_id: int
     private_key: SecretStr
+    public_key: str
     ip_address: IPv4Network
+    server_id: Optional[int] = None
+
+
+class ConfigCreateScheme(BaseModel):
+    """A new peer's keys; the node and address are assigned on creation."""
+
+    private_key: SecretStr = Field(min_length=44, max_length=44)
+    public_key: str = Field(min_length=44, max_length=44)
 
 
-class ConfigFilterScheme(BaseModel):
-    id: Optional[int]
-    user_id: Optional[int]
-    private_key: Optional[SecretStr]
-    ip_address: Optional[IPv4Network]
+class ConfigFilterScheme(_ConfigWriteScheme):
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    private_key: Optional[SecretStr] = None
+    public_key: Optional[str] = None
+    ip_address: Optional[IPv4Network] = None
+    server_id: Optional[int] = None
 
 
 class ConfigUpdateScheme(ConfigFilterScheme):
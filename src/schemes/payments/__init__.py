@@ -1,4 +1,11 @@
 from .payments import (
+    PaymentEventFilterScheme,
+    PaymentEventInsertScheme,
+    PaymentEventModelScheme,
+    PaymentEventUpdateScheme,
+    PaymentWebhookAckScheme,
+    PaymentWebhookScheme,
+    PaymentHistoryScheme,
     PaymentModelScheme,
     PaymentInsertScheme,
     PaymentUpdateScheme,
@@ -6,7 +13,14 @@ from .payments import (
 )
 
 __all__ = [
+    "PaymentEventFilterScheme",
+    "PaymentEventInsertScheme",
+    "PaymentEventModelScheme",
+    "PaymentEventUpdateScheme",
+    "PaymentWebhookAckScheme",
+    "PaymentWebhookScheme",
     "PaymentFilterScheme",
+    "PaymentHistoryScheme",
     "PaymentModelScheme",
     "PaymentInsertScheme",
     "PaymentUpdateScheme",
@@ -1,15 +1,16 @@
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, Field, field_serializer
 from src.models import PaymentStatus, PaymentMethod
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Literal, Optional
 
 
 class _PaymentBaseScheme(BaseModel):
-    @field_serializer("status")
+    @field_serializer("status", check_fields=False)
     def serialize_status(self, status: Optional[PaymentStatus]):
         return status.value if status else None
 
-    @field_serializer("payment_method")
+    @field_serializer("payment_method", check_fields=False)
     def serialize_payment_method(self, method: Optional[PaymentMethod]):
         return method.value if method else None
 
@@ -22,6 +23,10 @@ class PaymentModelScheme(_PaymentBaseScheme):
     amount: Decimal
 
 
+class PaymentHistoryScheme(PaymentModelScheme):
+    created_at: datetime
+
+
 class PaymentInsertScheme(_PaymentBaseScheme):
     user_id: int
     status: PaymentStatus = PaymentStatus.unpaid
@@ -39,3 +44,46 @@ class PaymentFilterScheme(_PaymentBaseScheme):
 
 class PaymentUpdateScheme(_PaymentBaseScheme):
     pass
+
+
+class PaymentWebhookScheme(BaseModel):
+    """What providers are expected to send; other fields are kept in the
+    stored payload but not interpreted."""
+
+    event_id: str = Field(min_length=1, max_length=128)
+    payment_id: int
+    status: PaymentStatus
+    amount: Decimal
+
+
+class PaymentWebhookAckScheme(BaseModel):
+    status: Literal["accepted", "duplicate"]
+
+
+class PaymentEventModelScheme(BaseModel):
+    id: int
+    provider: PaymentMethod
+    event_id: str
+    payment_id: int
+    status: PaymentStatus
+    amount: Decimal
+
+
+class PaymentEventInsertScheme(BaseModel):
+    provider: PaymentMethod
+    event_id: str
+    payment_id: int
+    status: PaymentStatus
+    amount: Decimal
+    payload: dict[str, Any]
+
+
+class PaymentEventFilterScheme(BaseModel):
+    id: Optional[int] = None
+    provider: Optional[PaymentMethod] = None
+    event_id: Optional[str] = None
+    payment_id: Optional[int] = None
+
+
+class PaymentEventUpdateScheme(BaseModel):
+    pass
@@ -0,0 +1,15 @@
+from .servers import (
+    ServerFilterScheme,
+    ServerInsertScheme,
+    ServerModelScheme,
+    ServerPeersScheme,
+    ServerUpdateScheme,
+)
+
+__all__ = [
+    "ServerModelScheme",
+    "ServerUpdateScheme",
+    "ServerFilterScheme",
+    "ServerInsertScheme",
+    "ServerPeersScheme",
+]
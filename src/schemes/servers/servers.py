@@ -0,0 +1,48 @@
+from datetime import datetime
+from ipaddress import IPv4Network
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.schemes.configs import ConfigPeerScheme
+
+
+class ServerModelScheme(BaseModel):
+    id: int
+    name: str
+    endpoint: str
+    public_key: str
+    subnet: IPv4Network
+    capacity: int
+    is_active: bool
+    peer_count: int
+    updated_at: datetime
+
+
+class ServerInsertScheme(BaseModel):
+    name: str
+    endpoint: str
+    public_key: str
+    subnet: IPv4Network
+    capacity: int
+    is_active: bool = True
+
+
+class ServerFilterScheme(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+    endpoint: Optional[str] = None
+    public_key: Optional[str] = None
+    subnet: Optional[IPv4Network] = None
+    capacity: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class ServerUpdateScheme(ServerFilterScheme):
+    pass
+
+
+class ServerPeersScheme(BaseModel):
+    peers: list[ConfigPeerScheme]
+    # `after` of the next page, None on the last one
+    next_after: Optional[int]
@@ -1,8 +1,17 @@
-from .users import UserModelScheme, UserFilterScheme, UserInsertScheme, UserUpdateScheme
+from .users import (
+    UserFilterScheme,
+    UserInsertScheme,
+    UserModelScheme,
+    UserProfileScheme,
+    UserUpdateScheme,
+    UserWithConfigsScheme,
+)
 
 __all__ = [
     "UserUpdateScheme",
     "UserInsertScheme",
     "UserModelScheme",
     "UserFilterScheme",
+    "UserProfileScheme",
+    "UserWithConfigsScheme",
 ]
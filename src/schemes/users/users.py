@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional
 
+from src.schemes.configs import ConfigPublicScheme
+from src.schemes.payments import PaymentHistoryScheme
+
 
 class UserModelScheme(BaseModel):
     id: int
@@ -8,6 +11,16 @@ class UserModelScheme(BaseModel):
     is_active: bool
 
 
+class UserWithConfigsScheme(UserModelScheme):
+    # needs load=("wireguard_configs",)
+    wireguard_configs: list[ConfigPublicScheme]
+
+
+class UserProfileScheme(UserWithConfigsScheme):
+    # newest first
+    payments: list[PaymentHistoryScheme]
+
+
 class UserInsertScheme(BaseModel):
     telegram_id: int
     is_active: bool = False
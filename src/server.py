@@ -0,0 +1,91 @@
+import importlib.util
+import os
+import random
+import sys
+from typing import Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from src.core.config import config
+
+
+APP = "src.app:create_app"
+
+
+def _available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # respect a container CPU quota (cgroup v2), e.g. "200000 100000" -> 2
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class _Server(uvicorn.Server):
+    """Draws its own request limit when a worker process starts it, so
+    workers started together don't all restart together."""
+
+    def run(self, sockets: Optional[list] = None) -> None:
+        if self.config.limit_max_requests:
+            self.config.limit_max_requests += random.randint(
+                0, config.server.MAX_REQUESTS_JITTER
+            )
+        super().run(sockets=sockets)
+
+
+def run_dev() -> None:
+    uvicorn.run(APP, factory=True, reload=True, host=config.server.HOST)
+
+
+def run_prod() -> None:
+    """Serves the app with N worker processes.
+
+    uvicorn spawns (not forks) its workers, and every worker builds the
+    application through the factory, so the engine and the Redis pool are
+    created inside each worker by the lifespan hook.
+    """
+    server = config.server
+    uvicorn_config = uvicorn.Config(
+        APP,
+        factory=True,
+        host=server.HOST,
+        port=server.PORT,
+        workers=server.WORKERS or _available_cpus(),
+        loop="uvloop" if _has("uvloop") else "asyncio",
+        http="httptools" if _has("httptools") else "h11",
+        backlog=server.BACKLOG,
+        timeout_keep_alive=server.KEEP_ALIVE,
+        timeout_graceful_shutdown=server.GRACEFUL_TIMEOUT,
+        limit_max_requests=server.MAX_REQUESTS or None,
+        proxy_headers=True,
+        access_log=False,
+    )
+    # as uvicorn.run, with a server that jitters its request limit; every
+    # worker (and every restart of one) runs it in a fresh process
+    prod_server = _Server(uvicorn_config)
+    if uvicorn_config.workers > 1:
+        sockets = [uvicorn_config.bind_socket()]
+        Multiprocess(uvicorn_config, target=prod_server.run, sockets=sockets).run()
+    else:
+        prod_server.run()
+        if not prod_server.started:
+            sys.exit(3)
+
+
+def run() -> None:
+    if config.api.MODE == "PROD":
+        run_prod()
+    else:
+        run_dev()
@@ -0,0 +1,6 @@
+from .config_service import ConfigService
+from .payment_webhook_service import PaymentWebhookService
+from .server_service import ServerService
+from .user_service import UserService
+
+__all__ = ["ConfigService", "PaymentWebhookService", "ServerService", "UserService"]
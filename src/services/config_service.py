@@ -0,0 +1,155 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from src.core.cache.response_cache import CachedResponse
+from src.core.config import config
+from src.core.placement import Node, Placement, peer_network, peer_range
+from src.core.utils.base_service import BaseService
+from src.core.utils.uow import UnitOfWork
+from src.repositories import ConfigRepository
+from src.schemes.configs import (
+    ConfigCreateScheme,
+    ConfigModelScheme,
+    ConfigPublicScheme,
+    ConfigVersionScheme,
+)
+from src.schemes.servers import ServerModelScheme
+from src.utils import DataFetchError, NotFoundError
+
+
+# server-side settings are part of the rendered file, so they are part of the
+# ETag too: changing them invalidates every client copy
+_RENDER_VERSION = hashlib.sha256(
+    config.wireguard.model_dump_json(exclude={"WG_RESPONSE_CACHE_TTL"}).encode()
+).hexdigest()[:8]
+
+
+class ConfigDownload(NamedTuple):
+    etag: str
+    # None when the client copy is still current
+    body: Optional[str]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def config_etag(version: ConfigModelScheme | ConfigVersionScheme) -> str:
+    updated_at = int(version.updated_at.timestamp() * 1_000_000)
+    return f'"{version.id}-{updated_at:x}-{_RENDER_VERSION}"'
+
+
+def render_config(
+    wg_config: ConfigModelScheme, server: Optional[ServerModelScheme] = None
+) -> str:
+    settings = config.wireguard
+    # configs made before nodes existed use the single server of the settings
+    public_key = server.public_key if server else settings.WG_SERVER_PUBLIC_KEY
+    endpoint = server.endpoint if server else settings.WG_ENDPOINT
+    return (
+        "[Interface]\n"
+        f"PrivateKey = {wg_config.private_key.get_secret_value()}\n"
+        f"Address = {wg_config.ip_address}\n"
+        f"DNS = {settings.WG_DNS}\n"
+        "\n"
+        "[Peer]\n"
+        f"PublicKey = {public_key}\n"
+        f"Endpoint = {endpoint}\n"
+        f"AllowedIPs = {settings.WG_ALLOWED_IPS}\n"
+        f"PersistentKeepalive = {settings.WG_PERSISTENT_KEEPALIVE}\n"
+    )
+
+
+class ConfigService(BaseService):
+    _uow: UnitOfWork
+
+    @BaseService.handle_exceptions
+    async def download(
+        self, telegram_id: int, config_id: int, if_none_match: Optional[str] = None
+    ) -> ConfigDownload:
+        """The user's config file; NotFoundError for a config of another
+        user, so ids can't be probed."""
+        cache = ConfigRepository.response_cache
+        lookup = await cache.get(config_id)
+        if cached := lookup.response:
+            if cached.owner != str(telegram_id):
+                raise NotFoundError
+            if etag_matches(if_none_match, cached.etag):
+                return ConfigDownload(cached.etag, None)
+            return ConfigDownload(cached.etag, cached.body)
+
+        async with self._uow as uow:
+            if if_none_match:
+                # revalidation only needs the version columns
+                version = await uow.configs.get_version(config_id, telegram_id)
+                if version is None:
+                    raise NotFoundError
+                etag = config_etag(version)
+                if etag_matches(if_none_match, etag):
+                    return ConfigDownload(etag, None)
+
+            owned = await uow.configs.get_owned(config_id, telegram_id)
+            if owned is None:
+                raise NotFoundError
+            wg_config, server = owned
+            updated_at = wg_config.updated_at
+            if server is not None:
+                # as in get_version: a changed node changes the file
+                updated_at = max(updated_at, server.updated_at)
+
+        etag = config_etag(ConfigVersionScheme(id=config_id, updated_at=updated_at))
+        body = render_config(wg_config, server)
+        # skipped if a write invalidated the entry since the lookup
+        await cache.set(
+            config_id, CachedResponse(str(telegram_id), etag, body), lookup.generation
+        )
+        return ConfigDownload(etag, body)
+
+    @BaseService.handle_exceptions
+    async def create(
+        self, telegram_id: int, data: ConfigCreateScheme
+    ) -> ConfigPublicScheme:
+        """Places a new peer on a node and gives it the node's next free
+        address; DataFetchError when no node has room."""
+        async with self._uow as uow:
+            user = await uow.users.get_one({"telegram_id": telegram_id})
+            if user is None:
+                raise NotFoundError
+            await uow.servers.lock_placement()
+            servers = {
+                server.id: server
+                for server in await uow.servers.get_all({"is_active": True})
+            }
+            placement = Placement(
+                (Node(s.id, s.capacity, s.peer_count) for s in servers.values()),
+                config.placement.PLACEMENT_LOAD_FACTOR,
+            )
+            # a node whose subnet ran out is skipped like a full one
+            exhausted: set[int] = set()
+            while node := placement.choose(data.public_key, exclude=exhausted):
+                server = servers[node.id]
+                address = await uow.configs.free_address(
+                    server.id, *peer_range(server.subnet)
+                )
+                if address is None:
+                    exhausted.add(node.id)
+                    continue
+                wg_config = await uow.configs.insert(
+                    {
+                        "user_id": user.id,
+                        "private_key": data.private_key,
+                        "public_key": data.public_key,
+                        "ip_address": peer_network(address),
+                        "server_id": server.id,
+                    }
+                )
+                await uow.commit()
+                return ConfigPublicScheme.model_validate(
+                    wg_config, from_attributes=True
+                )
+            raise DataFetchError
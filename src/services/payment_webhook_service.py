@@ -0,0 +1,91 @@
+import hashlib
+import hmac
+import json
+from typing import Optional
+
+from pydantic import ValidationError
+
+from src.core.cache.idempotency import IdempotencyKeys
+from src.core.config import config, reloader
+from src.core.utils.base_service import BaseService
+from src.core.utils.uow import UnitOfWork
+from src.jobs import payment_event_processor
+from src.models import PaymentMethod
+from src.schemes.payments import (
+    PaymentEventInsertScheme,
+    PaymentWebhookAckScheme,
+    PaymentWebhookScheme,
+)
+from src.utils import DataConflictServiceError, DataValidationError, ForbiddenError
+
+
+SIGNATURE_PREFIX = "sha256="
+
+idempotency = IdempotencyKeys(
+    "payment-webhook",
+    pending_ttl=config.webhook.WEBHOOK_PENDING_TTL,
+    done_ttl=config.webhook.WEBHOOK_IDEMPOTENCY_TTL,
+)
+reloader.bind("webhook.WEBHOOK_PENDING_TTL", idempotency, "pending_ttl")
+reloader.bind("webhook.WEBHOOK_IDEMPOTENCY_TTL", idempotency, "done_ttl")
+reloader.live("webhook.WEBHOOK_SECRET")
+
+
+def verify_signature(body: bytes, signature: Optional[str]) -> None:
+    secret = config.webhook.WEBHOOK_SECRET
+    if not secret or not signature or not signature.startswith(SIGNATURE_PREFIX):
+        raise ForbiddenError
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, signature.removeprefix(SIGNATURE_PREFIX)):
+        raise ForbiddenError
+
+
+class PaymentWebhookService(BaseService):
+    """Stores payment webhooks and acknowledges them right away.
+
+    The hot path is one Redis claim and one INSERT; the payment itself is
+    updated later by the PaymentEventProcessor, in batches.
+    """
+
+    _uow: UnitOfWork
+
+    @BaseService.handle_exceptions
+    async def ingest(
+        self, provider: PaymentMethod, body: bytes, signature: Optional[str]
+    ) -> PaymentWebhookAckScheme:
+        verify_signature(body, signature)
+        try:
+            payload = json.loads(body)
+            webhook = PaymentWebhookScheme.model_validate(payload)
+        except (ValueError, ValidationError):
+            raise DataValidationError
+
+        key = f"{provider.name}:{webhook.event_id}"
+        # duplicates are answered before any DB work; without Redis the
+        # unique constraint of payment_events still drops them
+        state = await idempotency.claim(key)
+        if state == "done":
+            return PaymentWebhookAckScheme(status="duplicate")
+        if state == "pending":
+            # the first delivery is still being stored, the provider retries
+            raise DataConflictServiceError
+
+        try:
+            async with self._uow as uow:
+                stored = await uow.payment_events.insert_or_ignore(
+                    PaymentEventInsertScheme(
+                        provider=provider, **webhook.model_dump(), payload=payload
+                    )
+                )
+                await uow.commit()
+        except BaseException:
+            if state == "new":
+                await idempotency.release(key)
+            raise
+        if state == "new":
+            await idempotency.complete(key)
+
+        if stored is None:
+            return PaymentWebhookAckScheme(status="duplicate")
+        payment_event_processor.notify()
+        return PaymentWebhookAckScheme(status="accepted")
@@ -0,0 +1,54 @@
+from src.core.placement import peer_slots
+from src.core.utils.base_service import BaseService
+from src.core.utils.uow import UnitOfWork
+from src.schemes.servers import (
+    ServerInsertScheme,
+    ServerModelScheme,
+    ServerPeersScheme,
+)
+from src.utils import DataConflictServiceError, DataValidationError, NotFoundError
+
+
+class ServerService(BaseService):
+    _uow: UnitOfWork
+
+    @BaseService.handle_exceptions
+    async def add(self, data: ServerInsertScheme) -> ServerModelScheme:
+        """Adds a node; the rebalancer moves its share of peers onto it."""
+        if data.capacity > peer_slots(data.subnet):
+            raise DataValidationError
+        async with self._uow as uow:
+            server = await uow.servers.insert_or_ignore(data)
+            if server is None:
+                # the name is taken or the subnet overlaps another node's
+                raise DataConflictServiceError
+            await uow.commit()
+        return server
+
+    @BaseService.handle_exceptions
+    async def drain(self, name: str) -> ServerModelScheme:
+        """Stops placing peers on a node; the rebalancer moves its peers off,
+        and once its peer_count is zero it can be shut down."""
+        async with self._uow as uow:
+            server = await uow.servers.update({"name": name}, {"is_active": False})
+            if server is None:
+                raise NotFoundError
+            await uow.commit()
+        return server
+
+    @BaseService.handle_exceptions
+    async def get_all(self) -> list[ServerModelScheme]:
+        async with self._uow as uow:
+            return await uow.servers.find({"order_by": ["id"]})
+
+    @BaseService.handle_exceptions
+    async def peers(
+        self, server_id: int, after_id: int, limit: int
+    ) -> ServerPeersScheme:
+        async with self._uow as uow:
+            if not await uow.servers.exists({"id": server_id}):
+                raise NotFoundError
+            peers = await uow.configs.peers(server_id, after_id, limit)
+        return ServerPeersScheme(
+            peers=peers, next_after=peers[-1].id if len(peers) == limit else None
+        )
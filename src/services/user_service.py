@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import joinedload
+
+from src.core.config import config, reloader
+from src.core.utils.base_service import BaseService
+from src.core.utils.uow import UnitOfWork
+from src.models import Users
+from src.schemes.users import UserProfileScheme, UserWithConfigsScheme
+from src.utils import NotFoundError
+
+
+reloader.live("db.PAYMENTS_RECENT_DAYS")
+
+
+class UserService(BaseService):
+    _uow: UnitOfWork
+
+    @BaseService.handle_exceptions
+    async def profile(self, telegram_id: int, payments_limit: int) -> UserProfileScheme:
+        async with self._uow as uow:
+            # 1st query: the user with configs joined in; a user has a handful
+            # of configs, so the row repetition is cheaper than another trip
+            user = await uow.users.get_one(
+                {"telegram_id": telegram_id},
+                load=(joinedload(Users.wireguard_configs),),
+                scheme=UserWithConfigsScheme,
+            )
+            if user is None:
+                raise NotFoundError
+            # 2nd query: only the latest payments, selectinload has no limit;
+            # the date bound keeps old partitions out of the plan
+            since = datetime.now() - timedelta(days=config.db.PAYMENTS_RECENT_DAYS)
+            payments = await uow.payments.get_recent(user.id, payments_limit, since)
+
+        return UserProfileScheme(**dict(user), payments=payments)
@@ -1,4 +1,4 @@
-from .logging import get_logger
+from .logging import get_logger, setup_logging, shutdown_logging
 from .service_errors import (
     NotFoundError,
     ForbiddenError,
@@ -12,6 +12,8 @@ from .service_errors import (
 __all__ = [
     "ServiceError",
     "get_logger",
+    "setup_logging",
+    "shutdown_logging",
     "NotFoundError",
     "ForbiddenError",
     "DataValidationError",
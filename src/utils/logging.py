@@ -1,9 +1,15 @@
+import atexit
+import copy
 import glob
+import json
 import logging
 import os
 import queue
+import threading
+import time
 from logging.handlers import QueueHandler, QueueListener
-from src.core.config import config
+from src.core.config import config, reloader
+from src.core.metrics import registry
 
 
 def clear_logs_folder(log_dir="logs", pattern="bot.log*"):
@@ -12,41 +18,250 @@ def clear_logs_folder(log_dir="logs", pattern="bot.log*"):
             log_files = glob.glob(os.path.join(log_dir, pattern))
             for f in log_files:
                 os.remove(f)
-                logging.info(f"🤗 Удалён файл: {f}")
+                logging.info("🤗 Удалён файл: %s", f)
         else:
-            logging.info(f"🐻 Папка {log_dir} не найдена")
+            logging.info("🐻 Папка %s не найдена", log_dir)
     except Exception as e:
-        logging.info(f"❌ Ошибка при очистке логов: {e}")
+        logging.info("❌ Ошибка при очистке логов: %s", e)
 
 
-os.makedirs("logs", exist_ok=True)
-log_queue = queue.Queue()
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime"}
 
-formatter = logging.Formatter(fmt=config.log.FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
 
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+        }
+        # anything passed through `extra=` becomes a structured field
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets `limit` records per (logger, level, template) through each window,
+    then only every `sample_rate`-th one. Passed records carry the number of
+    suppressed duplicates in `record.suppressed`."""
+
+    def __init__(self, limit: int, window: float, sample_rate: int) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        # key -> [window_start, seen_in_window, suppressed_since_last_pass]
+        self._state: dict[tuple, list] = {}
+        self.configure(limit, window, sample_rate)
+
+    def configure(self, limit: int, window: float, sample_rate: int) -> None:
+        with self._lock:
+            self._limit = limit
+            self._window = window
+            self._sample_rate = max(sample_rate, 1)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._limit <= 0:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = record.created
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self._window:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                if len(self._state) > 10_000:
+                    self._evict(now)
+            else:
+                state[1] += 1
+                seen = state[1]
+                if seen > self._limit and (seen - self._limit) % self._sample_rate:
+                    state[2] += 1
+                    return False
+                suppressed, state[2] = state[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _evict(self, now: float) -> None:
+        expired = [k for k, v in self._state.items() if now - v[0] >= self._window]
+        for key in expired:
+            del self._state[key]
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped
+    and counted, and a summary is enqueued once there is room again."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        # records come from any thread
+        self._counts_lock = threading.Lock()
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The message is merged now, since args may change before the
+        # listener thread gets to it; formatting is left to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._counts_lock:
+            try:
+                if self._unreported:
+                    self.queue.put_nowait(self._drop_record(record))
+                    self._unreported = 0
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                self._unreported += 1
+
+    def _drop_record(self, record: logging.LogRecord) -> logging.LogRecord:
+        return logging.LogRecord(
+            name=record.name,
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg="Log queue overflow: %d records dropped",
+            args=(self._unreported,),
+            exc_info=None,
+        )
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # the default put_nowait fails if the queue is full at shutdown
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
 
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
 
 logger = logging.getLogger("MainServiceLogger")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(config.log.LOG_LEVEL)
 
-if config.api.MODE == "TEST":
-    clear_logs_folder()
 
-file_handler = logging.FileHandler("logs/service.log")
-file_handler.setFormatter(formatter)
+def _apply_settings() -> None:
+    logger.setLevel(config.log.LOG_LEVEL)
+    if queue_handler is None:
+        return
+    for log_filter in queue_handler.filters:
+        if isinstance(log_filter, RateLimitFilter):
+            log_filter.configure(
+                limit=config.log.LOG_RATE_LIMIT,
+                window=config.log.LOG_RATE_WINDOW,
+                sample_rate=config.log.LOG_SAMPLE_RATE,
+            )
 
-queue_handler = QueueHandler(log_queue)
-logger.addHandler(queue_handler)
 
-queue_listener = QueueListener(
-    log_queue, file_handler, console_handler, respect_handler_level=True
+# format, serialization and queue size are fixed when logging is set up
+reloader.on_change(
+    (
+        "log.LOG_LEVEL",
+        "log.LOG_RATE_LIMIT",
+        "log.LOG_RATE_WINDOW",
+        "log.LOG_SAMPLE_RATE",
+    ),
+    _apply_settings,
 )
-queue_listener.start()
 
-logger.debug("✅ Logging is ready for work")
+queue_handler: BoundedQueueHandler | None = None
+queue_listener: _DrainingQueueListener | None = None
+_handlers: list[logging.Handler] = []
+
+
+def setup_logging() -> None:
+    """Attaches the queue handler and starts the listener thread.
+
+    Nothing happens at import time, so tools importing `src` do not create
+    files or threads; the application calls this once on startup.
+    """
+    global queue_handler, queue_listener
+    if queue_listener is not None:
+        return
+
+    for handler in _handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+    os.makedirs("logs", exist_ok=True)
+    if config.api.MODE == "TEST":
+        clear_logs_folder()
+
+    if config.log.LOG_SERIALIZE:
+        formatter = JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S")
+    else:
+        formatter = logging.Formatter(
+            fmt=config.log.FORMAT, datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler("logs/service.log")
+    file_handler.setFormatter(formatter)
+    _handlers[:] = [file_handler, console_handler]
+
+    queue_handler = BoundedQueueHandler(queue.Queue(maxsize=config.log.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(
+        RateLimitFilter(
+            limit=config.log.LOG_RATE_LIMIT,
+            window=config.log.LOG_RATE_WINDOW,
+            sample_rate=config.log.LOG_SAMPLE_RATE,
+        )
+    )
+    logger.addHandler(queue_handler)
+
+    queue_listener = _DrainingQueueListener(
+        queue_handler.queue, *_handlers, respect_handler_level=True
+    )
+    queue_listener.start()
+    atexit.register(shutdown_logging)
+
+    logger.debug("✅ Logging is ready for work")
 
 
 def get_logger() -> logging.Logger:
     return logger
+
+
+def get_dropped_count() -> int:
+    return queue_handler.dropped if queue_handler else 0
+
+
+def shutdown_logging() -> None:
+    global queue_listener
+    # set only while the listener runs, so a second call does nothing
+    if queue_listener is None:
+        return
+    started = time.perf_counter()
+    queue_listener.stop()
+    queue_listener = None
+    for handler in _handlers:
+        handler.flush()
+    logger.removeHandler(queue_handler)
+    # late records (atexit hooks, interpreter teardown) are written directly
+    for handler in _handlers:
+        logger.addHandler(handler)
+    logger.debug("Log queue drained in %.1f ms", (time.perf_counter() - started) * 1000)
+    if queue_handler.dropped:
+        logger.warning("%d log records were dropped", queue_handler.dropped)
+
+
+registry.gauge(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    callback=get_dropped_count,
+)
@@ -1,6 +1,7 @@
 from enum import Enum
 
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from src.utils import get_logger
 
 
@@ -62,13 +63,19 @@ def create_exception_handlers(app: FastAPI):
     async def service_error_handler(request: Request, exc: ServiceError):
         code = STATUS_CODE_MAPPING[exc.response_status]
         message = exc.response_status.value
-        logger.warning(f"ServiceError: {exc.response_status.value} at {request.url}, code: {code}")
-        raise HTTPException(status_code=code, detail=message)
+        logger.warning(
+            "ServiceError: %s at %s, code: %s",
+            exc.response_status.value,
+            request.url,
+            code,
+        )
+        # handlers must return the response, raising here would become a 500
+        return JSONResponse(status_code=code, content={"detail": message})
 
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
-        logger.exception(f"Unhandled Exception at {request.url}: {exc}")
-        raise HTTPException(
+        logger.exception("Unhandled Exception at %s: %s", request.url, exc)
+        return JSONResponse(
             status_code=500,
-            detail=TeamResponseStatus.INTERNAL_ERROR.value,
+            content={"detail": TeamResponseStatus.INTERNAL_ERROR.value},
         )
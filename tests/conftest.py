@@ -0,0 +1,12 @@
+import os
+
+# the settings need a database to point at; tests never connect to it
+for name, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_DATABASE": "test",
+    "FORMAT": "%(asctime)s %(levelname)s %(name)s %(message)s",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from src.core.admission.controller import AdmissionGate, Priority
+from src.utils import DataFetchError
+
+
+def _gate(limit: int = 1, queue_timeout: float = 1.0, max_queue: int = 10):
+    return AdmissionGate("read", limit, queue_timeout, max_queue)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_the_limit_without_waiting() -> None:
+    async def scenario() -> None:
+        gate = _gate(limit=2)
+        await gate.acquire()
+        await gate.acquire()
+        assert gate.in_use == 2
+        assert gate.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_release_hands_the_slot_to_the_highest_priority_waiter() -> None:
+    async def scenario() -> None:
+        gate = _gate()
+        await gate.acquire()
+        order = []
+
+        async def wait(name: str, priority: Priority) -> None:
+            await gate.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(wait("bulk", Priority.BULK)),
+            asyncio.create_task(wait("default-1", Priority.DEFAULT)),
+            asyncio.create_task(wait("critical", Priority.CRITICAL)),
+            asyncio.create_task(wait("default-2", Priority.DEFAULT)),
+        ]
+        await _settle()
+        assert gate.waiting == 4
+
+        for _ in tasks:
+            gate.release()
+            await _settle()
+        await asyncio.gather(*tasks)
+
+        assert order == ["critical", "default-1", "default-2", "bulk"]
+        # the slot was handed over every time, never given back
+        assert gate.in_use == 1
+
+    asyncio.run(scenario())
+
+
+def test_new_arrivals_do_not_overtake_the_queue() -> None:
+    async def scenario() -> None:
+        gate = _gate()
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await _settle()
+
+        gate.release()
+        newcomer = asyncio.create_task(gate.acquire())
+        await _settle()
+
+        assert waiter.done()
+        assert not newcomer.done()
+        newcomer.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_waiters_give_up_after_the_queue_timeout() -> None:
+    async def scenario() -> None:
+        gate = _gate(queue_timeout=0.01)
+        await gate.acquire()
+
+        with pytest.raises(DataFetchError):
+            await gate.acquire()
+
+        assert gate.waiting == 0
+        # the abandoned waiter does not swallow the next release
+        gate.release()
+        assert gate.in_use == 0
+
+    asyncio.run(scenario())
+
+
+def test_a_full_queue_evicts_a_lower_priority_waiter() -> None:
+    async def scenario() -> None:
+        gate = _gate(max_queue=1)
+        await gate.acquire()
+        bulk = asyncio.create_task(gate.acquire(Priority.BULK))
+        await _settle()
+
+        critical = asyncio.create_task(gate.acquire(Priority.CRITICAL))
+        await _settle()
+
+        with pytest.raises(DataFetchError):
+            await bulk
+        gate.release()
+        await critical
+
+    asyncio.run(scenario())
+
+
+def test_a_full_queue_rejects_an_equal_priority_newcomer() -> None:
+    async def scenario() -> None:
+        gate = _gate(max_queue=1)
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await _settle()
+
+        with pytest.raises(DataFetchError):
+            await gate.acquire()
+
+        assert not waiter.done()
+        waiter.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_raising_the_limit_admits_waiters_at_once() -> None:
+    async def scenario() -> None:
+        gate = _gate()
+        await gate.acquire()
+        waiters = [asyncio.create_task(gate.acquire()) for _ in range(2)]
+        await _settle()
+
+        gate.resize(3)
+        await asyncio.gather(*waiters)
+
+        assert gate.in_use == 3
+
+    asyncio.run(scenario())
+
+
+def test_lowering_the_limit_gives_slots_up_as_they_are_released() -> None:
+    async def scenario() -> None:
+        gate = _gate(limit=3)
+        for _ in range(3):
+            await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await _settle()
+
+        gate.resize(1)
+        gate.release()
+        gate.release()
+        await _settle()
+        assert gate.in_use == 1
+        assert not waiter.done()
+
+        gate.release()
+        await waiter
+        assert gate.in_use == 1
+
+    asyncio.run(scenario())
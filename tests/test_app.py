@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from src.app import StartupReport, create_app, startup_seconds
+from src.utils import shutdown_logging
+
+
+def test_startup_report_times_each_phase() -> None:
+    report = StartupReport(time.perf_counter())
+
+    with report.phase("db_pool"):
+        time.sleep(0.01)
+    report.mark("imports", report.started)
+    report.finish()
+
+    assert list(report.phases) == ["db_pool", "imports", "total"]
+    assert report.phases["db_pool"] >= 0.01
+    assert report.phases["total"] >= report.phases["db_pool"]
+    assert startup_seconds.value(phase="db_pool") == report.phases["db_pool"]
+
+
+def test_startup_report_times_a_failed_phase() -> None:
+    report = StartupReport(time.perf_counter())
+
+    with pytest.raises(RuntimeError):
+        with report.phase("redis"):
+            raise RuntimeError
+
+    assert "redis" in report.phases
+
+
+def test_create_app_includes_every_router(monkeypatch, tmp_path) -> None:
+    # logging writes to ./logs
+    monkeypatch.chdir(tmp_path)
+    try:
+        application = create_app()
+    finally:
+        shutdown_logging()
+
+    paths = {route.path for route in application.routes}
+    assert "/users/{telegram_id}/profile" in paths
+    assert "/servers/{server_id}/peers" in paths
+    assert "/admin/config/reload" in paths
+    report = application.state.startup_report
+    assert list(report.phases) == ["imports", "routers"]
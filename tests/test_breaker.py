@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.cache import breaker as breaker_module
+from src.core.cache.breaker import BreakerState, CircuitBreaker
+from src.core.cache.helper import CacheHelper
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", clock)
+    return clock
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", failure_threshold=3, open_seconds=10.0, probe_interval=1.0
+    )
+
+
+def test_opens_after_consecutive_failures(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow()
+
+
+def test_a_success_resets_the_failure_count(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_half_opens_after_open_seconds_and_probes_once_per_interval(
+    clock: _Clock,
+) -> None:
+    breaker = _breaker()
+    breaker.trip()
+
+    clock.now += 9.9
+    assert not breaker.allow()
+
+    clock.now += 0.1
+    assert breaker.allow()
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert not breaker.allow()
+
+    clock.now += 1.0
+    assert breaker.allow()
+
+
+def test_a_successful_probe_closes(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.trip()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_a_failed_probe_opens_again(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.trip()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.OPEN
+    clock.now += 9
+    assert not breaker.allow()
+
+
+def test_reset_closes(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.trip()
+
+    breaker.reset()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize(
+    "error, counts",
+    [
+        (ConnectionError(), True),
+        (TimeoutError(), True),
+        (asyncio.TimeoutError(), True),
+        (OSError(), True),
+        (ResponseError("NOSCRIPT"), False),
+    ],
+)
+def test_only_unreachable_redis_counts_against_the_breaker(
+    monkeypatch, error: Exception, counts: bool
+) -> None:
+    breaker = _breaker()
+    monkeypatch.setattr(CacheHelper, "breaker", breaker)
+
+    CacheHelper.report_error(error)
+
+    assert breaker._failures == (1 if counts else 0)
+
+
+def test_get_client_fails_fast_while_open(monkeypatch, clock: _Clock) -> None:
+    breaker = _breaker()
+    monkeypatch.setattr(CacheHelper, "breaker", breaker)
+    monkeypatch.setattr(CacheHelper, "_initialized", True)
+    monkeypatch.setattr(CacheHelper, "_client", object())
+    assert CacheHelper.get_client() is not None
+
+    breaker.trip()
+
+    assert CacheHelper.get_client() is None
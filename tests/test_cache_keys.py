@@ -0,0 +1,121 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel
+
+from src.core.cache.keys import MAX_RAW_LENGTH, KeyBuilder, encode
+
+
+class _Color(Enum):
+    red = 1
+
+
+class _Point(BaseModel):
+    x: int
+    y: int
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        (None, "~"),
+        (True, "T"),
+        (5, "5"),
+        (0.5, "0.5"),
+        (Decimal("1.10"), "1.10"),
+        ("a:b", "'a:b'"),
+        (b"a", "b'a'"),
+        (datetime(2026, 1, 2, 3, 4), "2026-01-02T03:04:00"),
+        (date(2026, 1, 2), "2026-01-02"),
+        (UUID(int=1), "00000000-0000-0000-0000-000000000001"),
+        ((1, "a"), "[1,'a']"),
+        ({"b": 2, "a": 1}, "{'a'=1,'b'=2}"),
+        (frozenset({2, 1}), "[1,2]"),
+        (_Color.red, "_Color.red"),
+        (_Point(x=1, y=2), '_Point{"x":1,"y":2}'),
+    ],
+)
+def test_encodes_values(value, encoded: str) -> None:
+    assert encode(value) == encoded
+
+
+def test_separators_inside_strings_do_not_collide() -> None:
+    def f(a, b):
+        pass
+
+    build = KeyBuilder(f, "cache")
+
+    assert build(("x:y", "z"), {}) != build(("x", "y:z"), {})
+
+
+def test_rejects_values_without_a_stable_encoding() -> None:
+    with pytest.raises(TypeError):
+        encode(object())
+
+
+def test_key_layout_and_skipped_self() -> None:
+    class Service:
+        def get(self, user_id: int, active: bool = True):
+            pass
+
+    build = KeyBuilder(Service.get, "cache:3", version=2)
+
+    key = build((Service(), 7), {})
+
+    assert key == f"cache:3:{__name__}.{Service.get.__qualname__}:v2:7:T"
+
+
+def test_positional_keyword_and_default_arguments_build_the_same_key() -> None:
+    def f(a, b=2, *, c=3):
+        pass
+
+    build = KeyBuilder(f, "cache")
+
+    assert build((1,), {}) == build((1, 2), {"c": 3}) == build((), {"a": 1, "b": 2})
+
+
+def test_key_names_the_arguments_that_identify_a_result() -> None:
+    def f(uow, user_id):
+        pass
+
+    build = KeyBuilder(f, "cache", key=("user_id",))
+
+    assert build((object(), 1), {}) == build((object(), 1), {})
+
+
+def test_variadic_functions_must_name_their_key() -> None:
+    def f(*args, **kwargs):
+        pass
+
+    with pytest.raises(ValueError):
+        KeyBuilder(f, "cache")
+    with pytest.raises(ValueError):
+        KeyBuilder(lambda a: None, "cache", key=("b",))
+
+
+def test_missing_arguments_are_rejected() -> None:
+    def f(a):
+        pass
+
+    with pytest.raises(TypeError):
+        KeyBuilder(f, "cache")((), {})
+
+
+def test_long_arguments_are_hashed() -> None:
+    def f(a):
+        pass
+
+    build = KeyBuilder(f, "cache")
+
+    short = build(("x" * (MAX_RAW_LENGTH - 2),), {})
+    long = build(("x" * MAX_RAW_LENGTH,), {})
+    other = build(("x" * MAX_RAW_LENGTH + "y",), {})
+
+    assert short.endswith("'" + "x" * (MAX_RAW_LENGTH - 2) + "'")
+    assert long.startswith(build.prefix + "#")
+    assert len(long) == len(build.prefix) + 33
+    assert long != other
+    assert long == build(("x" * MAX_RAW_LENGTH,), {})
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime, timedelta
+from ipaddress import IPv4Network
+from typing import Any, NamedTuple, Optional
+
+import pytest
+
+from src.core.cache.response_cache import CachedResponse, CacheLookup
+from src.core.metrics.queries import count_queries, record_statement
+from src.core.middlewares.timing import QUERY_BUDGETS
+from src.models import Servers, WireGuardConfigs
+from src.repositories import ConfigRepository
+from src.schemes.configs import ConfigModelScheme, ConfigVersionScheme
+from src.services import ConfigService
+from src.services.config_service import config_etag, etag_matches, render_config
+from src.utils import NotFoundError
+
+UPDATED_AT = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _config(**overrides) -> ConfigModelScheme:
+    return ConfigModelScheme(
+        **{
+            "id": 7,
+            "user_id": 1,
+            "private_key": "p" * 44,
+            "public_key": "k" * 44,
+            "ip_address": "10.0.0.2/32",
+            "server_id": None,
+            "updated_at": UPDATED_AT,
+            **overrides,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('"a"', True),
+        ('W/"a"', True),
+        ('"b", "a"', True),
+        ('"b",W/"a" ', True),
+        ('"b"', False),
+        ("a", False),
+    ],
+)
+def test_etag_matches(header, matches: bool) -> None:
+    assert etag_matches(header, '"a"') is matches
+
+
+def test_config_etag_changes_with_the_version() -> None:
+    etag = config_etag(ConfigVersionScheme(id=7, updated_at=UPDATED_AT))
+    later = config_etag(
+        ConfigVersionScheme(id=7, updated_at=UPDATED_AT + timedelta(microseconds=1))
+    )
+
+    assert etag.startswith('"7-') and etag.endswith('"')
+    assert etag != later
+    # the full row and its version columns give the same tag
+    assert config_etag(_config()) == etag
+
+
+def test_render_config_uses_the_settings_without_a_server() -> None:
+    body = render_config(_config())
+
+    assert f"PrivateKey = {'p' * 44}\n" in body
+    assert "Address = 10.0.0.2/32\n" in body
+    assert body.startswith("[Interface]\n")
+
+
+class _Cache:
+    def __init__(self, cached: CachedResponse) -> None:
+        self.cached = cached
+
+    async def get(self, key: object) -> CacheLookup:
+        return CacheLookup(self.cached, "0")
+
+
+def _download(monkeypatch, telegram_id: int, if_none_match=None):
+    cache = _Cache(CachedResponse("5", '"e"', "body"))
+    monkeypatch.setattr(ConfigRepository, "response_cache", cache)
+    # a cache hit never opens the unit of work
+    service = ConfigService(None)
+    return asyncio.run(service.download(telegram_id, 7, if_none_match))
+
+
+def test_download_serves_a_cached_body_to_its_owner(monkeypatch) -> None:
+    download = _download(monkeypatch, telegram_id=5)
+
+    assert download == ('"e"', "body")
+
+
+def test_download_answers_a_current_copy_without_a_body(monkeypatch) -> None:
+    download = _download(monkeypatch, telegram_id=5, if_none_match='"e"')
+
+    assert download == ('"e"', None)
+
+
+def test_download_hides_a_cached_config_of_another_user(monkeypatch) -> None:
+    with pytest.raises(NotFoundError):
+        _download(monkeypatch, telegram_id=6)
+
+
+class _Version(NamedTuple):
+    id: int
+    updated_at: datetime
+
+
+class _Result:
+    def __init__(self, row: Any) -> None:
+        self._row = row
+
+    def one_or_none(self) -> Any:
+        return self._row
+
+
+class _Session:
+    """Answers statements in order and counts them like the engine hook."""
+
+    def __init__(self, *rows: Any) -> None:
+        self.rows = list(rows)
+        self.info: dict[str, Any] = {}
+
+    async def execute(self, statement: Any, *args, **kwargs) -> _Result:
+        record_statement(str(statement))
+        return _Result(self.rows.pop(0))
+
+
+class _UnitOfWork:
+    def __init__(self, session: _Session) -> None:
+        self.configs = ConfigRepository(session)
+
+    async def __aenter__(self) -> "_UnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+
+class _EmptyCache:
+    def __init__(self) -> None:
+        self.stored: Optional[CachedResponse] = None
+
+    async def get(self, key: object) -> CacheLookup:
+        return CacheLookup(None, "0")
+
+    async def set(self, key: object, response: CachedResponse, generation) -> None:
+        self.stored = response
+
+
+def test_revalidating_a_changed_config_stays_within_the_route_budget(
+    monkeypatch,
+) -> None:
+    server_updated_at = UPDATED_AT + timedelta(hours=1)
+    wg_config = WireGuardConfigs(
+        id=7,
+        user_id=1,
+        private_key="p" * 44,
+        public_key="k" * 44,
+        ip_address="10.0.0.2/32",
+        server_id=3,
+        updated_at=UPDATED_AT,
+    )
+    server = Servers(
+        id=3,
+        name="wg3",
+        endpoint="wg3.example.com:51820",
+        public_key="s" * 44,
+        subnet=IPv4Network("10.0.0.0/16"),
+        capacity=1000,
+        is_active=True,
+        peer_count=1,
+        updated_at=server_updated_at,
+    )
+    session = _Session(_Version(7, server_updated_at), (wg_config, server))
+    cache = _EmptyCache()
+    monkeypatch.setattr(ConfigRepository, "response_cache", cache)
+    service = ConfigService(_UnitOfWork(session))
+    budget = QUERY_BUDGETS["/users/{telegram_id}/configs/{config_id}"]
+
+    with count_queries(budget) as stats:
+        download = asyncio.run(service.download(5, 7, '"stale"'))
+
+    assert stats.count == 2
+    assert f"PublicKey = {'s' * 44}\n" in download.body
+    assert download.etag == config_etag(_Version(7, server_updated_at))
+    assert cache.stored == CachedResponse("5", download.etag, download.body)
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from src.core.coordination import LeaderElection, LeaseLost, check_fence, lease
+
+
+class _Fence:
+    """Stands in for the fence counter script of one lease."""
+
+    def __init__(self, latest: Optional[int]) -> None:
+        self.latest = latest
+        self.keys: list[list[str]] = []
+
+    async def __call__(self, keys: list[str], args: list) -> Optional[bytes]:
+        self.keys.append(keys)
+        return None if self.latest is None else str(self.latest).encode()
+
+
+@pytest.mark.parametrize("latest", [None, 6, 7])
+def test_check_fence_passes_for_the_newest_token(monkeypatch, latest) -> None:
+    fence = _Fence(latest)
+    monkeypatch.setattr(lease, "_fence", fence)
+
+    asyncio.run(check_fence("maintenance", 7))
+
+    assert fence.keys == [[lease.key("fence", "maintenance")]]
+
+
+def test_check_fence_rejects_a_superseded_token(monkeypatch) -> None:
+    monkeypatch.setattr(lease, "_fence", _Fence(8))
+
+    with pytest.raises(LeaseLost):
+        asyncio.run(check_fence("maintenance", 7))
+
+
+def test_lease_lost_ends_the_leader_work_and_releases(monkeypatch) -> None:
+    election = LeaderElection("maintenance", ttl=3)
+    released = []
+
+    async def release() -> None:
+        released.append(election._lease.token)
+
+    election._lease.token = 7
+    monkeypatch.setattr(election._lease, "release", release)
+
+    async def work(token: int) -> None:
+        raise LeaseLost("maintenance")
+
+    asyncio.run(election._lead(work))
+
+    assert released == [7]
@@ -0,0 +1,158 @@
+import asyncio
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.cache.count_cache import CountCache
+from src.core.cache.helper import CacheHelper
+from src.core.database.base import AFTER_COMMIT
+from src.repositories import UserRepository
+
+
+class _Redis:
+    """The commands CountCache sends, over dicts."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    async def hget(self, key: str, field: str) -> Optional[bytes]:
+        value = self.hashes.get(key, {}).get(field)
+        return None if value is None else str(value).encode()
+
+    def pipeline(self, transaction: bool = True) -> "_Pipeline":
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis: _Redis) -> None:
+        self._redis = redis
+
+    async def __aenter__(self) -> "_Pipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def hset(self, key: str, field: str, value: int) -> None:
+        self._redis.hashes.setdefault(key, {})[field] = value
+
+    def expire(self, key: str, seconds: int) -> None:
+        pass
+
+    async def execute(self) -> None:
+        pass
+
+
+class _Result:
+    def __init__(self, value: Any) -> None:
+        self._value = value
+
+    def scalar_one(self) -> Any:
+        return self._value
+
+
+class _Session:
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self.statements: list[str] = []
+        self.info: dict[str, Any] = {}
+
+    async def execute(self, statement: Any, *args, **kwargs) -> _Result:
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(" ".join(str(compiled).split()))
+        return _Result(self.value)
+
+
+@pytest.fixture
+def redis(monkeypatch) -> _Redis:
+    redis = _Redis()
+    monkeypatch.setattr(CacheHelper, "get_client", classmethod(lambda cls: redis))
+    return redis
+
+
+def test_exists_asks_postgres_for_a_boolean() -> None:
+    session = _Session(True)
+
+    assert asyncio.run(UserRepository(session).exists({"telegram_id": 1}))
+    assert session.statements == [
+        "SELECT EXISTS (SELECT 1 FROM users "
+        "WHERE users.telegram_id = %(telegram_id_1)s) AS anon_1"
+    ]
+
+
+def test_exact_count_runs_count_star() -> None:
+    session = _Session(3)
+
+    assert asyncio.run(UserRepository(session).count({"is_active": True})) == 3
+    assert session.statements == [
+        "SELECT count(*) AS count_1 FROM users WHERE users.is_active = true"
+    ]
+
+
+def test_approximate_count_covers_the_whole_table_only() -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(
+            UserRepository(_Session(0)).count({"is_active": True}, "approximate")
+        )
+
+
+def test_cached_count_is_read_from_redis_until_invalidated(redis: _Redis) -> None:
+    session = _Session(3)
+    repository = UserRepository(session)
+
+    async def scenario() -> list[int]:
+        counts = [await repository.count({"is_active": True}, "cached")]
+        session.value = 4
+        counts.append(await repository.count({"is_active": True}, "cached"))
+        await UserRepository.count_cache.invalidate()
+        counts.append(await repository.count({"is_active": True}, "cached"))
+        return counts
+
+    assert asyncio.run(scenario()) == [3, 3, 4]
+    assert len(session.statements) == 2
+
+
+def test_cached_count_without_redis_counts_every_time(monkeypatch) -> None:
+    monkeypatch.setattr(CacheHelper, "get_client", classmethod(lambda cls: None))
+    session = _Session(3)
+    repository = UserRepository(session)
+
+    async def scenario() -> None:
+        await repository.count({}, "cached")
+        await repository.count({}, "cached")
+
+    asyncio.run(scenario())
+    assert len(session.statements) == 2
+
+
+def test_a_count_from_before_a_write_is_never_read(redis: _Redis) -> None:
+    cache = CountCache("users", ttl=60)
+
+    async def scenario() -> Optional[int]:
+        generation = await cache.generation()
+        # a write commits while the count is running
+        await cache.invalidate()
+        await cache.set(generation, "{}", 3)
+        return await cache.get(await cache.generation(), "{}")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_writes_schedule_one_invalidation_after_commit() -> None:
+    session = _Session(None)
+    repository = UserRepository(session)
+
+    repository._written()
+    repository._written()
+
+    assert session.info[AFTER_COMMIT] == [UserRepository.count_cache.invalidate]
@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from src.core.database.loader import Loader
+from src.models import Users
+from src.repositories import UserRepository
+
+
+class _Batches:
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: list[list[int]] = []
+        self.fail = fail
+
+    async def __call__(self, keys: list[int]) -> dict[int, str]:
+        self.calls.append(keys)
+        if self.fail:
+            raise RuntimeError("database is down")
+        # odd keys don't exist
+        return {key: f"row{key}" for key in keys if key % 2 == 0}
+
+
+def test_concurrent_loads_share_one_batch() -> None:
+    batches = _Batches()
+
+    async def scenario() -> list:
+        loader = Loader(batches)
+        return await asyncio.gather(loader.load(2), loader.load(4), loader.load(3))
+
+    assert asyncio.run(scenario()) == ["row2", "row4", None]
+    assert batches.calls == [[2, 4, 3]]
+
+
+def test_results_and_misses_are_memoized() -> None:
+    batches = _Batches()
+
+    async def scenario() -> None:
+        loader = Loader(batches)
+        await loader.load_many([2, 3])
+        assert await loader.load_many([3, 2, 4]) == [None, "row2", "row4"]
+
+    asyncio.run(scenario())
+    assert batches.calls == [[2, 3], [4]]
+
+
+def test_duplicate_keys_are_fetched_once() -> None:
+    batches = _Batches()
+
+    async def scenario() -> list:
+        return await Loader(batches).load_many([2, 2, 2])
+
+    assert asyncio.run(scenario()) == ["row2"] * 3
+    assert batches.calls == [[2]]
+
+
+def test_batches_are_split_at_max_batch() -> None:
+    batches = _Batches()
+
+    async def scenario() -> None:
+        await Loader(batches, max_batch=2).load_many([2, 4, 6, 8, 10])
+
+    asyncio.run(scenario())
+    assert batches.calls == [[2, 4], [6, 8], [10]]
+
+
+def test_primed_and_cleared_keys() -> None:
+    batches = _Batches()
+
+    async def scenario() -> list:
+        loader = Loader(batches)
+        loader.prime(2, "primed")
+        first = await loader.load(2)
+        loader.clear()
+        return [first, await loader.load(2)]
+
+    assert asyncio.run(scenario()) == ["primed", "row2"]
+    assert batches.calls == [[2]]
+
+
+def test_a_failed_batch_is_not_memoized() -> None:
+    batches = _Batches(fail=True)
+
+    async def scenario() -> str:
+        loader = Loader(batches)
+        with pytest.raises(RuntimeError):
+            await loader.load(2)
+        batches.fail = False
+        return await loader.load(2)
+
+    assert asyncio.run(scenario()) == "row2"
+    assert batches.calls == [[2], [2]]
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others() -> None:
+    batches = _Batches()
+
+    async def scenario() -> str:
+        loader = Loader(batches)
+        first = asyncio.create_task(loader.load(2))
+        second = asyncio.create_task(loader.load(2))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "row2"
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> list[Any]:
+        return self._rows
+
+
+class _Session:
+    def __init__(self, users: list[Users]) -> None:
+        self.users = users
+        self.statements = 0
+        self.info: dict[str, Any] = {}
+
+    async def execute(self, statement: Any, *args, **kwargs) -> _Result:
+        self.statements += 1
+        keys = statement.compile().params["keys"]
+        return _Result([user for user in self.users if user.telegram_id in keys])
+
+
+def _user(id_: int) -> Users:
+    return Users(
+        id=id_,
+        telegram_id=1000 + id_,
+        is_active=True,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+def test_repository_loads_by_a_unique_column_in_one_statement() -> None:
+    session = _Session([_user(1), _user(2)])
+    repository = UserRepository(session)
+
+    async def scenario() -> list:
+        return await asyncio.gather(
+            repository.load(1001, key="telegram_id"),
+            repository.load(1002, key="telegram_id"),
+            repository.load(1003, key="telegram_id"),
+        )
+
+    first, second, missing = asyncio.run(scenario())
+    assert (first.id, second.id, missing) == (1, 2, None)
+    assert session.statements == 1
+
+
+def test_repository_loader_needs_a_unique_column() -> None:
+    with pytest.raises(ValueError):
+        UserRepository(_Session([])).loader("is_active")
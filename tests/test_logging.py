@@ -0,0 +1,101 @@
+import logging
+import queue
+import threading
+
+from src.utils.logging import BoundedQueueHandler, RateLimitFilter
+
+
+def _record(msg: str = "user %s", args: tuple = (1,), created: float = 0.0):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+    record.created = created
+    return record
+
+
+def _passed(log_filter: RateLimitFilter, created: float) -> bool:
+    return log_filter.filter(_record(created=created))
+
+
+def test_rate_limit_filter_passes_the_limit_then_samples() -> None:
+    log_filter = RateLimitFilter(limit=3, window=60.0, sample_rate=5)
+
+    passed = [_passed(log_filter, created=1.0) for _ in range(13)]
+
+    # 3 within the limit, then every 5th: the 8th and the 13th
+    assert passed.count(True) == 5
+    assert passed[:3] == [True] * 3
+    assert passed[7] and passed[12]
+
+
+def test_rate_limit_filter_reports_suppressed_records() -> None:
+    log_filter = RateLimitFilter(limit=1, window=60.0, sample_rate=3)
+    records = [_record(created=1.0) for _ in range(4)]
+
+    results = [log_filter.filter(record) for record in records]
+
+    assert results == [True, False, False, True]
+    assert records[3].suppressed == 2
+
+
+def test_rate_limit_filter_starts_over_in_a_new_window() -> None:
+    log_filter = RateLimitFilter(limit=1, window=10.0, sample_rate=100)
+
+    assert _passed(log_filter, created=0.0)
+    assert not _passed(log_filter, created=5.0)
+    assert _passed(log_filter, created=10.0)
+
+
+def test_rate_limit_filter_keys_on_the_template() -> None:
+    log_filter = RateLimitFilter(limit=1, window=60.0, sample_rate=100)
+
+    assert log_filter.filter(_record("a %s", (1,)))
+    assert log_filter.filter(_record("b %s", (1,)))
+    assert not log_filter.filter(_record("a %s", (2,)))
+
+
+def test_rate_limit_filter_is_off_without_a_limit() -> None:
+    log_filter = RateLimitFilter(limit=0, window=60.0, sample_rate=1)
+
+    assert all(_passed(log_filter, created=1.0) for _ in range(100))
+
+
+def test_queue_handler_merges_the_message_at_the_call() -> None:
+    handler = BoundedQueueHandler(queue.Queue())
+    args = {"state": "before"}
+
+    handler.handle(_record("%(state)s", (args,)))
+    args["state"] = "after"
+
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "before"
+    assert record.args is None
+
+
+def test_queue_handler_drops_and_reports_when_full() -> None:
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.dropped == 3
+
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    handler.handle(_record())
+    summary = handler.queue.get_nowait()
+    assert summary.getMessage() == "Log queue overflow: 3 records dropped"
+
+
+def test_queue_handler_counts_drops_from_every_thread() -> None:
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+
+    def log() -> None:
+        for _ in range(1000):
+            handler.handle(_record())
+
+    threads = [threading.Thread(target=log) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.dropped == 8000
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.core.cache.helper import CacheHelper
+from src.models import PaymentMethod
+from src.services import payment_webhook_service
+from src.services.payment_webhook_service import (
+    PaymentWebhookService,
+    verify_signature,
+)
+from src.utils import (
+    DataConflictServiceError,
+    DataValidationError,
+    ForbiddenError,
+    InternalServiceError,
+)
+
+
+SECRET = "webhook-secret"
+BODY = json.dumps(
+    {"event_id": "evt-1", "payment_id": 7, "status": "PAID", "amount": "10.00"}
+).encode()
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class _Redis:
+    """SET NX / GET / DELETE over a dict."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    async def set(self, key: str, value: bytes, nx: bool = False, ex=None) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+
+class _PaymentEvents:
+    def __init__(self, fail: bool = False) -> None:
+        self.stored: dict[tuple, Any] = {}
+        self.fail = fail
+
+    async def insert_or_ignore(self, event) -> Optional[Any]:
+        if self.fail:
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+        key = (event.provider, event.event_id)
+        if key in self.stored:
+            return None
+        self.stored[key] = event
+        return event
+
+
+class _UnitOfWork:
+    def __init__(self, events: _PaymentEvents) -> None:
+        self.payment_events = events
+        self.commits = 0
+
+    async def __aenter__(self) -> "_UnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch) -> None:
+    monkeypatch.setattr(
+        payment_webhook_service.config.webhook, "WEBHOOK_SECRET", SECRET
+    )
+    monkeypatch.setattr(
+        payment_webhook_service.payment_event_processor, "notify", lambda: None
+    )
+
+
+@pytest.fixture
+def redis(monkeypatch) -> _Redis:
+    redis = _Redis()
+    monkeypatch.setattr(CacheHelper, "get_client", classmethod(lambda cls: redis))
+    return redis
+
+
+def _ingest(uow: _UnitOfWork, body: bytes = BODY, signature: Optional[str] = None):
+    service = PaymentWebhookService(uow)
+    return asyncio.run(
+        service.ingest(PaymentMethod.card, body, signature or _sign(body))
+    )
+
+
+@pytest.mark.parametrize(
+    "signature",
+    [None, "", _sign(BODY)[len("sha256=") :], _sign(BODY, "other"), "sha256=00"],
+)
+def test_rejects_missing_and_wrong_signatures(signature) -> None:
+    with pytest.raises(ForbiddenError):
+        verify_signature(BODY, signature)
+
+
+def test_rejects_everything_without_a_secret(monkeypatch) -> None:
+    monkeypatch.setattr(payment_webhook_service.config.webhook, "WEBHOOK_SECRET", "")
+
+    with pytest.raises(ForbiddenError):
+        verify_signature(BODY, _sign(BODY, ""))
+
+
+def test_accepts_a_signed_body() -> None:
+    verify_signature(BODY, _sign(BODY))
+
+
+def test_rejects_a_malformed_payload(redis: _Redis) -> None:
+    with pytest.raises(DataValidationError):
+        _ingest(_UnitOfWork(_PaymentEvents()), body=b'{"event_id": "evt-1"}')
+
+
+def test_stores_a_new_event_and_completes_its_key(redis: _Redis) -> None:
+    events = _PaymentEvents()
+    uow = _UnitOfWork(events)
+
+    ack = _ingest(uow)
+
+    assert ack.status == "accepted"
+    assert uow.commits == 1
+    assert list(events.stored) == [(PaymentMethod.card, "evt-1")]
+    assert redis.values == {"idempotency:payment-webhook:card:evt-1": b"done"}
+
+
+def test_a_redelivery_is_answered_from_redis(redis: _Redis) -> None:
+    events = _PaymentEvents()
+    _ingest(_UnitOfWork(events))
+    uow = _UnitOfWork(_PaymentEvents(fail=True))
+
+    ack = _ingest(uow)
+
+    assert ack.status == "duplicate"
+    assert uow.commits == 0
+
+
+def test_a_redelivery_during_the_first_one_is_a_conflict(redis: _Redis) -> None:
+    redis.values["idempotency:payment-webhook:card:evt-1"] = b"pending"
+
+    with pytest.raises(DataConflictServiceError):
+        _ingest(_UnitOfWork(_PaymentEvents()))
+
+
+def test_a_failed_insert_releases_the_key_for_the_retry(redis: _Redis) -> None:
+    with pytest.raises(InternalServiceError):
+        _ingest(_UnitOfWork(_PaymentEvents(fail=True)))
+
+    assert redis.values == {}
+    assert _ingest(_UnitOfWork(_PaymentEvents())).status == "accepted"
+
+
+def test_without_redis_the_table_drops_duplicates(monkeypatch) -> None:
+    monkeypatch.setattr(CacheHelper, "get_client", classmethod(lambda cls: None))
+    events = _PaymentEvents()
+
+    first = _ingest(_UnitOfWork(events))
+    second = _ingest(_UnitOfWork(events))
+
+    assert (first.status, second.status) == ("accepted", "duplicate")
+    assert len(events.stored) == 1
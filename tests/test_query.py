@@ -0,0 +1,94 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from src.core.database.query import compile_query, query_scheme
+from src.models import Payments, PaymentStatus, Users
+
+
+def _sql(model, query: dict) -> str:
+    statement = compile_query(model, query_scheme(model).model_validate(query))
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"user_idd": 1},
+        {"amount__like": "1"},
+        {"status__gt": "paid"},  # enums get no range operators
+        {"is_active__in": [True]},  # a Users field on Payments
+    ],
+)
+def test_rejects_unknown_fields(query: dict) -> None:
+    with pytest.raises(ValidationError):
+        query_scheme(Payments).model_validate(query)
+
+
+def test_order_by_accepts_only_indexed_columns() -> None:
+    scheme = query_scheme(Payments)
+    for key in ("id", "-created_at", "user_id", "status"):
+        scheme.model_validate({"order_by": [key]})
+
+    with pytest.raises(ValidationError):
+        scheme.model_validate({"order_by": ["amount"]})
+    with pytest.raises(ValidationError):
+        query_scheme(Users).model_validate({"order_by": ["is_active"]})
+
+
+@pytest.mark.parametrize("query", [{"limit": 0}, {"limit": 1001}, {"columns": []}])
+def test_rejects_out_of_range_limits_and_empty_columns(query: dict) -> None:
+    with pytest.raises(ValidationError):
+        query_scheme(Payments).model_validate(query)
+
+
+def test_compiles_operators_on_bare_columns() -> None:
+    sql = _sql(
+        Payments,
+        {
+            "user_id__in": [1, 2],
+            "created_at__gte": datetime(2026, 1, 1),
+            "amount__lt": Decimal("10"),
+            "status": PaymentStatus.paid,
+        },
+    )
+
+    assert (
+        "WHERE payments.amount < %(amount_1)s "
+        "AND payments.created_at >= %(created_at_1)s "
+        "AND payments.status = %(status_1)s "
+        "AND payments.user_id IN (__[POSTCOMPILE_user_id_1])"
+    ) in sql
+
+
+def test_the_same_filters_render_the_same_sql() -> None:
+    first = _sql(Payments, {"user_id": 1, "status": PaymentStatus.paid})
+    second = _sql(Payments, {"status": PaymentStatus.paid, "user_id": 1})
+
+    assert first == second
+
+
+def test_ordering_is_completed_with_the_primary_key() -> None:
+    sql = _sql(Payments, {"order_by": ["-created_at"], "limit": 20})
+
+    assert sql.endswith(
+        "ORDER BY payments.created_at DESC, payments.id DESC LIMIT %(param_1)s"
+    )
+
+
+def test_the_primary_key_follows_the_last_direction() -> None:
+    sql = _sql(Payments, {"order_by": ["-status", "user_id"]})
+
+    assert sql.endswith(
+        "ORDER BY payments.status DESC, payments.user_id, "
+        "payments.id, payments.created_at"
+    )
+
+
+def test_columns_select_only_those_columns() -> None:
+    sql = _sql(Payments, {"columns": ["id", "amount"], "user_id": 1})
+
+    assert sql.startswith("SELECT payments.id, payments.amount FROM payments")
@@ -0,0 +1,145 @@
+import pytest
+from fastapi import Body, FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.config import config
+from src.core.middlewares import RateLimitMiddleware
+from src.core.rate_limit import Decision, LocalTokenBucket, RateLimit
+from src.core.rate_limit import limiter, retry_after_header
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_allows_the_burst_then_rejects(clock: _Clock) -> None:
+    bucket = LocalTokenBucket(max_keys=10)
+    limit = RateLimit(rate=2.0, burst=3)
+
+    decisions = [bucket.hit("a", limit) for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[-1].retry_after == pytest.approx(0.5)
+
+
+def test_bucket_refills_at_the_rate(clock: _Clock) -> None:
+    bucket = LocalTokenBucket(max_keys=10)
+    limit = RateLimit(rate=2.0, burst=1)
+    assert bucket.hit("a", limit).allowed
+    assert not bucket.hit("a", limit).allowed
+
+    clock.now += 0.5
+
+    assert bucket.hit("a", limit).allowed
+
+
+def test_bucket_never_holds_more_than_the_burst(clock: _Clock) -> None:
+    bucket = LocalTokenBucket(max_keys=10)
+    limit = RateLimit(rate=1.0, burst=2)
+    bucket.hit("a", limit)
+
+    clock.now += 3600
+
+    assert [bucket.hit("a", limit).allowed for _ in range(3)] == [True, True, False]
+
+
+def test_bucket_keys_are_independent(clock: _Clock) -> None:
+    bucket = LocalTokenBucket(max_keys=10)
+    limit = RateLimit(rate=1.0, burst=1)
+
+    assert bucket.hit("a", limit).allowed
+    assert bucket.hit("b", limit).allowed
+    assert not bucket.hit("a", limit).allowed
+
+
+def test_bucket_forgets_the_least_recent_keys(clock: _Clock) -> None:
+    bucket = LocalTokenBucket(max_keys=2)
+    limit = RateLimit(rate=1.0, burst=1)
+    for key in ("a", "b", "a", "c"):
+        bucket.hit(key, limit)
+
+    # "b" was evicted and starts over with a full bucket, "a" was not
+    assert bucket.hit("b", limit).allowed
+    assert not bucket.hit("c", limit).allowed
+
+    bucket.resize(1)
+    assert len(bucket._buckets) == 1
+
+
+def test_retry_after_is_whole_seconds_and_at_least_one() -> None:
+    assert retry_after_header(Decision(False, 0.01)) == "1"
+    assert retry_after_header(Decision(False, 2.2)) == "3"
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.post("/auth/register")
+    async def register(telegram_id: int = Body(embed=True)) -> int:
+        return telegram_id
+
+    @app.get("/metrics")
+    async def metrics() -> int:
+        return 0
+
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    # without Redis the local buckets decide
+    monkeypatch.setattr(config.rate_limit, "RATE_LIMIT_ENABLED", True)
+    return TestClient(_app())
+
+
+def test_middleware_rejects_over_the_route_limit(client: TestClient) -> None:
+    # /auth/register allows a burst of 3
+    statuses = [
+        client.post("/auth/register", json={"telegram_id": 1}).status_code
+        for _ in range(4)
+    ]
+
+    assert statuses == [200, 200, 200, 429]
+    response = client.post("/auth/register", json={"telegram_id": 1})
+    assert response.json() == {"detail": "TOO MANY REQUESTS"}
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_middleware_keys_clients_by_the_body_and_replays_it(
+    client: TestClient,
+) -> None:
+    for _ in range(3):
+        client.post("/auth/register", json={"telegram_id": 1})
+
+    response = client.post("/auth/register", json={"telegram_id": 2})
+
+    assert response.status_code == 200
+    assert response.json() == 2
+
+
+def test_middleware_prefers_the_telegram_id_header(client: TestClient) -> None:
+    headers = {"X-Telegram-Id": "7"}
+    for telegram_id in (1, 2, 3):
+        client.post(
+            "/auth/register", json={"telegram_id": telegram_id}, headers=headers
+        )
+
+    response = client.post("/auth/register", json={"telegram_id": 4}, headers=headers)
+
+    assert response.status_code == 429
+
+
+def test_middleware_skips_exempt_routes(client: TestClient) -> None:
+    assert all(client.get("/metrics").status_code == 200 for _ in range(50))
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime
+from ipaddress import IPv4Address, IPv4Network
+from typing import Any
+
+import pytest
+
+from src.jobs import rebalance
+from src.models import Servers
+from src.repositories import ServerRepository
+from src.schemes.configs import ConfigPeerScheme
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> list[Any]:
+        return self._rows
+
+
+class _Session:
+    """Answers every statement with the servers, like the real table."""
+
+    def __init__(self, servers: list[Servers]) -> None:
+        self.servers = servers
+        self.info: dict[str, Any] = {}
+
+    async def execute(self, statement: Any, *args, **kwargs) -> _Result:
+        return _Result(self.servers)
+
+
+class _Configs:
+    """The ConfigRepository methods the rebalancer uses, over a dict."""
+
+    def __init__(self, peers: dict[int, int]) -> None:
+        # config id -> server id
+        self.placed = peers
+        self.addresses: dict[int, set[IPv4Address]] = {}
+
+    async def peers(
+        self, server_id: int, after_id: int, limit: int
+    ) -> list[ConfigPeerScheme]:
+        ids = sorted(
+            id_
+            for id_, placed in self.placed.items()
+            if placed == server_id and id_ > after_id
+        )
+        return [
+            ConfigPeerScheme(id=id_, public_key=f"key{id_}", ip_address="10.0.0.2/32")
+            for id_ in ids[:limit]
+        ]
+
+    async def free_address(
+        self, server_id: int, first: IPv4Address, last: IPv4Address
+    ) -> IPv4Address:
+        used = self.addresses.setdefault(server_id, set())
+        address = first + len(used)
+        used.add(address)
+        return address
+
+    async def update(self, filters: dict[str, Any], data: dict[str, Any]) -> None:
+        self.placed[filters["id"]] = data["server_id"]
+
+
+class _UnitOfWork:
+    def __init__(self, servers: list[Servers], configs: _Configs) -> None:
+        self.servers = ServerRepository(_Session(servers))
+        self.configs = configs
+        self.committed = False
+
+    def __call__(self, **kwargs) -> "_UnitOfWork":
+        return self
+
+    async def __aenter__(self) -> "_UnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+def _server(id_: int, peers: int, is_active: bool) -> Servers:
+    return Servers(
+        id=id_,
+        name=f"wg{id_}",
+        endpoint=f"wg{id_}.example.com:51820",
+        public_key="k" * 44,
+        subnet=IPv4Network(f"10.{id_}.0.0/16"),
+        capacity=1000,
+        is_active=is_active,
+        peer_count=peers,
+        updated_at=datetime.now(),
+    )
+
+
+def test_step_moves_peers_off_a_drained_node(monkeypatch) -> None:
+    monkeypatch.setattr(rebalance.config.placement, "PLACEMENT_REBALANCE_STEP", 50)
+    configs = _Configs({id_: 1 for id_ in range(1, 121)})
+    uow = _UnitOfWork([_server(1, 120, is_active=False), _server(2, 0, True)], configs)
+    monkeypatch.setattr(rebalance, "UnitOfWork", uow)
+
+    moved = asyncio.run(rebalance.Rebalancer().step())
+
+    assert moved == 50
+    assert uow.committed
+    assert sum(server == 2 for server in configs.placed.values()) == 50
+    # addresses come from the new node's subnet
+    assert all(
+        address in IPv4Network("10.2.0.0/16") for address in configs.addresses[2]
+    )
+
+
+@pytest.mark.parametrize("peers", [0, 10])
+def test_step_keeps_peers_on_a_balanced_node(monkeypatch, peers: int) -> None:
+    configs = _Configs({id_: 1 for id_ in range(1, peers + 1)})
+    uow = _UnitOfWork([_server(1, peers, is_active=True)], configs)
+    monkeypatch.setattr(rebalance, "UnitOfWork", uow)
+
+    assert asyncio.run(rebalance.Rebalancer().step()) == 0
+    assert set(configs.placed.values()) <= {1}
+
+
+def test_a_superseded_leader_does_not_commit(monkeypatch) -> None:
+    configs = _Configs({id_: 1 for id_ in range(1, 11)})
+    uow = _UnitOfWork([_server(1, 10, is_active=False), _server(2, 0, True)], configs)
+    monkeypatch.setattr(rebalance, "UnitOfWork", uow)
+    tokens = []
+
+    async def check_fence(name: str, token: int) -> None:
+        tokens.append((name, token))
+        raise rebalance.LeaseLost(name)
+
+    monkeypatch.setattr(rebalance, "check_fence", check_fence)
+
+    with pytest.raises(rebalance.LeaseLost):
+        asyncio.run(rebalance.Rebalancer().run(7))
+
+    assert tokens == [("rebalance", 7)]
+    assert not uow.committed
@@ -0,0 +1,86 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.config import config
+from src.core.metrics import (
+    current_timings,
+    reset_request_timings,
+    start_request_timings,
+    track,
+)
+from src.core.metrics.metrics import Histogram
+from src.core.middlewares import TimingMiddleware
+
+
+def test_track_adds_up_per_component() -> None:
+    timings, token = start_request_timings()
+    try:
+        for _ in range(3):
+            with track("db"):
+                pass
+        with track("cache"):
+            pass
+    finally:
+        reset_request_timings(token)
+
+    assert timings.counts == {"db": 3, "cache": 1}
+    assert set(timings.durations) == {"db", "cache"}
+    assert current_timings() is None
+
+
+def test_track_outside_a_request_records_nothing() -> None:
+    with track("db"):
+        pass
+
+    assert current_timings() is None
+
+
+def test_server_timing_attributes_the_rest_to_the_app() -> None:
+    timings, token = start_request_timings()
+    reset_request_timings(token)
+    timings.add("db", 0.010)
+    timings.add("cache", 0.002)
+
+    header = timings.server_timing(0.030)
+
+    assert header == "db;dur=10.00, cache;dur=2.00, app;dur=18.00, total;dur=30.00"
+
+
+def test_server_timing_never_reports_negative_app_time() -> None:
+    timings, token = start_request_timings()
+    reset_request_timings(token)
+    timings.add("db", 0.050)
+
+    assert "app;dur=0.00" in timings.server_timing(0.040)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("test_seconds", "test", labels=("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, route="/a")
+
+    lines = histogram.collect()
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{route="/a"} 4' in lines
+
+
+def test_middleware_sends_server_timing(monkeypatch) -> None:
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware)
+
+    @app.get("/work")
+    async def work() -> int:
+        with track("db"):
+            pass
+        return 1
+
+    monkeypatch.setattr(config.api, "SERVER_TIMING", True)
+    client = TestClient(app)
+
+    header = client.get("/work").headers["Server-Timing"]
+
+    assert header.startswith("db;dur=")
+    assert header.split(", ")[-1].startswith("total;dur=")